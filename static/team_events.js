@@ -0,0 +1,156 @@
+// Patch the team page in place from the team's server-sent change events.
+(function () {
+  'use strict';
+
+  var container = document.getElementById('team-tasks');
+  if (!container || !window.EventSource) {
+    return;
+  }
+  var tbody = container.querySelector('table tbody');
+  // Table cell (data-field) -> event property shown in it.
+  var fields = {
+    task_name: 'task_name',
+    task_description: 'task_description',
+    due: 'due_display',
+    assigned: 'assigned',
+    status_display: 'status_display'
+  };
+  var firstNumber = tbody.querySelector('th');
+  var offset = firstNumber ? parseInt(firstNumber.textContent, 10) - 1 : 0;
+
+  function rowFor(id) {
+    return tbody.querySelector('tr[data-task-id="' + id + '"]');
+  }
+
+  function adjustCount(status, change) {
+    var count = container.querySelector('[data-count="' + status + '"]');
+    if (count) {
+      count.textContent = parseInt(count.textContent, 10) + change;
+    }
+  }
+
+  function renumber() {
+    Array.prototype.forEach.call(tbody.querySelectorAll('tr'), function (row, index) {
+      row.querySelector('th').textContent = offset + index + 1;
+    });
+  }
+
+  function fill(row, task) {
+    row.dataset.due = task.due || '';
+    row.dataset.status = task.status;
+    Object.keys(fields).forEach(function (field) {
+      row.querySelector('[data-field="' + field + '"]').textContent = task[fields[field]] || '';
+    });
+  }
+
+  function cell(row, tag) {
+    var element = document.createElement(tag);
+    row.appendChild(element);
+    return element;
+  }
+
+  function button(row, url, style, title, icon) {
+    var link = document.createElement('a');
+    link.href = url;
+    link.className = 'btn ' + style;
+    link.title = title;
+    link.innerHTML = '<i class="bi ' + icon + '"></i>';
+    cell(row, 'td').appendChild(link);
+  }
+
+  function buildRow(task) {
+    var row = document.createElement('tr');
+    var url = function (template) { return template.replace('/0/', '/' + task.id + '/'); };
+    row.dataset.taskId = task.id;
+    var checkbox = document.createElement('input');
+    checkbox.type = 'checkbox';
+    checkbox.name = 'tasks';
+    checkbox.value = task.id;
+    checkbox.className = 'form-check-input';
+    cell(row, 'td').appendChild(checkbox);
+    cell(row, 'th').scope = 'row';
+    Object.keys(fields).forEach(function (field) {
+      cell(row, 'td').dataset.field = field;
+    });
+    button(row, url(container.dataset.editUrl), 'btn-dark', 'Edit', 'bi-pencil');
+    button(row, url(container.dataset.deleteUrl), 'btn-danger', 'Delete', 'bi-trash');
+    fill(row, task);
+    return row;
+  }
+
+  // Rows are ordered by due date, with undated tasks last, then by id.
+  function sortsBefore(task, row) {
+    var due = task.due || '';
+    var rowDue = row.dataset.due;
+    if (due === rowDue) {
+      return task.id < parseInt(row.dataset.taskId, 10);
+    }
+    return due !== '' && (rowDue === '' || due < rowDue);
+  }
+
+  function insert(task) {
+    // A filtered or differently sorted table is left for the next page load to update.
+    if ('filtered' in container.dataset) {
+      return;
+    }
+    var rows = Array.prototype.slice.call(tbody.querySelectorAll('tr'));
+    var next = rows.find(function (row) { return sortsBefore(task, row); });
+    // A task sorting before or after every row may belong on a neighbouring page.
+    if (next === rows[0] && rows.length && container.querySelector('.pagination a[href*="before="]')) {
+      return;
+    }
+    if (!next && container.querySelector('.pagination a[href*="after="]')) {
+      return;
+    }
+    tbody.insertBefore(buildRow(task), next || null);
+    renumber();
+  }
+
+  var handlers = {
+    task_created: function (event) {
+      adjustCount(event.task.status, 1);
+      if (!rowFor(event.task.id)) {
+        insert(event.task);
+      }
+    },
+    task_updated: function (event) {
+      var row = rowFor(event.task.id);
+      if (row) {
+        adjustCount(row.dataset.status, -1);
+        adjustCount(event.task.status, 1);
+        fill(row, event.task);
+      }
+    },
+    task_deleted: function (event) {
+      var row = rowFor(event.task.id);
+      if (row) {
+        adjustCount(row.dataset.status, -1);
+        row.remove();
+        renumber();
+      }
+    },
+    member_added: function (event) {
+      var member = document.createElement('p');
+      member.textContent = event.member.username;
+      document.getElementById('team-members').appendChild(member);
+      var select = container.querySelector('select[name="assigned"]');
+      if (select) {
+        select.add(new Option(event.member.username, event.member.id));
+      }
+      var filter = container.querySelector('select[name="assignee"]');
+      if (filter) {
+        filter.add(new Option(event.member.username, event.member.username));
+      }
+    },
+    resync: function () {
+      window.location.reload();
+    }
+  };
+
+  var source = new EventSource(container.dataset.eventsUrl);
+  Object.keys(handlers).forEach(function (type) {
+    source.addEventListener(type, function (message) {
+      handlers[type](JSON.parse(message.data));
+    });
+  });
+}());
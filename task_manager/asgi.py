@@ -7,10 +7,66 @@ For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
 
+import asyncio
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from asgiref.sync import sync_to_async
+from django.core import signals
+from django.core.handlers.asgi import ASGIHandler, ASGIRequest
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
 
-application = get_asgi_application()
+
+class AsyncViewsASGIRequest(ASGIRequest):
+    """Request routed with the URL configuration that serves the async views."""
+
+    urlconf = 'task_manager.asgi_urls'
+
+
+class AsyncViewsASGIHandler(ASGIHandler):
+    request_class = AsyncViewsASGIRequest
+
+    async def handle(self, scope, receive, send):
+        """Handle a request, cancelling it if the client disconnects once its body has been read.
+
+        Django 4.2 stops reading receive after the request body, so a streaming
+        response such as the team event stream would otherwise run on for a
+        client that has gone.
+        """
+
+        body_read = asyncio.Event()
+
+        async def receive_body():
+            message = await receive()
+            if message['type'] != 'http.request' or not message.get('more_body', False):
+                body_read.set()
+            return message
+
+        async def wait_for_disconnect():
+            await body_read.wait()
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+
+        response = asyncio.create_task(super().handle(scope, receive_body, send))
+        disconnect = asyncio.create_task(wait_for_disconnect())
+        try:
+            await asyncio.wait([response, disconnect], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (response, disconnect):
+                task.cancel()
+            await asyncio.gather(response, disconnect, return_exceptions=True)
+        if response.cancelled():
+            # The response was never closed, which is what normally sends this.
+            await sync_to_async(signals.request_finished.send, thread_sensitive=True)(sender=self.__class__)
+        else:
+            response.result()
+
+
+django.setup(set_prefix=False)
+application = AsyncViewsASGIHandler()
+
+# Compile the templates now rather than on the first request.
+from tasks.warmup import warm_up_templates  # noqa: E402
+
+warm_up_templates()
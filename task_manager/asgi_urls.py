@@ -0,0 +1,27 @@
+"""
+URL configuration of the ASGI application.
+
+The same routes as task_manager.urls, with the read-heavy pages, the task
+exports and the team event stream served by the async views in
+tasks.async_views.
+"""
+from django.urls import path
+
+from task_manager.urls import urlpatterns as sync_urlpatterns
+from tasks import async_views
+
+async_views_by_name = {
+    'dashboard': async_views.dashboard,
+    'my_tasks': async_views.my_tasks,
+    'my_teams': async_views.my_teams,
+    'team_info': async_views.team_info,
+    'export_my_tasks': async_views.export_my_tasks,
+    'export_team_tasks': async_views.export_team_tasks,
+    'team_events': async_views.team_events,
+}
+
+urlpatterns = [
+    path(str(pattern.pattern), async_views_by_name[pattern.name], name=pattern.name)
+    if getattr(pattern, 'name', None) in async_views_by_name else pattern
+    for pattern in sync_urlpatterns
+]
@@ -42,6 +42,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tasks.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -57,8 +58,15 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Compiled templates are kept in memory; the development server
+            # still clears them whenever a template changes.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -83,6 +91,24 @@ DATABASES = {
 }
 
 
+# Caches
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'pages': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'pages',
+    },
+}
+
+# Cache alias and timeout (seconds) for rendered per-user pages
+PAGE_CACHE = 'pages'
+PAGE_CACHE_TIMEOUT = 300
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -118,6 +144,26 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/4.2/howto/static-files/
 
 STATIC_URL = '/static/'
+STATICFILES_DIRS = [BASE_DIR / 'static']
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Outside development, collectstatic gives every file a content hash in its
+# name and writes gzip and brotli copies next to it, and WhiteNoise serves
+# the hashed files with far future cache headers.  The development server
+# serves the uncollected files itself.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+        ),
+    },
+}
+if not DEBUG:
+    MIDDLEWARE.insert(MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1, 'whitenoise.middleware.WhiteNoiseMiddleware')
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -133,6 +179,51 @@ LOGIN_URL = 'log_in'
 # URL where @login_prohibited redirects to
 REDIRECT_URL_WHEN_LOGGED_IN = 'dashboard'
 
+# Failed log in attempts allowed per username and per client IP, as
+# (attempts, seconds in each window), and the cache counting them.  Limits
+# hold over any sliding period of that many seconds, so a burst straddling
+# two windows gets no more attempts through than one inside a window.
+LOGIN_THROTTLE_RATES = {
+    'username': (5, 300),
+    'ip': (50, 300),
+}
+LOGIN_THROTTLE_CACHE = 'default'
+
+# Number of tasks listed on each page of a task table
+TASKS_PER_PAGE = 25
+
+# Default and largest number of rows in a page of an API list
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 1000
+
+# Number of tasks fetched and written at a time by streaming exports
+EXPORT_CHUNK_SIZE = 2000
+
+# Number of CSV rows validated and inserted at a time by task imports
+IMPORT_BATCH_SIZE = 500
+
+# Live team updates: events queued per open team page before it is told to
+# reload instead, seconds between keep-alive comments, and the reconnection
+# delay given to browsers in milliseconds
+TEAM_EVENT_QUEUE_SIZE = 100
+TEAM_EVENT_HEARTBEAT = 15
+TEAM_EVENT_RETRY = 3000
+
+# Number of ranked results shown by task search
+SEARCH_RESULTS = 50
+
+# Due date reminders: days after today a task counts as due soon, tasks read
+# at a time, and the file recording how far the day's run has got
+REMINDER_DAYS_AHEAD = 3
+REMINDER_CHUNK_SIZE = 1000
+REMINDER_CHECKPOINT = BASE_DIR / 'reminders.checkpoint'
+
+# Bearer token, and addresses, allowed to scrape /metrics without logging
+# in as staff.  Behind a reverse proxy every request comes from the proxy's
+# address, so only list addresses that reach the application directly.
+METRICS_TOKEN = None
+METRICS_ALLOWED_IPS = []
+
 # Convert Django ERROR messages to Bootstrap DANGER messages
 MESSAGE_TAGS = {
     messages.ERROR: 'danger',
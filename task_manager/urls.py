@@ -17,7 +17,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 
-from tasks import views
+from tasks import api, views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -38,4 +38,18 @@ urlpatterns = [
     path('dashboard/my_teams/edit_team/<int:team_id>/', views.EditTeamView.as_view(), name='edit_team'),
     path('dashboard/create_task/<int:team_id>/', views.CreateTeamTaskView.as_view(), name='create_team_task'),
     path('dashboard/my_tasks/edit_task/<int:task_id>/', views.EditTaskView.as_view(), name='edit_task'),
+    path('dashboard/search/', views.search, name='search'),
+    path('dashboard/my_tasks/export/', views.export_my_tasks, name='export_my_tasks'),
+    path('dashboard/my_teams/team_info/<int:team_id>/export/', views.export_team_tasks, name='export_team_tasks'),
+    path('dashboard/my_tasks/bulk/', views.bulk_my_tasks, name='bulk_my_tasks'),
+    path('dashboard/my_teams/team_info/<int:team_id>/bulk/', views.bulk_team_tasks, name='bulk_team_tasks'),
+    path('dashboard/my_teams/team_info/<int:team_id>/events/', views.team_events, name='team_events'),
+    path('dashboard/my_teams/team_info/<int:team_id>/import/', views.import_team_tasks, name='import_team_tasks'),
+    path('metrics', views.metrics, name='metrics'),
+    path('api/tasks/', api.task_list, name='api_task_list'),
+    path('api/tasks/<int:task_id>/', api.task_detail, name='api_task_detail'),
+    path('api/teams/', api.team_list, name='api_team_list'),
+    path('api/teams/<int:team_id>/', api.team_detail, name='api_team_detail'),
+    path('api/teams/<int:team_id>/members/', api.team_member_list, name='api_team_member_list'),
+    path('api/teams/<int:team_id>/members/<int:user_id>/', api.team_member_detail, name='api_team_member_detail'),
 ]
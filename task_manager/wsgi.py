@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
 
 application = get_wsgi_application()
+
+# Compile the templates now rather than on the first request.
+from tasks.warmup import warm_up_templates  # noqa: E402
+
+warm_up_templates()
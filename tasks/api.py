@@ -0,0 +1,388 @@
+"""JSON API for tasks, teams and team membership.
+
+Requests are authenticated with the same session as the site, and writes
+need a CSRF token like any other form post.  Lists are paginated with
+opaque 'after' and 'before' cursors and accept a 'fields' parameter naming
+the fields to return.  Rows are serialised straight from value queries, so
+no model instances are built for lists.
+"""
+import json
+from datetime import date
+from functools import wraps
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import HttpResponse, JsonResponse
+
+from tasks.caching import bump_versions
+from tasks.deletion import delete_teams
+from tasks.events import member_added_event, publish_team_event, task_deleted_event, task_event
+from tasks.forms import CreateTaskForm, CreateTeamForm, EditTaskForm, EditTeamForm
+from tasks.models import User, Task, Team
+from tasks.pagination import KeysetPaginator
+
+# API field name -> lookup used to read it in a value query.
+TASK_FIELDS = {
+    'id': 'id',
+    'task_name': 'task_name',
+    'task_description': 'task_description',
+    'due': 'due',
+    'status': 'status',
+    'assigned': 'assigned__username',
+    'team': 'team_id',
+    'updated_at': 'updated_at',
+}
+TEAM_FIELDS = {
+    'id': 'id',
+    'team_name': 'team_name',
+    'team_description': 'team_description',
+    'updated_at': 'updated_at',
+}
+MEMBER_FIELDS = {
+    'id': 'id',
+    'username': 'username',
+    'first_name': 'first_name',
+    'last_name': 'last_name',
+}
+
+
+class ApiError(Exception):
+    """Raised to answer a request with an error status and JSON body."""
+
+    def __init__(self, status, detail=None, errors=None):
+        super().__init__(detail)
+        self.status = status
+        self.body = {'errors': errors} if errors is not None else {'detail': detail}
+
+
+def api_view(*methods):
+    """Decorator for API views accepting the given HTTP methods from logged in users."""
+
+    def decorator(view_function):
+        @wraps(view_function)
+        def modified_view_function(request, *args, **kwargs):
+            try:
+                if not request.user.is_authenticated:
+                    raise ApiError(401, 'Authentication credentials were not provided.')
+                if request.method not in methods:
+                    response = json_response({'detail': f'Method {request.method} not allowed.'}, status=405)
+                    response['Allow'] = ', '.join(methods)
+                    return response
+                return view_function(request, *args, **kwargs)
+            except ApiError as error:
+                return json_response(error.body, status=error.status)
+        return modified_view_function
+    return decorator
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, encoder=DjangoJSONEncoder)
+
+
+def request_data(request):
+    """Return the JSON object sent as the request body, none of whose values may be arrays or objects."""
+
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        raise ApiError(400, 'Request body is not valid JSON.')
+    if not isinstance(data, dict):
+        raise ApiError(400, 'Request body must be a JSON object.')
+    nested = [name for name, value in data.items() if isinstance(value, (dict, list))]
+    if nested:
+        raise ApiError(400, errors={name: ['Enter a single value.'] for name in nested})
+    return data
+
+
+def selected_fields(request, available):
+    """Return the API fields named by the 'fields' parameter, or all of them."""
+
+    names = [name for name in request.GET.get('fields', '').split(',') if name]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ApiError(400, errors={'fields': [f'Unknown field: {name}' for name in unknown]})
+    return names or list(available)
+
+
+def serialise(queryset, fields, available, extra=()):
+    """Return a value query of queryset selecting fields, and a function turning its rows into API objects.
+
+    extra names lookups needed by pagination but not returned.
+    """
+
+    lookups = {available[name] for name in fields} | set(extra)
+    renamed = [(name, available[name]) for name in fields]
+
+    def to_json(row):
+        return {name: row[lookup] for name, lookup in renamed}
+    return queryset.values(*lookups), to_json
+
+
+def paginated_response(request, queryset, fields, available, key):
+    """Return a page of queryset, in API form, selected by the request's cursor."""
+
+    try:
+        limit = min(int(request.GET.get('limit', settings.API_PAGE_SIZE)), settings.API_MAX_PAGE_SIZE)
+    except ValueError:
+        raise ApiError(400, errors={'limit': ['Enter a whole number.']})
+    if limit < 1:
+        raise ApiError(400, errors={'limit': ['Ensure this value is greater than or equal to 1.']})
+    rows, to_json = serialise(queryset, fields, available, extra=('id', key.lstrip('-')))
+    page = KeysetPaginator(rows, key=key, per_page=limit).get_page(request.GET)
+    return json_response({
+        'results': [to_json(row) for row in page],
+        'next': page_link(request, 'after', page.next_cursor()),
+        'previous': page_link(request, 'before', page.previous_cursor()),
+    })
+
+
+def page_link(request, direction, cursor):
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params.pop('after', None)
+    params.pop('before', None)
+    params[direction] = cursor
+    return f'{request.path}?{params.urlencode()}'
+
+
+def user_team_ids(user):
+    return Team.team_members.through.objects.filter(user=user).values('team_id')
+
+
+def visible_tasks(user):
+    """Return the tasks a user may see: their own, and those of their teams."""
+
+    return Task.objects.filter(Q(assigned=user) | Q(team__in=user_team_ids(user)))
+
+
+def get_visible_task(user, task_id):
+    task = visible_tasks(user).filter(id=task_id).first()
+    if task is None:
+        raise ApiError(404, 'Task not found.')
+    return task
+
+
+def whole_number(value, field):
+    """Return a JSON or query string value as an id, raising a 400 naming field if it is not one."""
+
+    if isinstance(value, (int, str)) and not isinstance(value, bool):
+        try:
+            number = int(value)
+        except ValueError:
+            pass
+        else:
+            # SQLite rejects integers beyond 64 bits with an OverflowError.
+            if -2 ** 63 <= number < 2 ** 63:
+                return number
+    raise ApiError(400, errors={field: ['Enter a whole number.']})
+
+
+def get_member_team(user, team_id):
+    team = Team.objects.filter(id=team_id, team_members=user).first()
+    if team is None:
+        raise ApiError(404, 'Team not found.')
+    return team
+
+
+def filter_tasks(request, tasks):
+    """Apply the status, due range, assignee and team filters in the query parameters."""
+
+    errors = {}
+    params = request.GET
+    if params.get('status'):
+        statuses = params['status'].split(',')
+        valid = {status for status, _ in Task.STATUS_CHOICES}
+        if not set(statuses) <= valid:
+            errors['status'] = [f"Choose from {', '.join(sorted(valid))}."]
+        tasks = tasks.filter(status__in=statuses)
+    for param, lookup in (('due_after', 'due__gte'), ('due_before', 'due__lte')):
+        if params.get(param):
+            try:
+                tasks = tasks.filter(**{lookup: date.fromisoformat(params[param])})
+            except ValueError:
+                errors[param] = ['Enter a date as YYYY-MM-DD.']
+    if params.get('assignee'):
+        tasks = tasks.filter(assigned__username=params['assignee'])
+    if params.get('team'):
+        try:
+            tasks = tasks.filter(team_id=whole_number(params['team'], 'team'))
+        except ApiError as error:
+            errors.update(error.body['errors'])
+    if errors:
+        raise ApiError(400, errors=errors)
+    return tasks
+
+
+def task_json(task_id):
+    rows, to_json = serialise(Task.objects.filter(id=task_id), list(TASK_FIELDS), TASK_FIELDS)
+    return to_json(rows.get())
+
+
+def team_json(team_id):
+    rows, to_json = serialise(Team.objects.filter(id=team_id), list(TEAM_FIELDS), TEAM_FIELDS)
+    return to_json(rows.get())
+
+
+def assignee_id(username):
+    """Return the id of the user with the given username, or the username itself so the form rejects it."""
+
+    if username in (None, ''):
+        return None
+    return User.objects.filter(username=username).values_list('id', flat=True).first() or username
+
+
+@api_view('GET', 'POST')
+def task_list(request):
+    """List the tasks the user can see, or create a task."""
+
+    if request.method == 'POST':
+        return create_task(request)
+    fields = selected_fields(request, TASK_FIELDS)
+    queryset = filter_tasks(request, visible_tasks(request.user))
+    return paginated_response(request, queryset, fields, TASK_FIELDS, key='due')
+
+
+def create_task(request):
+    data = request_data(request)
+    if data.get('team') is not None:
+        team = get_member_team(request.user, whole_number(data['team'], 'team'))
+    else:
+        team = None
+    form = CreateTaskForm(data={
+        'task_name': data.get('task_name'),
+        'task_description': data.get('task_description'),
+        'due': data.get('due'),
+        'status': data.get('status', 'not_started'),
+        'assigned': assignee_id(data.get('assigned')) or request.user.id,
+    })
+    form.fields['assigned'].queryset = team.team_members.all() if team else User.objects.filter(id=request.user.id)
+    if not form.is_valid():
+        raise ApiError(400, errors=form.errors)
+    task = form.save(commit=False)
+    task.team = team
+    task.save()
+    bump_versions(user_ids=[task.assigned_id], team_ids=[task.team_id])
+    publish_team_event(task.team_id, task_event('task_created', task))
+    return json_response(task_json(task.id), status=201)
+
+
+@api_view('GET', 'PATCH', 'DELETE')
+def task_detail(request, task_id):
+    """Show, update or delete a task."""
+
+    task = get_visible_task(request.user, task_id)
+    if request.method == 'GET':
+        fields = selected_fields(request, TASK_FIELDS)
+        rows, to_json = serialise(Task.objects.filter(id=task.id), fields, TASK_FIELDS)
+        return json_response(to_json(rows.get()))
+    if request.method == 'DELETE':
+        task_id = task.id
+        task.delete()
+        bump_versions(user_ids=[task.assigned_id], team_ids=[task.team_id])
+        publish_team_event(task.team_id, task_deleted_event(task_id))
+        return HttpResponse(status=204)
+
+    data = request_data(request)
+    original_assigned_id = task.assigned_id
+    form = EditTaskForm(instance=task, data={
+        'task_name': data.get('task_name', task.task_name),
+        'task_description': data.get('task_description', task.task_description),
+        'due': data.get('due', task.due),
+        'status': data.get('status', task.status),
+        'assigned': assignee_id(data['assigned']) if 'assigned' in data else task.assigned_id,
+    })
+    if task.team_id is not None:
+        form.fields['assigned'].queryset = User.objects.filter(team=task.team_id)
+    else:
+        form.fields['assigned'].queryset = User.objects.filter(id=request.user.id)
+    if not form.is_valid():
+        raise ApiError(400, errors=form.errors)
+    task = form.save(commit=False)
+    if task.assigned_id is None:
+        task.assigned = request.user
+    task.save()
+    bump_versions(user_ids=[original_assigned_id, task.assigned_id], team_ids=[task.team_id])
+    publish_team_event(task.team_id, task_event('task_updated', task))
+    return json_response(task_json(task.id))
+
+
+@api_view('GET', 'POST')
+def team_list(request):
+    """List the user's teams, or create a team with the user as its first member."""
+
+    if request.method == 'POST':
+        form = CreateTeamForm(data=request_data(request))
+        if not form.is_valid():
+            raise ApiError(400, errors=form.errors)
+        team = form.save()
+        team.team_members.add(request.user)
+        bump_versions(user_ids=[request.user.id], team_ids=[team.id])
+        return json_response(team_json(team.id), status=201)
+    fields = selected_fields(request, TEAM_FIELDS)
+    queryset = Team.objects.filter(id__in=user_team_ids(request.user))
+    return paginated_response(request, queryset, fields, TEAM_FIELDS, key='id')
+
+
+@api_view('GET', 'PATCH', 'DELETE')
+def team_detail(request, team_id):
+    """Show, update or delete one of the user's teams."""
+
+    team = get_member_team(request.user, team_id)
+    if request.method == 'GET':
+        fields = selected_fields(request, TEAM_FIELDS)
+        rows, to_json = serialise(Team.objects.filter(id=team.id), fields, TEAM_FIELDS)
+        return json_response(to_json(rows.get()))
+    if request.method == 'DELETE':
+        delete_teams([team.id])
+        bump_versions(team_ids=[team.id])
+        return HttpResponse(status=204)
+
+    data = request_data(request)
+    form = EditTeamForm(instance=team, data={
+        'team_name': data.get('team_name', team.team_name),
+        'team_description': data.get('team_description', team.team_description),
+    })
+    if not form.is_valid():
+        raise ApiError(400, errors=form.errors)
+    form.save()
+    bump_versions(team_ids=[team.id])
+    return json_response(team_json(team.id))
+
+
+@api_view('GET', 'POST')
+def team_member_list(request, team_id):
+    """List the members of one of the user's teams, or add a member by username."""
+
+    team = get_member_team(request.user, team_id)
+    if request.method == 'POST':
+        data = request_data(request)
+        form = EditTeamForm(instance=team, data={
+            'team_name': team.team_name,
+            'team_description': team.team_description,
+            'add_members': data.get('username', ''),
+        })
+        if not form.is_valid() or not form.cleaned_data['add_members']:
+            errors = form.errors.get('add_members', ['This field is required.'])
+            raise ApiError(400, errors={'username': errors})
+        member = User.objects.get(username=form.cleaned_data['add_members'])
+        team.team_members.add(member)
+        bump_versions(user_ids=[member.id], team_ids=[team.id])
+        publish_team_event(team.id, member_added_event(member))
+        rows, to_json = serialise(User.objects.filter(id=member.id), list(MEMBER_FIELDS), MEMBER_FIELDS)
+        return json_response(to_json(rows.get()), status=201)
+    fields = selected_fields(request, MEMBER_FIELDS)
+    return paginated_response(request, team.team_members.all(), fields, MEMBER_FIELDS, key='id')
+
+
+@api_view('DELETE')
+def team_member_detail(request, team_id, user_id):
+    """Remove a member from one of the user's teams."""
+
+    team = get_member_team(request.user, team_id)
+    if not team.team_members.filter(id=user_id).exists():
+        raise ApiError(404, 'Member not found.')
+    team.team_members.remove(user_id)
+    bump_versions(user_ids=[user_id], team_ids=[team.id])
+    return HttpResponse(status=204)
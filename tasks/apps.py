@@ -4,3 +4,19 @@ from django.apps import AppConfig
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import m2m_changed, post_delete, post_save
+
+        from tasks import caching, checks  # noqa: F401  checks registers the system checks.
+        from tasks.metrics import install_query_recorder
+        from tasks.models import Task, Team, User
+
+        connection_created.connect(install_query_recorder, dispatch_uid='tasks.metrics.install_query_recorder')
+        for model, receiver in ((Task, caching.task_changed), (Team, caching.team_changed), (User, caching.user_changed)):
+            for signal in (post_save, post_delete):
+                signal.connect(receiver, sender=model, dispatch_uid=f'tasks.caching.{receiver.__name__}')
+        m2m_changed.connect(
+            caching.members_changed, sender=Team.team_members.through, dispatch_uid='tasks.caching.members_changed',
+        )
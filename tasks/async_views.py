@@ -0,0 +1,169 @@
+"""Async versions of the read-heavy pages, served by the ASGI application.
+
+Each view runs its own queries with the async ORM, and then renders its
+template in a worker thread, since the cache template tag reads the cache
+synchronously.  A page's task rows and team members are left for the
+template to fetch in that thread, so a warm cached fragment still saves its
+query, as it does under WSGI.  Cache reads and writes outside templates go
+through the cache's async methods.  The team event stream waits on its
+subscription's queue, so an open connection holds no thread, and is
+cancelled by task_manager.asgi when the client disconnects.  The exports
+stream from an async iterator.  The sync views in tasks.views are still the
+ones served over WSGI.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
+from django.shortcuts import render
+
+from tasks import views
+from tasks.caching import afragment_context, aget_version, aget_versions, async_etag, cache_page_per_user, page_etag
+from tasks.events import broker, format_event
+from tasks.export import export_response
+from tasks.helpers import async_login_required
+from tasks.models import Task, Team, TaskStatusCount
+
+
+async def modification_stamp(queryset):
+    """Async version of tasks.views.modification_stamp()."""
+
+    stamp = await queryset.aaggregate(last_updated=Max('updated_at'), count=Count('id'))
+    return f"{stamp['last_updated']}:{stamp['count']}"
+
+
+async def my_tasks_versions(request):
+    return str(await aget_version('user', request.user.pk))
+
+
+async def my_teams_versions(request):
+    """Return the versions the my teams page depends on."""
+
+    teams = Team.objects.filter(team_members=request.user).values_list('id', flat=True)
+    team_versions = sorted((await aget_versions('team', [team_id async for team_id in teams])).items())
+    return f"{await aget_version('user', request.user.pk)}:{team_versions}"
+
+
+async def my_tasks_etag(request):
+    tasks = Task.objects.filter(assigned=request.user, team__isnull=True)
+    return page_etag(request, await my_tasks_versions(request), await modification_stamp(tasks))
+
+
+async def my_teams_etag(request):
+    teams = Team.objects.filter(team_members=request.user)
+    return page_etag(request, await aget_version('user', request.user.pk), await modification_stamp(teams))
+
+
+async def team_info_etag(request, team_id):
+    team_updated = await Team.objects.filter(id=team_id).values_list('updated_at', flat=True).afirst()
+    tasks = Task.objects.filter(team=team_id)
+    return page_etag(request, await aget_version('team', team_id), team_updated, await modification_stamp(tasks))
+
+
+@async_login_required
+async def dashboard(request):
+    """Display the current user's dashboard."""
+
+    current_user = request.user
+    task_counts = await TaskStatusCount.objects.afor_user(current_user)
+    return await sync_to_async(render)(request, 'dashboard.html', {'user': current_user, 'task_counts': task_counts})
+
+
+@async_login_required
+@async_etag(my_tasks_etag)
+@cache_page_per_user(my_tasks_versions)
+async def my_tasks(request):
+    """Page to view my tasks"""
+    current_user = request.user
+    tasks = views.task_table_queryset().filter(assigned=current_user, team__isnull=True)
+    filters, paginator = views.task_table_paginator(request, tasks, assignee=False)
+    page = paginator.get_page(request.GET)
+    return await sync_to_async(render)(request, 'my_tasks.html', {
+        'user': current_user, 'tasks': page, 'page': page, 'filters': filters,
+        **await afragment_context('user', current_user.pk),
+    })
+
+
+@async_login_required
+@async_etag(my_teams_etag)
+@cache_page_per_user(my_teams_versions)
+async def my_teams(request):
+    """Page to view my teams"""
+    current_user = request.user
+    teams = Team.objects.filter(team_members__in=[current_user]).only('team_name', 'team_description')
+    return await sync_to_async(render)(request, 'my_teams.html', {'teams': [team async for team in teams]})
+
+
+@async_login_required
+@async_etag(team_info_etag)
+async def team_info(request, team_id):
+    """Display team info"""
+    current_user = request.user
+    try:
+        team = await Team.objects.only('team_name', 'team_description', 'updated_at').aget(id=team_id)
+    except Team.DoesNotExist:
+        raise Http404('Team not found.')
+    members = team.team_members.only('username')
+    task_counts = await TaskStatusCount.objects.afor_team(team)
+    tasks = views.task_table_queryset().filter(team=team)
+    filters, paginator = views.task_table_paginator(request, tasks)
+    page = paginator.get_page(request.GET)
+    return await sync_to_async(render)(request, 'team_info.html', {
+        'user': current_user, 'tasks': page, 'page': page, 'filters': filters, 'team': team, 'members': members,
+        'task_counts': task_counts, **await afragment_context('team', team.id),
+    })
+
+
+@async_login_required
+async def export_my_tasks(request):
+    """Stream my tasks as a CSV or NDJSON download"""
+    requested, compress = views.export_format(request)
+    if requested is None:
+        return HttpResponseBadRequest('Unknown export format.')
+    tasks = Task.objects.filter(assigned=request.user, team__isnull=True)
+    return export_response(tasks, 'my_tasks', requested, compress, asynchronous=True)
+
+
+@async_login_required
+async def export_team_tasks(request, team_id):
+    """Stream the tasks of one of my teams as a CSV or NDJSON download"""
+    if not await Team.objects.filter(id=team_id, team_members=request.user).aexists():
+        raise Http404('Team not found.')
+    requested, compress = views.export_format(request)
+    if requested is None:
+        return HttpResponseBadRequest('Unknown export format.')
+    tasks = Task.objects.filter(team_id=team_id)
+    return export_response(tasks, f'team_{team_id}_tasks', requested, compress, asynchronous=True)
+
+
+@async_login_required
+async def team_events(request, team_id):
+    """Stream the change events of one of my teams as server-sent events"""
+    if not await Team.objects.filter(id=team_id, team_members=request.user).aexists():
+        raise Http404('Team not found.')
+    response = StreamingHttpResponse(team_event_stream(team_id, request.user), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def team_event_stream(team_id, user):
+    """Yield a team's events, and a keep-alive comment whenever none arrives for a while.
+
+    Membership is checked again before each keep-alive, and the stream ends
+    once user has left the team, so the browser's reconnect is refused.
+    """
+
+    subscription = broker.subscribe(team_id)
+    try:
+        yield f'retry: {settings.TEAM_EVENT_RETRY}\n\n'
+        while True:
+            event = await subscription.get(timeout=settings.TEAM_EVENT_HEARTBEAT)
+            if event is not None:
+                yield format_event(event)
+            elif await Team.objects.filter(id=team_id, team_members=user).aexists():
+                yield ': keep-alive\n\n'
+            else:
+                return
+    finally:
+        broker.unsubscribe(subscription)
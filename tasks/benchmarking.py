@@ -0,0 +1,119 @@
+"""Shared helpers for the benchmark management commands."""
+import math
+import statistics
+import time
+from contextlib import contextmanager
+from http.cookies import SimpleCookie
+from io import BytesIO, StringIO
+from urllib.parse import urlencode
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+@contextmanager
+def benchmark_database():
+    """Run the enclosed block against a throwaway copy of the database.
+
+    Benchmarks seed large tables, so they never touch the development
+    database; a test database is created up front and destroyed afterwards.
+    The test environment is set up too, so the test client can be used.
+    """
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def time_call(function, repeat=5):
+    """Call function repeat times and return latency statistics in milliseconds."""
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'max_ms': round(max(timings), 3),
+    }
+
+
+def seed_tasks(task_count, user_count=100, team_count=20, batch_size=5000):
+    """Quickly fill the database with users, teams and tasks for benchmarking."""
+
+    call_command(
+        'seed', bulk=True, users=user_count, teams=team_count, tasks=task_count,
+        batch_size=batch_size, stdout=StringIO(),
+    )
+
+
+def percentile(values, percent):
+    """Return the nearest-rank percentile of a non-empty list of values."""
+
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+class WSGISession:
+    """A browser session making requests straight to a WSGI application.
+
+    Cookies set by responses are kept and sent back, and posts carry the
+    CSRF cookie in the X-CSRFToken header, so forms can be submitted
+    without scraping their tokens.
+    """
+
+    def __init__(self, application):
+        self.application = application
+        self.cookies = {}
+
+    def request(self, method, path, data=None, json_body=None):
+        """Make a request, with form data or a JSON body, and return (status, headers, body)."""
+
+        path, _, query_string = path.partition('?')
+        if json_body is not None:
+            body, content_type = json_body.encode(), 'application/json'
+        else:
+            body, content_type = urlencode(data or {}, doseq=True).encode(), 'application/x-www-form-urlencoded'
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': query_string,
+            'REMOTE_ADDR': '127.0.0.1',
+            'CONTENT_TYPE': content_type,
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': BytesIO(body),
+        }
+        if self.cookies:
+            environ['HTTP_COOKIE'] = '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+        if settings.CSRF_COOKIE_NAME in self.cookies:
+            environ['HTTP_X_CSRFTOKEN'] = self.cookies[settings.CSRF_COOKIE_NAME]
+        setup_testing_defaults(environ)
+
+        started = []
+        chunks = self.application(environ, lambda status, headers, exc_info=None: started.append((status, headers)))
+        try:
+            content = b''.join(chunks)
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+        status, headers = started[0]
+        for name, value in headers:
+            if name.lower() == 'set-cookie':
+                self._keep_cookies(value)
+        return int(status.split()[0]), headers, content
+
+    def _keep_cookies(self, header):
+        for name, morsel in SimpleCookie(header).items():
+            if morsel['max-age'] == '0' or not morsel.value:
+                self.cookies.pop(name, None)
+            else:
+                self.cookies[name] = morsel.value
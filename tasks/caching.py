@@ -0,0 +1,249 @@
+"""Per-user caching of rendered pages, invalidated by version numbers.
+
+Every user and every team has a version number in the page cache.  Cached
+pages are keyed on the versions of whatever they show, and saving or
+deleting a task, team or user, or changing a team's members, bumps those
+versions through the receivers below, so a stale page is never looked up
+again, however the change is made.  update(), bulk_create() and the raw
+deletes of tasks.deletion send no signals, so the code using them bumps
+versions itself.  Versions start from the current time rather than from 1, so a
+version evicted from the cache cannot come back with a value already used.
+"""
+import asyncio
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response, quote_etag
+
+
+def page_cache():
+    return caches[settings.PAGE_CACHE]
+
+
+def _version_key(kind, object_id):
+    return f'version:{kind}:{object_id}'
+
+
+def get_versions(kind, object_ids):
+    """Return {id: version} for the given users or teams, creating missing versions."""
+
+    cache = page_cache()
+    keys = {_version_key(kind, object_id): object_id for object_id in object_ids}
+    versions = cache.get_many(keys)
+    for key in keys.keys() - versions.keys():
+        cache.add(key, time.time_ns(), timeout=None)
+        versions[key] = cache.get(key)
+    return {object_id: versions[key] for key, object_id in keys.items()}
+
+
+def get_version(kind, object_id):
+    return get_versions(kind, [object_id])[object_id]
+
+
+async def aget_versions(kind, object_ids):
+    """Async version of get_versions(), for async views."""
+
+    cache = page_cache()
+    keys = {_version_key(kind, object_id): object_id for object_id in object_ids}
+    versions = await cache.aget_many(keys)
+    for key in keys.keys() - versions.keys():
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        versions[key] = await cache.aget(key)
+    return {object_id: versions[key] for key, object_id in keys.items()}
+
+
+async def aget_version(kind, object_id):
+    return (await aget_versions(kind, [object_id]))[object_id]
+
+
+def bump_versions(user_ids=(), team_ids=()):
+    """Invalidate every cached page showing the given users or teams."""
+
+    cache = page_cache()
+    for kind, object_ids in (('user', user_ids), ('team', team_ids)):
+        for object_id in set(object_ids):
+            if object_id is None:
+                continue
+            key = _version_key(kind, object_id)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, time.time_ns(), timeout=None)
+
+
+def task_changed(sender, instance, **kwargs):
+    """post_save and post_delete receiver for tasks, bumping their assignee and team before and after the change."""
+
+    loaded_assigned_id, loaded_team_id = getattr(instance, '_loaded_owners', (None, None))
+    assigned_id, team_id = instance.__dict__.get('assigned_id'), instance.__dict__.get('team_id')
+    bump_versions(user_ids=[loaded_assigned_id, assigned_id], team_ids=[loaded_team_id, team_id])
+    instance._loaded_owners = (assigned_id, team_id)
+
+
+def team_changed(sender, instance, **kwargs):
+    """post_save and post_delete receiver for teams."""
+
+    bump_versions(team_ids=[instance.pk])
+
+
+def user_changed(sender, instance, created=False, update_fields=None, **kwargs):
+    """post_save and post_delete receiver for users, whose names are shown on their teams' pages.
+
+    Logging in only saves last_login, which no page shows.
+    """
+
+    if created or update_fields == frozenset(['last_login']):
+        return
+    bump_versions(user_ids=[instance.pk], team_ids=instance.team_set.values_list('id', flat=True))
+
+
+def members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """m2m_changed receiver for team memberships, bumping the teams and users on both sides."""
+
+    if action == 'pre_clear':
+        # The members are only known before they are cleared.
+        pk_set = set((instance.team_set if reverse else instance.team_members).values_list('id', flat=True))
+    elif action not in ('post_add', 'post_remove'):
+        return
+    if reverse:
+        bump_versions(user_ids=[instance.pk], team_ids=pk_set)
+    else:
+        bump_versions(user_ids=pk_set, team_ids=[instance.pk])
+
+
+def fragment_context(kind, object_id, version=None):
+    """Return the template context used to key cached fragments of a user's or team's page.
+
+    version is looked up if it is not given.
+    """
+
+    if version is None:
+        version = get_version(kind, object_id)
+    return {
+        'fragment_version': f'{kind}:{object_id}:{version}',
+        'fragment_timeout': settings.PAGE_CACHE_TIMEOUT,
+    }
+
+
+async def afragment_context(kind, object_id):
+    """Async version of fragment_context(), for async views."""
+
+    return fragment_context(kind, object_id, await aget_version(kind, object_id))
+
+
+def csrf_secret(request):
+    """Return the CSRF secret the tokens in a page rendered for request are made from.
+
+    A secret is generated if the request has none, and then set as the CSRF
+    cookie of the response, so pages cached or validated with it stay valid.
+    """
+
+    get_token(request)
+    return request.META['CSRF_COOKIE']
+
+
+def page_etag(request, *validators):
+    """Return an ETag for a user's page from validators of the data it shows.
+
+    The ETag also covers the user, the full path and the CSRF secret, since
+    they change the rendered page too.  No ETag is given while messages are
+    waiting to be shown.
+    """
+
+    if len(get_messages(request)):
+        return None
+    parts = (request.user.pk, request.get_full_path(), csrf_secret(request), *validators)
+    return hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+
+
+def cache_page_per_user(get_versions_key):
+    """Decorator caching a view's rendered page per user.
+
+    get_versions_key(request) returns a string of the versions the page
+    depends on, and is awaited when decorating an async view, whose cache
+    reads and writes go through the cache's async methods.  Pages are not
+    cached while messages are waiting to be shown, since they are rendered
+    into the page.  Pages hold CSRF tokens for their forms, so they are
+    keyed on the CSRF secret too.
+    """
+
+    def decorator(view_function):
+        if asyncio.iscoroutinefunction(view_function):
+            @wraps(view_function)
+            async def modified_async_view_function(request, *args, **kwargs):
+                if not _page_is_cacheable(request):
+                    return await view_function(request, *args, **kwargs)
+                key = _page_key(view_function, request, await get_versions_key(request))
+                cached = await page_cache().aget(key)
+                if cached is not None:
+                    return _cached_response(cached)
+                response = await view_function(request, *args, **kwargs)
+                if _response_is_cacheable(response):
+                    await page_cache().aset(key, _cached_content(response), timeout=settings.PAGE_CACHE_TIMEOUT)
+                return response
+            return modified_async_view_function
+
+        @wraps(view_function)
+        def modified_view_function(request, *args, **kwargs):
+            if not _page_is_cacheable(request):
+                return view_function(request, *args, **kwargs)
+            key = _page_key(view_function, request, get_versions_key(request))
+            cached = page_cache().get(key)
+            if cached is not None:
+                return _cached_response(cached)
+            response = view_function(request, *args, **kwargs)
+            if _response_is_cacheable(response):
+                page_cache().set(key, _cached_content(response), timeout=settings.PAGE_CACHE_TIMEOUT)
+            return response
+        return modified_view_function
+    return decorator
+
+
+def _page_is_cacheable(request):
+    return request.method == 'GET' and not len(get_messages(request))
+
+
+def _page_key(view_function, request, versions):
+    versions = f'{versions}:{request.get_full_path()}:{csrf_secret(request)}'
+    versions_hash = hashlib.md5(versions.encode()).hexdigest()
+    return f'page:{view_function.__name__}:{request.user.pk}:{versions_hash}'
+
+
+def _cached_response(cached):
+    content, content_type = cached
+    return HttpResponse(content, content_type=content_type)
+
+
+def _response_is_cacheable(response):
+    return response.status_code == 200 and not response.streaming
+
+
+def _cached_content(response):
+    return response.content, response['Content-Type']
+
+
+def async_etag(etag_func):
+    """Async counterpart of Django's etag decorator, for async views with an async etag_func.
+
+    Django 4.2's conditional view decorators only wrap sync views.
+    """
+
+    def decorator(view_function):
+        @wraps(view_function)
+        async def modified_view_function(request, *args, **kwargs):
+            etag = await etag_func(request, *args, **kwargs)
+            etag = quote_etag(etag) if etag is not None else None
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = await view_function(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD') and etag:
+                response.headers.setdefault('ETag', etag)
+            return response
+        return modified_view_function
+    return decorator
@@ -0,0 +1,47 @@
+"""System checks run by manage.py check, and so by the test suite and every deploy."""
+import re
+from pathlib import Path
+
+from django.apps import apps
+from django.contrib.staticfiles import finders
+from django.core.checks import Error, Tags, register
+
+from tasks.warmup import template_names
+
+ASSET_REFERENCE = re.compile(r'''(?:href|src)\s*=\s*["']([^"']+)["']''')
+STATIC_TAG = re.compile(r'''{%\s*static\s+["']([^"']+)["']\s*%}''')
+ASSET_PATH = re.compile(r'(^(https?:)?//)|(\.(css|js|map|woff2?|ttf|eot|svg|png|jpe?g|gif|ico|webp)([?#].*)?$)')
+
+
+def template_asset_errors(name, source):
+    """Return errors for assets a template loads other than through {% static %}.
+
+    Assets loaded through {% static %} are collected with a content hash in
+    their name, so they can be cached forever; anything else, such as a CDN
+    URL or a hard coded /static/ path, cannot.
+    """
+
+    errors = []
+    for reference in ASSET_REFERENCE.findall(source):
+        if '{%' not in reference and '{{' not in reference and ASSET_PATH.search(reference):
+            errors.append(Error(
+                f'{name} references the unhashed asset {reference}.',
+                hint='Vendor the file under static/ and load it with {% static %}.',
+                id='tasks.E001',
+            ))
+    for static_name in STATIC_TAG.findall(source):
+        if finders.find(static_name) is None:
+            errors.append(Error(
+                f'{name} loads the static file {static_name}, which does not exist.',
+                id='tasks.E002',
+            ))
+    return errors
+
+
+@register(Tags.templates)
+def check_template_assets(app_configs, **kwargs):
+    directory = Path(apps.get_app_config('tasks').path) / 'templates'
+    errors = []
+    for name in template_names():
+        errors += template_asset_errors(name, (directory / name).read_text())
+    return errors
@@ -0,0 +1,50 @@
+"""Set-based and batched deletion of tasks, teams and users.
+
+Django's delete() collects every related object in memory before deleting
+it.  These helpers delete with a fixed number of set-based statements
+instead, so deleting a team costs the same however many tasks it owns.
+"""
+from django.db import router, transaction
+
+from tasks.models import Task, Team, TaskStatusCount
+
+
+def _raw_delete(queryset):
+    """Delete the rows of queryset with a single DELETE statement, bypassing the collector."""
+
+    return queryset._raw_delete(router.db_for_write(queryset.model))
+
+
+def delete_tasks(task_ids):
+    """Delete the given tasks, returning the number of rows deleted."""
+
+    return _raw_delete(Task.objects.filter(pk__in=task_ids))
+
+
+def delete_teams(team_ids):
+    """Delete the given teams, with their tasks, memberships and counters, in one transaction."""
+
+    with transaction.atomic():
+        _raw_delete(Task.objects.filter(team_id__in=team_ids))
+        _raw_delete(Team.team_members.through.objects.filter(team_id__in=team_ids))
+        _raw_delete(TaskStatusCount.objects.filter(team_id__in=team_ids))
+        return _raw_delete(Team.objects.filter(pk__in=team_ids))
+
+
+def delete_in_batches(queryset, delete, batch_size=5000, progress=None):
+    """Delete the rows of queryset in batches of at most batch_size rows.
+
+    delete is called with each batch of primary keys, inside its own
+    transaction, and progress, if given, with the running total.
+    """
+
+    deleted = 0
+    while True:
+        batch = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not batch:
+            return deleted
+        with transaction.atomic():
+            delete(batch)
+        deleted += len(batch)
+        if progress is not None:
+            progress(deleted)
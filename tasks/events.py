@@ -0,0 +1,134 @@
+"""In-process publish/subscribe of team change events, streamed to team pages.
+
+Views publish a compact event when a change to a team's tasks or members
+commits, and each open team page holds a subscription whose events are sent
+to it as server-sent events.  Every subscription has a bounded queue: a
+client too slow to keep up has its backlog replaced by a single resync
+event, telling it to reload the page, so memory stays bounded however many
+changes it misses.
+
+Subscribers only hear events published in their own process, so live
+updates need a single ASGI worker process, or a shared broker in place of
+this one.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.formats import date_format
+
+RESYNC = {'type': 'resync'}
+
+
+class Subscription:
+    """A subscriber's queue of events for one team, read on the event loop that created it."""
+
+    def __init__(self, team_id, maxsize):
+        self.team_id = team_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def deliver(self, event):
+        """Queue an event, replacing the backlog with a resync event if the queue is full.
+
+        Only called on the subscription's event loop.
+        """
+
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = RESYNC
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout):
+        """Return the next event, or None if none arrives within timeout seconds."""
+
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class TeamEventBroker:
+    """Routes events published for a team to every subscription to that team."""
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, team_id):
+        """Subscribe to a team's events; must be called on the event loop that will read them."""
+
+        subscription = Subscription(team_id, settings.TEAM_EVENT_QUEUE_SIZE)
+        with self._lock:
+            self._subscriptions[team_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.team_id, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.team_id, None)
+
+    def publish(self, team_id, event):
+        """Hand an event to every subscription to team_id, from any thread."""
+
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(team_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The subscriber's event loop has closed.
+                self.unsubscribe(subscription)
+
+    def subscriber_count(self, team_id):
+        with self._lock:
+            return len(self._subscriptions.get(team_id, ()))
+
+
+broker = TeamEventBroker()
+
+
+def publish_team_event(team_id, event):
+    """Publish an event to a team's subscribers once the current transaction commits."""
+
+    if team_id is not None:
+        transaction.on_commit(lambda: broker.publish(team_id, event))
+
+
+def task_event(event_type, task):
+    """Return a task_created or task_updated event carrying the columns of the task table."""
+
+    return {
+        'type': event_type,
+        'task': {
+            'id': task.id,
+            'task_name': task.task_name,
+            'task_description': task.task_description,
+            'due': task.due.isoformat() if task.due else None,
+            'due_display': date_format(task.due) if task.due else None,
+            'assigned': task.assigned.username if task.assigned_id else None,
+            'status': task.status,
+            'status_display': task.get_status_display(),
+        },
+    }
+
+
+def task_deleted_event(task_id):
+    return {'type': 'task_deleted', 'task': {'id': task_id}}
+
+
+def member_added_event(user):
+    return {'type': 'member_added', 'member': {'id': user.id, 'username': user.username}}
+
+
+def format_event(event):
+    """Return an event in the server-sent events wire format."""
+
+    return f"event: {event['type']}\ndata: {json.dumps(event, cls=DjangoJSONEncoder, separators=(',', ':'))}\n\n"
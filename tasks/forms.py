@@ -4,6 +4,7 @@ from django.contrib.auth import authenticate
 from django.core.validators import RegexValidator
 
 from .models import User, Task, Team
+from .throttling import LoginThrottle
 
 
 class LogInForm(forms.Form):
@@ -12,6 +13,13 @@ class LogInForm(forms.Form):
     username = forms.CharField(label="Username")
     password = forms.CharField(label="Password", widget=forms.PasswordInput())
 
+    def __init__(self, *args, request=None, **kwargs):
+        """Construct new form instance, with the request being logged in to."""
+
+        super().__init__(*args, **kwargs)
+        self.request = request
+        self.throttled = False
+
     def get_user(self):
         """Returns authenticated user if possible."""
 
@@ -19,7 +27,13 @@ class LogInForm(forms.Form):
         if self.is_valid():
             username = self.cleaned_data.get('username')
             password = self.cleaned_data.get('password')
+            throttle = LoginThrottle(username, self.request)
+            if not throttle.allows_attempt():
+                self.throttled = True
+                return None
             user = authenticate(username=username, password=password)
+            if user is not None:
+                throttle.record_success()
         return user
 
 
@@ -62,11 +76,12 @@ class PasswordForm(NewPasswordMixin):
 
     password = forms.CharField(label='Current password', widget=forms.PasswordInput())
 
-    def __init__(self, user=None, **kwargs):
+    def __init__(self, user=None, request=None, **kwargs):
         """Construct new form instance with a user instance."""
 
         super().__init__(**kwargs)
         self.user = user
+        self.request = request
 
     def clean(self):
         """Clean the data and generate messages for any errors."""
@@ -74,7 +89,13 @@ class PasswordForm(NewPasswordMixin):
         super().clean()
         password = self.cleaned_data.get('password')
         if self.user is not None:
+            throttle = LoginThrottle(self.user.username, self.request)
+            if not throttle.allows_attempt():
+                self.add_error('password', "Too many attempts, please try again later")
+                return
             user = authenticate(username=self.user.username, password=password)
+            if user is not None:
+                throttle.record_success()
         else:
             user = None
         if user is None:
@@ -141,6 +162,159 @@ class CreateTaskForm(forms.ModelForm):
         return task
 
 
+class ImportTaskForm(CreateTaskForm):
+    """Form validating one row of a task import, with the assignee given by username."""
+
+    assigned = forms.CharField(required=False)
+
+    def __init__(self, *args, members=None, **kwargs):
+        """Construct new form instance, with the team members the row may be assigned to, by username."""
+
+        super().__init__(*args, **kwargs)
+        self.members = members or {}
+
+    def clean_assigned(self):
+        username = self.cleaned_data.get('assigned')
+        if not username:
+            return None
+        member = self.members.get(username)
+        if member is None:
+            raise forms.ValidationError("The specified user is not a member of the team.")
+        return member
+
+    def _get_validation_exclusions(self):
+        # The assignee came from the preloaded members, so skip the model's query checking it exists.
+        exclude = super()._get_validation_exclusions()
+        exclude.add('assigned')
+        return exclude
+
+
+class ImportTasksForm(forms.Form):
+    """Form enabling team members to upload a CSV file of tasks."""
+
+    file = forms.FileField(label='CSV file')
+
+
+class BulkTaskForm(forms.Form):
+    """Form enabling users to change the status of, reassign or delete many tasks at once."""
+
+    ACTION_CHOICES = [
+        ('status', 'Set status'),
+        ('assign', 'Reassign'),
+        ('delete', 'Delete'),
+    ]
+
+    tasks = forms.ModelMultipleChoiceField(
+        queryset=Task.objects.none(),
+        error_messages={
+            'required': 'Select at least one task.',
+            'invalid_choice': 'Some of the selected tasks cannot be changed.',
+            'invalid_pk_value': 'Some of the selected tasks cannot be changed.',
+        },
+    )
+    action = forms.ChoiceField(choices=ACTION_CHOICES)
+    status = forms.ChoiceField(choices=Task.STATUS_CHOICES, required=False)
+    assigned = forms.ModelChoiceField(queryset=User.objects.none(), required=False)
+
+    def __init__(self, *args, tasks=None, members=None, **kwargs):
+        """Construct new form instance, with the tasks that may be selected and the users they may be assigned to."""
+
+        super().__init__(*args, **kwargs)
+        if tasks is not None:
+            self.fields['tasks'].queryset = tasks.only('id', 'assigned')
+        if members is not None:
+            self.fields['assigned'].queryset = members
+
+    def clean(self):
+        """Check the value the chosen action needs was given."""
+
+        super().clean()
+        action = self.cleaned_data.get('action')
+        if action == 'status' and not self.cleaned_data.get('status'):
+            self.add_error('status', 'Choose the status to set.')
+        if action == 'assign' and self.cleaned_data.get('assigned') is None:
+            self.add_error('assigned', 'Choose the team member to assign.')
+
+
+class TaskFilterForm(forms.Form):
+    """Query string filters and sort order of a task table.
+
+    Each sort order is backed by an index on the task table, for both the
+    my tasks list and a team's list.
+    """
+
+    SORT_CHOICES = [
+        ('due', 'Due date, soonest first'),
+        ('-due', 'Due date, latest first'),
+        ('-status', 'Status, not started first'),
+        ('status', 'Status, done first'),
+        ('name', 'Name, A to Z'),
+        ('-name', 'Name, Z to A'),
+    ]
+    SORT_KEYS = {
+        'due': 'due', '-due': '-due',
+        'status': 'status', '-status': '-status',
+        'name': 'task_name', '-name': '-task_name',
+    }
+
+    status = forms.ChoiceField(
+        choices=[('', 'Any status')] + Task.STATUS_CHOICES, required=False,
+        widget=forms.Select(attrs={'class': 'form-select form-select-sm w-auto', 'aria-label': 'Status'}),
+    )
+    due_after = forms.DateField(
+        label='Due from', required=False,
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control form-control-sm w-auto', 'aria-label': 'Due from'}),
+    )
+    due_before = forms.DateField(
+        label='Due by', required=False,
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control form-control-sm w-auto', 'aria-label': 'Due by'}),
+    )
+    assignee = forms.CharField(required=False)
+    sort = forms.ChoiceField(
+        choices=SORT_CHOICES, required=False,
+        widget=forms.Select(attrs={'class': 'form-select form-select-sm w-auto', 'aria-label': 'Sort by'}),
+    )
+
+    def __init__(self, *args, assignee=True, **kwargs):
+        """Construct new form instance, with an assignee filter unless every task has the same assignee."""
+
+        super().__init__(*args, **kwargs)
+        if not assignee:
+            del self.fields['assignee']
+
+    @property
+    def state(self):
+        """Return the valid, non-default filters and sort order, as query string values."""
+
+        self.is_valid()
+        cleaned_data = getattr(self, 'cleaned_data', {})
+        state = {}
+        for name in self.fields:
+            value = cleaned_data.get(name)
+            if value and not (name == 'sort' and value == 'due'):
+                state[name] = value.isoformat() if hasattr(value, 'isoformat') else value
+        return state
+
+    def sort_key(self):
+        """Return the key to paginate the filtered tasks by."""
+
+        return self.SORT_KEYS[self.state.get('sort', 'due')]
+
+    def filter(self, tasks):
+        """Return the tasks matching the valid filters; invalid filters are ignored."""
+
+        state = self.state
+        if 'status' in state:
+            tasks = tasks.filter(status=state['status'])
+        if 'due_after' in state:
+            tasks = tasks.filter(due__gte=state['due_after'])
+        if 'due_before' in state:
+            tasks = tasks.filter(due__lte=state['due_before'])
+        if 'assignee' in state:
+            tasks = tasks.filter(assigned__username=state['assignee'])
+        return tasks
+
+
 class CreateTeamForm(forms.ModelForm):
     """Form enabling users to create new teams"""
 
@@ -181,6 +355,7 @@ class EditTeamForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.team=self.instance
+        self.added_member = None
 
     def clean_add_members(self):
         username = self.cleaned_data.get('add_members')
@@ -206,6 +381,7 @@ class EditTeamForm(forms.ModelForm):
         user_to_add = User.objects.filter(username=add_members_username).first()
         if user_to_add is not None:
             self.team.team_members.add(user_to_add)
+        self.added_member = user_to_add
  
         if commit:
             self.team.save()
@@ -1,4 +1,9 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.contrib.auth import get_user
+from django.contrib.auth.views import redirect_to_login
 from django.shortcuts import redirect
 
 def login_prohibited(view_function):
@@ -9,4 +14,28 @@ def login_prohibited(view_function):
             return redirect(settings.REDIRECT_URL_WHEN_LOGGED_IN)
         else:
             return view_function(request)
-    return modified_view_function
\ No newline at end of file
+    return modified_view_function
+
+
+async def aget_user(request):
+    """Return the request's user, loading the session and user outside the event loop.
+
+    The user replaces the lazy request.user, so templates and context
+    processors rendered later in the event loop do not query for it again.
+    """
+
+    user = await sync_to_async(get_user)(request)
+    request.user = user
+    return user
+
+
+def async_login_required(view_function):
+    """Decorator for async view functions that redirect users to log in if they are not."""
+
+    @wraps(view_function)
+    async def modified_view_function(request, *args, **kwargs):
+        user = await aget_user(request)
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view_function(request, *args, **kwargs)
+    return modified_view_function
@@ -0,0 +1,108 @@
+"""Bulk import of tasks into a team from CSV.
+
+Rows are read from a stream and validated in batches with the same rules
+as the create task form.  The assignees named in a batch are looked up
+with a single query, and the valid rows of each batch are inserted with
+one bulk insert in their own transaction, so a bad row is reported rather
+than aborting the file.
+"""
+import csv
+
+from django.conf import settings
+from django.db import transaction
+
+from tasks.caching import bump_versions
+from tasks.events import RESYNC, publish_team_event
+from tasks.forms import ImportTaskForm
+from tasks.models import Task
+
+IMPORT_COLUMNS = ('task_name', 'task_description', 'due', 'status', 'assigned')
+REQUIRED_COLUMNS = ('task_name', 'task_description', 'due')
+
+
+class ImportFileError(Exception):
+    """Raised when an import file cannot be read as CSV with the expected columns."""
+
+
+class ImportReport:
+    """Outcome of an import: the number of tasks created and the errors of each rejected row."""
+
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    def add_error(self, line, errors):
+        """Record the form errors, {field: [message, ...]}, of the row starting on a line of the file."""
+
+        self.errors.append({'line': line, 'errors': errors})
+
+    @property
+    def rejected(self):
+        return len(self.errors)
+
+
+def import_tasks(team, lines, default_assignee):
+    """Create tasks in team from CSV lines, returning an ImportReport.
+
+    The first line is a header naming the columns.  Columns besides those in
+    IMPORT_COLUMNS are ignored, so a team export can be imported as it is.
+    Rows without an assignee are assigned to default_assignee.
+    """
+
+    reader = csv.DictReader(lines)
+    try:
+        columns = reader.fieldnames or []
+    except (csv.Error, UnicodeDecodeError) as error:
+        raise ImportFileError(f'The file is not UTF-8 encoded CSV: {error}')
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+    if missing:
+        raise ImportFileError(f"The file has no {', '.join(missing)} column.")
+
+    report = ImportReport()
+    batch = []
+    try:
+        for line, row in numbered_rows(reader):
+            batch.append((line, row))
+            if len(batch) == settings.IMPORT_BATCH_SIZE:
+                import_batch(team, batch, default_assignee, report)
+                batch = []
+    except (csv.Error, UnicodeDecodeError) as error:
+        report.add_error(reader.line_num + 1, {'file': [f'The rest of the file could not be read: {error}']})
+    if batch:
+        import_batch(team, batch, default_assignee, report)
+    if report.created:
+        publish_team_event(team.id, RESYNC)
+    return report
+
+
+def numbered_rows(reader):
+    """Yield (line, row) for each row of a DictReader, with the line the row starts on."""
+
+    line = reader.line_num + 1
+    for row in reader:
+        yield line, row
+        line = reader.line_num + 1
+
+
+def import_batch(team, batch, default_assignee, report):
+    """Validate a batch of (line, row) pairs and insert its valid rows."""
+
+    usernames = {row.get('assigned') for _, row in batch if row.get('assigned')}
+    members = {member.username: member for member in team.team_members.filter(username__in=usernames)}
+    tasks = []
+    for line, row in batch:
+        data = {column: (row.get(column) or '').strip() for column in IMPORT_COLUMNS}
+        data['status'] = data['status'] or 'not_started'
+        form = ImportTaskForm(data=data, members=members)
+        if not form.is_valid():
+            report.add_error(line, {field: list(messages) for field, messages in form.errors.items()})
+            continue
+        task = form.save(commit=False)
+        task.team = team
+        task.assigned = form.cleaned_data['assigned'] or default_assignee
+        tasks.append(task)
+
+    with transaction.atomic():
+        Task.objects.bulk_create(tasks)
+    report.created += len(tasks)
+    bump_versions(user_ids={task.assigned_id for task in tasks}, team_ids=[team.id] if tasks else [])
@@ -0,0 +1,350 @@
+import json
+import logging
+import random
+import statistics
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.urls import URLPattern, reverse
+
+from task_manager.urls import urlpatterns
+from tasks.benchmarking import WSGISession, benchmark_database, percentile, seed_tasks
+from tasks.management.commands.seed import Command as SeedCommand
+from tasks.models import User, Task, Team
+
+# Routes requested by every synthetic user once, in this order, after logging
+# in, then picked at random with these weights, the most visited pages first.
+# Routes that act on something an earlier request created come after it.
+MIX = [
+    ('my_tasks', 12),
+    ('team_info', 12),
+    ('dashboard', 8),
+    ('my_teams', 6),
+    ('search', 4),
+    ('create_task', 4),
+    ('edit_task', 4),
+    ('delete_task', 3),
+    ('create_team_task', 3),
+    ('api_task_list', 3),
+    ('api_task_detail', 2),
+    ('create_team', 1),
+    ('edit_team', 1),
+    ('api_team_list', 1),
+    ('api_team_detail', 1),
+    ('api_team_member_list', 1),
+    ('api_team_member_detail', 1),
+    ('delete_team', 1),
+    ('password', 1),
+    ('profile', 1),
+    ('export_my_tasks', 1),
+    ('export_team_tasks', 1),
+    ('import_team_tasks', 1),
+    ('bulk_my_tasks', 1),
+    ('bulk_team_tasks', 1),
+    ('team_events', 1),
+    ('metrics', 1),
+]
+
+# Routes requested once per synthetic user, around the mix.
+LOGGED_OUT_ROUTES = ['home', 'sign_up', 'log_in']
+LAST_ROUTE = 'log_out'
+
+
+class SyntheticUser:
+    """A seeded user browsing the site: the requests it makes and the objects it has created.
+
+    Each route of the mix has a method of the same name returning the
+    (method, path, form data, JSON body) of the next request to it, or None
+    if there is nothing for it to act on yet.
+    """
+
+    def __init__(self, user, rng, others):
+        self.user = user
+        self.rng = rng
+        self.team_id = Team.objects.filter(team_members=user).order_by('id').values_list('id', flat=True).first()
+        self.member_ids = list(User.objects.filter(team=self.team_id).values_list('id', flat=True))
+        self.task_ids = list(Task.objects.filter(assigned=user, team__isnull=True).values_list('id', flat=True)[:20])
+        self.team_task_ids = list(Task.objects.filter(team=self.team_id).values_list('id', flat=True)[:20])
+        self.words = [name.split()[0] for name in Task.objects.filter(team=self.team_id).values_list('task_name', flat=True)[:20]] or ['task']
+        self.others = [other for other in others if other.id != user.id]
+        self.created_tasks = []
+        self.created_teams = []
+        self.added_members = []
+        self.created = None
+        self.count = 0
+
+    def unique_name(self, prefix):
+        self.count += 1
+        return f'{prefix} {self.user.id}-{self.count}'
+
+    def task_form(self, assigned_id):
+        return {
+            'task_name': self.unique_name('Bench task'),
+            'task_description': 'Created by the benchmark',
+            'due': (date.today() + timedelta(days=self.rng.randint(1, 60))).isoformat(),
+            'assigned': assigned_id,
+            'status': self.rng.choice(['not_started', 'in_progress', 'done']),
+        }
+
+    def own_task_id(self):
+        return self.rng.choice(self.created_tasks + self.task_ids) if self.created_tasks or self.task_ids else None
+
+    def home(self):
+        return 'GET', reverse('home'), None, None
+
+    def sign_up(self):
+        return 'GET', reverse('sign_up'), None, None
+
+    def log_in(self):
+        return 'POST', reverse('log_in'), {'username': self.user.username, 'password': SeedCommand.DEFAULT_PASSWORD}, None
+
+    def log_out(self):
+        return 'GET', reverse('log_out'), None, None
+
+    def dashboard(self):
+        return 'GET', reverse('dashboard'), None, None
+
+    def my_tasks(self):
+        query = self.rng.choice(['', '?sort=name', '?status=in_progress', '?sort=-due'])
+        return 'GET', reverse('my_tasks') + query, None, None
+
+    def my_teams(self):
+        return 'GET', reverse('my_teams'), None, None
+
+    def team_info(self):
+        query = self.rng.choice(['', '', '?sort=status', f'?assignee={self.user.username}'])
+        return 'GET', reverse('team_info', kwargs={'team_id': self.team_id}) + query, None, None
+
+    def search(self):
+        return 'GET', f"{reverse('search')}?q={self.rng.choice(self.words)}", None, None
+
+    def create_task(self):
+        form = self.task_form(self.user.id)
+        self.created = (self.created_tasks, Task.objects.filter(assigned=self.user, task_name=form['task_name']))
+        return 'POST', reverse('create_task'), form, None
+
+    def edit_task(self):
+        task_id = self.own_task_id()
+        if task_id is None:
+            return None
+        return 'POST', reverse('edit_task', kwargs={'task_id': task_id}), self.task_form(self.user.id), None
+
+    def delete_task(self):
+        if not self.created_tasks:
+            return None
+        task_id = self.created_tasks.pop(self.rng.randrange(len(self.created_tasks)))
+        return 'POST', reverse('delete_task', kwargs={'task_id': task_id}), {}, None
+
+    def create_team_task(self):
+        form = self.task_form(self.rng.choice(self.member_ids))
+        return 'POST', reverse('create_team_task', kwargs={'team_id': self.team_id}), form, None
+
+    def create_team(self):
+        name = self.unique_name('Bench team')
+        self.created = (self.created_teams, Team.objects.filter(team_members=self.user, team_name=name))
+        return 'POST', reverse('create_team'), {'team_name': name, 'team_description': 'Created by the benchmark'}, None
+
+    def edit_team(self):
+        return 'GET', reverse('edit_team', kwargs={'team_id': self.team_id}), None, None
+
+    def delete_team(self):
+        if not self.created_teams:
+            return None
+        team_id = self.created_teams.pop(0)
+        self.added_members = [member for member in self.added_members if member[0] != team_id]
+        return 'POST', reverse('delete_team', kwargs={'team_id': team_id}), {}, None
+
+    def password(self):
+        return 'GET', reverse('password'), None, None
+
+    def profile(self):
+        return 'GET', reverse('profile'), None, None
+
+    def export_my_tasks(self):
+        return 'GET', reverse('export_my_tasks'), None, None
+
+    def export_team_tasks(self):
+        return 'GET', reverse('export_team_tasks', kwargs={'team_id': self.team_id}), None, None
+
+    def import_team_tasks(self):
+        return 'GET', reverse('import_team_tasks', kwargs={'team_id': self.team_id}), None, None
+
+    def bulk_my_tasks(self):
+        tasks = self.rng.sample(self.task_ids, min(2, len(self.task_ids)))
+        status = self.rng.choice(['not_started', 'in_progress', 'done'])
+        return 'POST', reverse('bulk_my_tasks'), {'action': 'status', 'status': status, 'tasks': tasks}, None
+
+    def bulk_team_tasks(self):
+        tasks = self.rng.sample(self.team_task_ids, min(2, len(self.team_task_ids)))
+        status = self.rng.choice(['not_started', 'in_progress', 'done'])
+        url = reverse('bulk_team_tasks', kwargs={'team_id': self.team_id})
+        return 'POST', url, {'action': 'status', 'status': status, 'tasks': tasks}, None
+
+    def team_events(self):
+        return 'GET', reverse('team_events', kwargs={'team_id': self.team_id}), None, None
+
+    def metrics(self):
+        return 'GET', reverse('metrics'), None, None
+
+    def api_task_list(self):
+        query = self.rng.choice(['', '?status=not_started,in_progress', f'?team={self.team_id}'])
+        return 'GET', reverse('api_task_list') + query, None, None
+
+    def api_task_detail(self):
+        task_id = self.own_task_id()
+        if task_id is None:
+            return None
+        return 'GET', reverse('api_task_detail', kwargs={'task_id': task_id}), None, None
+
+    def api_team_list(self):
+        return 'GET', reverse('api_team_list'), None, None
+
+    def api_team_detail(self):
+        return 'GET', reverse('api_team_detail', kwargs={'team_id': self.team_id}), None, None
+
+    def api_team_member_list(self):
+        # Add one of the other synthetic users to a team this user created, while it has none.
+        if self.created_teams and not self.added_members:
+            team_id = self.created_teams[0]
+            member = self.rng.choice(self.others)
+            self.added_members.append((team_id, member.id))
+            url = reverse('api_team_member_list', kwargs={'team_id': team_id})
+            return 'POST', url, None, json.dumps({'username': member.username})
+        return 'GET', reverse('api_team_member_list', kwargs={'team_id': self.team_id}), None, None
+
+    def api_team_member_detail(self):
+        if not self.added_members:
+            return None
+        team_id, user_id = self.added_members.pop()
+        return 'DELETE', reverse('api_team_member_detail', kwargs={'team_id': team_id, 'user_id': user_id}), None, None
+
+    def record_created(self):
+        """Add the id of the task or team the last request created, if it did, to those this user may act on."""
+
+        if self.created is not None:
+            ids, queryset = self.created
+            ids.extend(queryset.values_list('id', flat=True))
+            self.created = None
+
+
+class Command(BaseCommand):
+    """Load test every route with concurrent synthetic users and report latency, throughput and queries per route."""
+
+    help = 'Seeds a data set, drives a realistic mix of requests over every route from concurrent logged in users, and reports per route statistics as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=10000, help='Tasks to seed')
+        parser.add_argument('--teams', type=int, default=50, help='Teams to seed')
+        parser.add_argument('--users', type=int, default=20, help='Synthetic users to log in')
+        parser.add_argument('--workers', type=int, default=8, help='Worker threads sending requests at the same time')
+        parser.add_argument('--requests', type=int, default=50, help='Requests from each user after visiting every route once')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed of the request mix')
+        parser.add_argument('--output', help='File to write the JSON report to, instead of standard output')
+
+    def handle(self, *args, **options):
+        from task_manager.wsgi import application
+
+        missing = self.unbenchmarked_routes()
+        if missing:
+            raise CommandError(f"No request in the mix for the routes: {', '.join(sorted(missing))}.")
+
+        logging.getLogger('django.request').setLevel(logging.CRITICAL)
+        # The synthetic users scrape /metrics like a Prometheus server allowed by address.
+        with benchmark_database(), override_settings(METRICS_ALLOWED_IPS=['127.0.0.1']):
+            seed_tasks(options['tasks'], user_count=max(options['users'] * 5, 100), team_count=options['teams'])
+            users = list(User.objects.filter(team__isnull=False).distinct().order_by('id')[:options['users']])
+            if len(users) < options['users']:
+                raise CommandError(f'Only {len(users)} seeded users are in a team, seed more teams.')
+            synthetic_users = [
+                SyntheticUser(user, random.Random(options['seed'] * 100003 + index), users)
+                for index, user in enumerate(users)
+            ]
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['workers']) as workers:
+                results = list(workers.map(lambda user: self.browse(application, user, options['requests']), synthetic_users))
+            elapsed = time.perf_counter() - start
+
+        report = self.report([sample for samples in results for sample in samples], elapsed, options)
+        text = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(text + '\n')
+            self.stdout.write(self.style.SUCCESS(
+                f"{report['total']['requests']} requests, {report['total']['requests_per_second']} requests/s, "
+                f"{report['total']['errors']} errors, report written to {options['output']}"
+            ))
+        else:
+            self.stdout.write(text)
+
+    def unbenchmarked_routes(self):
+        named = {pattern.name for pattern in urlpatterns if isinstance(pattern, URLPattern) and pattern.name}
+        return named - {route for route, _ in MIX} - set(LOGGED_OUT_ROUTES) - {LAST_ROUTE}
+
+    def browse(self, application, user, request_count):
+        """Log user in, visit every route, make request_count requests picked from the mix and log out.
+
+        Returns a (route, status, seconds, queries) sample for each request.
+        """
+
+        session = WSGISession(application)
+        samples = []
+        routes = [route for route, _ in MIX]
+        weights = [weight for _, weight in MIX]
+        picks = [user.rng.choices(routes, weights)[0] for _ in range(request_count)]
+        try:
+            for route in [*LOGGED_OUT_ROUTES, *routes, *picks, LAST_ROUTE]:
+                request = getattr(user, route)()
+                if request is None:
+                    continue
+                if route == 'log_in':
+                    # Fetch the log in form first, for the CSRF cookie.
+                    session.request('GET', reverse('log_in'))
+                samples.append(self.measure(session, route, *request))
+                user.record_created()
+        finally:
+            connection.close()
+        return samples
+
+    def measure(self, session, route, method, path, data, json_body):
+        queries = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_query):
+            start = time.perf_counter()
+            try:
+                status = session.request(method, path, data, json_body)[0]
+            except Exception:
+                status = 500
+            elapsed = time.perf_counter() - start
+        return f'{method} {route}', status, elapsed, queries
+
+    def report(self, samples, elapsed, options):
+        by_route = defaultdict(list)
+        for sample in samples:
+            by_route[sample[0]].append(sample)
+        return {
+            'config': {name: options[name] for name in ['tasks', 'teams', 'users', 'workers', 'requests', 'seed']},
+            'total': self.summarise(samples, elapsed),
+            'routes': {route: self.summarise(route_samples, elapsed) for route, route_samples in by_route.items()},
+        }
+
+    def summarise(self, samples, elapsed):
+        latencies = [seconds * 1000 for _, _, seconds, _ in samples]
+        return {
+            'requests': len(samples),
+            'errors': sum(status >= 400 for _, status, _, _ in samples),
+            'requests_per_second': round(len(samples) / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            'queries_per_request': round(statistics.mean(queries for _, _, _, queries in samples), 2),
+        }
@@ -0,0 +1,65 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tasks.benchmarking import benchmark_database, seed_tasks
+from tasks.models import User, Task
+
+
+class Command(BaseCommand):
+    """Benchmark reading every task of a user through the JSON API a page at a time."""
+
+    help = 'Records the latency, queries per page and rows per second of paging through the task list API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=100000, help='Number of tasks the user can see')
+        parser.add_argument('--limit', type=int, default=1000, help='Number of tasks per page')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            seed_tasks(0, user_count=10, team_count=0)
+            user = User.objects.first()
+            Task.objects.bulk_create([
+                Task(task_name=f'Task {index}', task_description='API benchmark task', assigned=user)
+                for index in range(options['tasks'])
+            ], batch_size=5000)
+            client = Client()
+            client.force_login(user)
+            report = self.measure(client, f"{reverse('api_task_list')}?limit={options['limit']}")
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.stdout.write(
+                f"{report['rows']} rows in {report['pages']} pages: first page {report['first_page_ms']} ms, "
+                f"total {report['total_ms']} ms, {report['rows_per_second']} rows/s, "
+                f"at most {report['max_queries_per_page']} queries per page"
+            )
+
+    def measure(self, client, url):
+        """Follow the next links from url to the last page, timing each page and counting its queries."""
+
+        rows, timings, query_counts = 0, [], []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                page = client.get(url).json()
+                timings.append(time.perf_counter() - start)
+            query_counts.append(len(queries))
+            rows += len(page['results'])
+            url = page['next']
+        total = sum(timings)
+        return {
+            'rows': rows,
+            'pages': len(timings),
+            'first_page_ms': round(timings[0] * 1000, 3),
+            'total_ms': round(total * 1000, 3),
+            'rows_per_second': round(rows / total),
+            'max_queries_per_page': max(query_counts),
+        }
@@ -0,0 +1,160 @@
+import asyncio
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.util import setup_testing_defaults
+
+from django.core.cache import caches
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from tasks.benchmarking import benchmark_database, seed_tasks
+from tasks.models import User, Team
+
+
+class Command(BaseCommand):
+    """Benchmark the read-heavy pages under many simultaneous clients, over ASGI and over WSGI."""
+
+    help = 'Compares requests per second and p99 latency of the ASGI and WSGI applications under concurrent load'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=50, help='Simultaneous clients')
+        parser.add_argument('--requests', type=int, default=20, help='Requests made by each client, one at a time')
+        parser.add_argument('--threads', type=int, default=8, help='Worker threads serving the WSGI application')
+        parser.add_argument('--tasks', type=int, default=5000, help='Tasks to seed')
+        parser.add_argument('--cold', action='store_true', help='Drop cached pages before every request')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        from task_manager.asgi import application as asgi_application
+        from task_manager.wsgi import application as wsgi_application
+
+        with benchmark_database():
+            seed_tasks(options['tasks'], user_count=max(options['clients'], 20), team_count=10)
+            clients = self.clients(options['clients'])
+            report = {
+                'wsgi': self.run_wsgi(wsgi_application, clients, options),
+                'asgi': asyncio.run(self.run_asgi(asgi_application, clients, options)),
+            }
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            for name, result in report.items():
+                self.stdout.write(
+                    f"{name}: {result['requests_per_second']} requests/s, p50 {result['p50_ms']} ms, "
+                    f"p99 {result['p99_ms']} ms, {result['errors']} errors"
+                )
+
+    def clients(self, count):
+        """Return (session cookie, page URLs) for each client, each logged in as a different team member."""
+
+        users = list(User.objects.filter(team__isnull=False).distinct().order_by('id')[:count])
+        clients = []
+        for index in range(count):
+            user = users[index % len(users)]
+            team = Team.objects.filter(team_members=user).order_by('id').first()
+            client = Client()
+            client.force_login(user)
+            cookie = f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+            urls = [
+                reverse('dashboard'),
+                reverse('my_tasks'),
+                reverse('my_teams'),
+                reverse('team_info', kwargs={'team_id': team.id}),
+            ]
+            clients.append((cookie, urls))
+        return clients
+
+    def run_wsgi(self, application, clients, options):
+        """Run each client in its own thread, its requests served by a pool of worker threads."""
+
+        latencies, statuses = [], []
+        with ThreadPoolExecutor(max_workers=options['threads']) as workers:
+            def client_loop(cookie, urls):
+                for index in range(options['requests']):
+                    start = time.perf_counter()
+                    status = workers.submit(self.wsgi_request, application, urls[index % len(urls)], cookie, options['cold']).result()
+                    latencies.append(time.perf_counter() - start)
+                    statuses.append(status)
+
+            threads = [threading.Thread(target=client_loop, args=client) for client in clients]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+        return self.summarise(latencies, statuses, elapsed)
+
+    async def run_asgi(self, application, clients, options):
+        """Run each client as a task on one event loop, calling the ASGI application directly."""
+
+        latencies, statuses = [], []
+
+        async def client_loop(cookie, urls):
+            for index in range(options['requests']):
+                start = time.perf_counter()
+                statuses.append(await self.asgi_request(application, urls[index % len(urls)], cookie, options['cold']))
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(*client) for client in clients))
+        return self.summarise(latencies, statuses, time.perf_counter() - start)
+
+    def wsgi_request(self, application, path, cookie, cold):
+        if cold:
+            caches[settings.PAGE_CACHE].clear()
+        environ = {'PATH_INFO': path, 'HTTP_COOKIE': cookie}
+        setup_testing_defaults(environ)
+        status = []
+        body = application(environ, lambda response_status, headers, exc_info=None: status.append(response_status))
+        try:
+            for _ in body:
+                pass
+        finally:
+            body.close()
+        return int(status[0].split()[0])
+
+    async def asgi_request(self, application, path, cookie, cold):
+        if cold:
+            caches[settings.PAGE_CACHE].clear()
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+            'headers': [(b'host', b'testserver'), (b'cookie', cookie.encode())],
+            'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+        }
+        finished = asyncio.Event()
+        received = []
+        status = []
+
+        async def receive():
+            if not received:
+                received.append(True)
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await finished.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+            elif not message.get('more_body'):
+                finished.set()
+
+        await application(scope, receive, send)
+        return status[0]
+
+    def summarise(self, latencies, statuses, elapsed):
+        percentiles = statistics.quantiles(latencies, n=100)
+        return {
+            'requests': len(latencies),
+            'requests_per_second': round(len(latencies) / elapsed, 1),
+            'p50_ms': round(statistics.median(latencies) * 1000, 3),
+            'p99_ms': round(percentiles[98] * 1000, 3),
+            'errors': sum(status != 200 for status in statuses),
+        }
@@ -0,0 +1,69 @@
+import json
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from tasks.benchmarking import benchmark_database, seed_tasks
+from tasks.models import User, Task, Team
+
+
+class Command(BaseCommand):
+    """Benchmark streaming a large team's tasks in each export format."""
+
+    help = 'Records the time to first byte, total time and peak memory of exporting a team of tasks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=100000, help='Number of tasks in the team')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            seed_tasks(0, user_count=10, team_count=0)
+            user = User.objects.first()
+            team = Team.objects.create(team_name='Export team', team_description='Team for the export benchmark')
+            team.team_members.add(user)
+            Task.objects.bulk_create([
+                Task(task_name=f'Task {index}', task_description='Export benchmark task', assigned=user, team=team)
+                for index in range(options['tasks'])
+            ], batch_size=5000)
+            client = Client()
+            client.force_login(user)
+            url = reverse('export_team_tasks', kwargs={'team_id': team.id})
+            report = {
+                'csv': self.measure(client, url, {'format': 'csv'}),
+                'ndjson': self.measure(client, url, {'format': 'ndjson'}),
+                'csv_gzip': self.measure(client, url, {'format': 'csv', 'gzip': '1'}),
+            }
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            for name, result in report.items():
+                self.stdout.write(
+                    f"{name}: first byte {result['first_byte_ms']} ms, total {result['total_ms']} ms, "
+                    f"{result['bytes']} bytes, peak memory {result['peak_memory_kb']} KB"
+                )
+
+    def measure(self, client, url, params):
+        """Stream an export, recording when its first chunk arrived and the peak memory allocated."""
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        response = client.get(url, params)
+        chunks = iter(response.streaming_content)
+        size = len(next(chunks))
+        first_byte = time.perf_counter() - start
+        for chunk in chunks:
+            size += len(chunk)
+        total = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {
+            'first_byte_ms': round(first_byte * 1000, 3),
+            'total_ms': round(total * 1000, 3),
+            'bytes': size,
+            'peak_memory_kb': round(peak / 1024),
+        }
@@ -0,0 +1,86 @@
+import json
+
+from django.core.cache import caches
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tasks.benchmarking import benchmark_database, seed_tasks, time_call
+from tasks.models import User, Task, Team
+
+
+class Command(BaseCommand):
+    """Benchmark rendering a large team page with the fragment cache cold and warm."""
+
+    help = 'Renders a team page listing every one of its tasks with the fragment cache cold and then warm'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=5000, help='Number of tasks in the team')
+        parser.add_argument('--members', type=int, default=50, help='Number of team members')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed renders per run')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            seed_tasks(0, user_count=options['members'], team_count=0)
+            team = self.seed_team(options['tasks'])
+            client = Client()
+            client.force_login(team.team_members.first())
+            url = reverse('team_info', kwargs={'team_id': team.id})
+
+            # Show the whole team on one page, so every row goes through the fragment cache.
+            with override_settings(TASKS_PER_PAGE=options['tasks']):
+                report = {
+                    'cold': self.measure(client, url, options['repeat'], cold=True),
+                    'warm': self.measure(client, url, options['repeat'], cold=False),
+                }
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            for label, result in report.items():
+                latency = result['latency']
+                self.stdout.write(
+                    f"{label}: median {latency['median_ms']} ms (min {latency['min_ms']} ms), "
+                    f"{result['queries']} queries"
+                )
+
+    def seed_team(self, task_count):
+        """Return a team of every seeded user, with task_count tasks assigned round robin."""
+
+        members = list(User.objects.all())
+        team = Team.objects.create(team_name='Benchmark team', team_description='Team for the fragment benchmark')
+        team.team_members.add(*members)
+        Task.objects.bulk_create([
+            Task(
+                task_name=f'Task {index}',
+                task_description='Fragment benchmark task',
+                assigned=members[index % len(members)],
+                team=team,
+            )
+            for index in range(task_count)
+        ], batch_size=1000)
+        return team
+
+    def measure(self, client, url, repeat, cold):
+        """Return the render latency and query count of the team page."""
+
+        cache = caches[settings.PAGE_CACHE]
+        cache.clear()
+        if not cold:
+            client.get(url)
+
+        def render():
+            if cold:
+                cache.clear()
+            response = client.get(url)
+            assert response.status_code == 200, response.status_code
+
+        # The query log is capped, and seeding may have filled it.
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            render()
+        return {'latency': time_call(render, repeat=repeat), 'queries': len(queries)}
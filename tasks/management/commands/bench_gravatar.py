@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from libgravatar import Gravatar
+
+from tasks.benchmarking import time_call
+from tasks.models import User, gravatar_cache
+
+
+class Command(BaseCommand):
+    """Benchmark the per-row cost of rendering user gravatars."""
+
+    help = 'Compares the per-row cost of gravatar URLs with and without the gravatar cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Number of users rendered per run')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        users = [User(email=f'member{index}@example.org') for index in range(rows)]
+
+        def uncached():
+            for user in users:
+                Gravatar(user.email).get_image(size=120, default='mp')
+                Gravatar(user.email).get_image(size=60, default='mp')
+
+        def cached():
+            for user in users:
+                user.gravatar()
+                user.mini_gravatar()
+
+        gravatar_cache.clear()
+        cached()
+        for label, function in (('uncached', uncached), ('cached', cached)):
+            latency = time_call(function, repeat=options['repeat'])
+            per_row = latency['median_ms'] * 1000 / rows
+            self.stdout.write(f'{label}: {latency["median_ms"]} ms per {rows} rows, {per_row:.2f} us per row')
@@ -0,0 +1,49 @@
+import logging
+import time
+
+from django.core.cache import caches
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from tasks.benchmarking import benchmark_database, seed_tasks
+from tasks.models import User
+
+
+class Command(BaseCommand):
+    """Benchmark worker CPU time under a simulated credential stuffing burst."""
+
+    help = 'Compares the CPU time spent on a burst of bad log ins with and without throttling'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--attempts', type=int, default=200, help='Log in attempts in the burst')
+        parser.add_argument('--usernames', type=int, default=5, help='Usernames targeted by the burst')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            seed_tasks(0, user_count=options['usernames'], team_count=0)
+            usernames = list(User.objects.values_list('username', flat=True)[:options['usernames']])
+            unthrottled = {name: (10 ** 9, 1) for name in settings.LOGIN_THROTTLE_RATES}
+            with override_settings(LOGIN_THROTTLE_RATES=unthrottled):
+                self.report('unthrottled', self.burst(usernames, options['attempts']))
+            self.report('throttled', self.burst(usernames, options['attempts']))
+
+    def burst(self, usernames, attempts):
+        """Send bad log ins round robin over usernames, returning CPU and wall time and rejections."""
+
+        caches[settings.LOGIN_THROTTLE_CACHE].clear()
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+        client = Client()
+        url = reverse('log_in')
+        rejected = 0
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        for attempt in range(attempts):
+            username = usernames[attempt % len(usernames)]
+            response = client.post(url, {'username': username, 'password': 'NotThePassword1'})
+            rejected += response.status_code == 429
+        return time.process_time() - cpu_start, time.perf_counter() - wall_start, rejected
+
+    def report(self, label, result):
+        cpu, wall, rejected = result
+        self.stdout.write(f'{label}: {cpu:.2f}s CPU, {wall:.2f}s wall, {rejected} attempts rejected before hashing')
@@ -0,0 +1,77 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from tasks.benchmarking import benchmark_database, seed_tasks, time_call
+from tasks.models import User, Task, Team
+
+
+class Command(BaseCommand):
+    """Benchmark the task list querysets with and without the composite indexes."""
+
+    help = 'Records the query plan and latency of the task list querysets, before and after indexing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=200000, help='Number of tasks to seed')
+        parser.add_argument('--users', type=int, default=1000, help='Number of users to seed')
+        parser.add_argument('--teams', type=int, default=200, help='Number of teams to seed')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per queryset')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        with benchmark_database() as connection:
+            self.stdout.write(f"Seeding {options['tasks']} tasks...")
+            seed_tasks(options['tasks'], user_count=options['users'], team_count=options['teams'])
+            querysets = self.view_querysets()
+
+            indexes = Task._meta.indexes
+            with connection.schema_editor() as schema_editor:
+                for index in indexes:
+                    schema_editor.remove_index(Task, index)
+            before = self.measure(querysets, options['repeat'])
+
+            with connection.schema_editor() as schema_editor:
+                for index in indexes:
+                    schema_editor.add_index(Task, index)
+            after = self.measure(querysets, options['repeat'])
+
+        report = {name: {'before': before[name], 'after': after[name]} for name in querysets}
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.write_report(report)
+
+    def view_querysets(self):
+        """Return the querysets issued by the task list views, for the busiest user and team."""
+
+        user = User.objects.annotate(task_count=Count('assigned')).order_by('-task_count').first()
+        team = Team.objects.annotate(task_count=Count('task')).order_by('-task_count').first()
+        return {
+            'my_tasks': lambda: Task.objects.filter(assigned=user, team__isnull=True),
+            'team_info': lambda: Task.objects.filter(team=team),
+            'my_tasks_by_status': lambda: Task.objects.filter(assigned=user, status='in_progress').order_by('due'),
+            'team_info_by_status': lambda: Task.objects.filter(team=team, status='in_progress').order_by('due'),
+            'my_tasks_page': lambda: Task.objects.filter(assigned=user, team__isnull=True).order_by('due', 'id')[:26],
+            'team_info_page': lambda: Task.objects.filter(team=team).order_by('due', 'id')[:26],
+        }
+
+    def measure(self, querysets, repeat):
+        """Return the query plan and latency of each queryset."""
+
+        results = {}
+        for name, make_queryset in querysets.items():
+            results[name] = {
+                'plan': make_queryset().explain(),
+                'latency': time_call(lambda: list(make_queryset()), repeat=repeat),
+            }
+        return results
+
+    def write_report(self, report):
+        for name, result in report.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for label in ('before', 'after'):
+                latency = result[label]['latency']
+                self.stdout.write(f"  {label}: median {latency['median_ms']} ms (min {latency['min_ms']} ms)")
+                for line in result[label]['plan'].splitlines():
+                    self.stdout.write(f'    {line}')
@@ -0,0 +1,86 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count, Q
+
+from tasks.api import visible_tasks
+from tasks.benchmarking import benchmark_database, seed_tasks, time_call
+from tasks.models import User, Task
+from tasks.search import SEARCH_SQL, match_expression, search_tasks
+
+RARE_WORD = 'zeppelin'
+
+
+class Command(BaseCommand):
+    """Benchmark full-text task search against a LIKE scan of task names and descriptions."""
+
+    help = 'Records the query plan and latency of task search with the full-text index and with icontains'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=1000000, help='Number of tasks to seed')
+        parser.add_argument('--users', type=int, default=1000, help='Number of users to seed')
+        parser.add_argument('--teams', type=int, default=200, help='Number of teams to seed')
+        parser.add_argument('--rare', type=int, default=20, help='Tasks given a word no other task has')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per search')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            self.stdout.write(f"Seeding {options['tasks']} tasks...")
+            seed_tasks(options['tasks'], user_count=options['users'], team_count=options['teams'])
+            user = User.objects.annotate(task_count=Count('assigned')).order_by('-task_count').first()
+            # Renaming goes through the index triggers like any other write.
+            rare_ids = visible_tasks(user).order_by('?').values_list('id', flat=True)[:options['rare']]
+            Task.objects.filter(id__in=list(rare_ids)).update(task_name=f'Inspect the {RARE_WORD}')
+            common_word = Task.objects.values_list('task_name', flat=True).first().split()[0].lower()
+            report = {
+                term: {
+                    'fts': self.measure_fts(user, term, options['repeat']),
+                    'like': self.measure_like(user, term, options['repeat']),
+                }
+                for term in (common_word, RARE_WORD)
+            }
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.write_report(report)
+
+    def measure_fts(self, user, term, repeat):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'EXPLAIN QUERY PLAN {SEARCH_SQL}', [match_expression(term, user), settings.SEARCH_RESULTS],
+            )
+            plan = '\n'.join(row[-1] for row in cursor.fetchall())
+        return {
+            'results': len(search_tasks(user, term)),
+            'plan': plan,
+            'latency': time_call(lambda: search_tasks(user, term), repeat=repeat),
+        }
+
+    def measure_like(self, user, term, repeat):
+        """Time the icontains filter search would otherwise need, with the same visibility and limit."""
+
+        def make_queryset():
+            matches = visible_tasks(user).filter(Q(task_name__icontains=term) | Q(task_description__icontains=term))
+            return matches.select_related('assigned', 'team').order_by('due', 'id')[:settings.SEARCH_RESULTS]
+
+        return {
+            'results': len(make_queryset()),
+            'plan': make_queryset().explain(),
+            'latency': time_call(lambda: list(make_queryset()), repeat=repeat),
+        }
+
+    def write_report(self, report):
+        for term, result in report.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(term))
+            for label in ('fts', 'like'):
+                latency = result[label]['latency']
+                self.stdout.write(
+                    f"  {label}: {result[label]['results']} results, "
+                    f"median {latency['median_ms']} ms (min {latency['min_ms']} ms)"
+                )
+                for line in result[label]['plan'].splitlines():
+                    self.stdout.write(f'    {line}')
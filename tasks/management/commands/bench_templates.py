@@ -0,0 +1,90 @@
+import json
+
+from django.core.cache import caches
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.test import Client
+from django.urls import reverse
+
+from tasks.benchmarking import benchmark_database, seed_tasks, time_call
+from tasks.models import User, Task, Team
+from tasks.warmup import warm_up_templates
+
+
+class Command(BaseCommand):
+    """Benchmark rendering each page with the template cache cold and warm."""
+
+    help = 'Compares the render time of each page before and after the templates are compiled'
+
+    logged_out_pages = ('home', 'log_in', 'sign_up')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Timed renders per page')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            seed_tasks(200, user_count=20, team_count=5)
+            user = User.objects.filter(team__isnull=False).first()
+            team = Team.objects.filter(team_members=user).first()
+            task = Task.objects.filter(assigned=user).first()
+            pages = self.pages(task, team)
+            client = Client()
+
+            report = {}
+            for name, url in pages.items():
+                if name in self.logged_out_pages:
+                    client.logout()
+                else:
+                    client.force_login(user)
+                report[name] = {
+                    'cold': time_call(lambda: self.render(client, url, cold=True), repeat=options['repeat']),
+                    'warm': self.measure_warm(client, url, options['repeat']),
+                }
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            for name, result in report.items():
+                self.stdout.write(
+                    f"{name}: cold median {result['cold']['median_ms']} ms, "
+                    f"warm median {result['warm']['median_ms']} ms"
+                )
+
+    def pages(self, task, team):
+        """Return the URL of every page, by URL name."""
+
+        return {
+            'home': reverse('home'),
+            'log_in': reverse('log_in'),
+            'sign_up': reverse('sign_up'),
+            'dashboard': reverse('dashboard'),
+            'profile': reverse('profile'),
+            'password': reverse('password'),
+            'my_tasks': reverse('my_tasks'),
+            'my_teams': reverse('my_teams'),
+            'create_task': reverse('create_task'),
+            'create_team': reverse('create_team'),
+            'edit_task': reverse('edit_task', kwargs={'task_id': task.id}),
+            'delete_task': reverse('delete_task', kwargs={'task_id': task.id}),
+            'team_info': reverse('team_info', kwargs={'team_id': team.id}),
+            'edit_team': reverse('edit_team', kwargs={'team_id': team.id}),
+            'delete_team': reverse('delete_team', kwargs={'team_id': team.id}),
+            'create_team_task': reverse('create_team_task', kwargs={'team_id': team.id}),
+        }
+
+    def measure_warm(self, client, url, repeat):
+        warm_up_templates()
+        return time_call(lambda: self.render(client, url, cold=False), repeat=repeat)
+
+    def render(self, client, url, cold):
+        """Request a page, first dropping compiled templates if cold."""
+
+        caches[settings.PAGE_CACHE].clear()
+        if cold:
+            for engine in engines.all():
+                for loader in engine.engine.template_loaders:
+                    loader.reset()
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.status_code)
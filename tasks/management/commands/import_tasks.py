@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.importing import ImportFileError, import_tasks
+from tasks.models import User, Team
+
+
+class Command(BaseCommand):
+    """Import tasks into a team from a CSV file."""
+
+    help = 'Creates tasks in a team from a CSV file, reporting the rows that were rejected'
+
+    def add_arguments(self, parser):
+        parser.add_argument('team_id', type=int, help='Team to create the tasks in')
+        parser.add_argument('path', help="CSV file to read, or '-' for standard input")
+        parser.add_argument('--user', required=True, help='Username of the team member assigned rows without an assignee')
+
+    def handle(self, *args, **options):
+        team = Team.objects.filter(id=options['team_id']).first()
+        if team is None:
+            raise CommandError(f"Team {options['team_id']} does not exist.")
+        user = team.team_members.filter(username=options['user']).first()
+        if user is None:
+            raise CommandError(f"{options['user']} is not a member of team {team.id}.")
+
+        try:
+            if options['path'] == '-':
+                report = import_tasks(team, sys.stdin, default_assignee=user)
+            else:
+                with open(options['path'], encoding='utf-8-sig', newline='') as lines:
+                    report = import_tasks(team, lines, default_assignee=user)
+        except (ImportFileError, OSError) as error:
+            raise CommandError(str(error))
+
+        for row in report.errors:
+            for field, messages in row['errors'].items():
+                self.stdout.write(f"line {row['line']}: {field}: {' '.join(messages)}")
+        style = self.style.WARNING if report.errors else self.style.SUCCESS
+        self.stdout.write(style(f'Imported {report.created} tasks, rejected {report.rejected} rows.'))
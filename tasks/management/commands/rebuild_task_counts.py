@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.models import TaskStatusCount
+
+
+class Command(BaseCommand):
+    """Rebuild the task status counters from the task table."""
+
+    help = 'Rebuilds the per-user and per-team task status counters, or checks them for drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Report drift without rebuilding')
+
+    def handle(self, *args, **options):
+        drift = TaskStatusCount.objects.drift()
+        for (user_id, team_id), (stored, expected) in sorted(drift.items(), key=str):
+            owner = f'user {user_id}' if user_id is not None else f'team {team_id}'
+            self.stdout.write(f'{owner}: stored {stored}, expected {expected}')
+
+        if options['check']:
+            if drift:
+                raise CommandError(f'{len(drift)} task status counters have drifted.')
+            self.stdout.write(self.style.SUCCESS('Task status counters are up to date.'))
+            return
+
+        TaskStatusCount.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt task status counters, {len(drift)} had drifted.'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.search import index_drift, rebuild_index
+
+
+class Command(BaseCommand):
+    """Rebuild the full-text search index of tasks from the task table."""
+
+    help = 'Rebuilds the full-text search index of task names and descriptions, or checks it for drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Report drift without rebuilding')
+
+    def handle(self, *args, **options):
+        drift = index_drift()
+
+        if options['check']:
+            if drift:
+                raise CommandError(f'{drift} tasks are missing from or out of date in the search index.')
+            self.stdout.write(self.style.SUCCESS('Task search index is up to date.'))
+            return
+
+        rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt task search index, {drift} tasks had drifted.'))
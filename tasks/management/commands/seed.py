@@ -1,11 +1,15 @@
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 
 from tasks.models import User, Task, Team
 
 import pytz
+import time
 from faker import Faker
 from random import randint, random
-from datetime import datetime, timedelta
+from collections import defaultdict
+from datetime import date, datetime, timedelta
 import random
 
 user_fixtures = [
@@ -56,19 +60,35 @@ class Command(BaseCommand):
     TASK_COUNT = 200
     TEAM_COUNT = 100
 
+    BATCH_SIZE = 5000
+
     help = 'Seeds the database with sample data'
 
-    def __init__(self):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
         self.faker = Faker('en_GB')
 
+    def add_arguments(self, parser):
+        parser.add_argument('--bulk', action='store_true', help='Seed with batched bulk inserts, for large data sets')
+        parser.add_argument('--users', type=int, default=self.USER_COUNT, help='Number of users to seed')
+        parser.add_argument('--teams', type=int, default=self.TEAM_COUNT, help='Number of teams to seed')
+        parser.add_argument('--tasks', type=int, default=self.TASK_COUNT, help='Number of tasks to seed')
+        parser.add_argument('--batch-size', type=int, default=self.BATCH_SIZE, help='Rows per bulk insert')
+
     def handle(self, *args, **options):
+        self.USER_COUNT = options['users']
+        self.TEAM_COUNT = options['teams']
+        self.TASK_COUNT = options['tasks']
+        if options['bulk']:
+            BulkSeeder(self, options['batch_size']).seed()
+            return
         self.create_users()
         self.users = User.objects.all()
         self.create_teams()
         self.teams= Team.objects.all()
         self.create_tasks()
         self.tasks= Task.objects.all()
-        
+
 
     def create_users(self):
         self.try_create_superuser()
@@ -224,3 +244,102 @@ def create_email(first_name, last_name):
     return first_name + '.' + last_name + '@example.org'
 
 
+class BulkSeeder:
+    """Seed a large data set with batched bulk inserts.
+
+    The password is hashed once for every user, and random users and teams
+    are picked from in-memory id lists rather than from the database.
+    """
+
+    def __init__(self, command, batch_size):
+        self.command = command
+        self.faker = command.faker
+        self.batch_size = batch_size
+
+    def seed(self):
+        self.command.try_create_superuser()
+        self.command.generate_user_fixtures()
+        self.password = make_password(Command.DEFAULT_PASSWORD)
+        self.seed_users()
+        self.user_ids = list(User.objects.values_list('id', flat=True))
+        self.seed_teams()
+        self.seed_tasks()
+
+    def seed_users(self):
+        first_names = [self.faker.first_name() for _ in range(100)]
+        last_names = [self.faker.last_name() for _ in range(100)]
+        start = User.objects.count()
+
+        def make_user(index):
+            first_name = random.choice(first_names)
+            last_name = random.choice(last_names)
+            username = create_username(first_name, last_name)[:20] + str(index)
+            email = f'{first_name}.{last_name}.{index}@example.org'
+            return User(
+                username=username, email=email, password=self.password,
+                first_name=first_name, last_name=last_name,
+            )
+
+        self.insert_batches('users', User, max(self.command.USER_COUNT - start, 0), make_user, offset=start)
+
+    def seed_teams(self):
+        start = Team.objects.count()
+        self.insert_batches(
+            'teams', Team, max(self.command.TEAM_COUNT - start, 0),
+            lambda index: Team(team_name=f'Team {index}', team_description=self.faker.text(max_nb_chars=200)),
+            offset=start,
+        )
+        self.team_ids = list(Team.objects.values_list('id', flat=True))
+
+        Membership = Team.team_members.through
+        new_team_ids = self.team_ids[start:]
+        memberships = []
+        for team_id in new_team_ids:
+            members = random.sample(self.user_ids, min(randint(1, 10), len(self.user_ids)))
+            memberships.extend(Membership(team_id=team_id, user_id=user_id) for user_id in members)
+        self.insert_batches(
+            'memberships', Membership, len(memberships), lambda index: memberships[index], ignore_conflicts=True,
+        )
+
+        # Tasks are only assigned to members of their team, so the members of teams seeded by earlier runs
+        # are read back too, and teams without any members get no tasks.
+        self.team_members = defaultdict(list)
+        members = Membership.objects.values_list('team_id', 'user_id').iterator(chunk_size=self.batch_size)
+        for team_id, user_id in members:
+            self.team_members[team_id].append(user_id)
+        self.team_ids = list(self.team_members)
+
+    def seed_tasks(self):
+        statuses = [status for status, _ in Task.STATUS_CHOICES]
+        today = date.today()
+        sentences = [self.faker.sentence(nb_words=4)[:50] for _ in range(100)]
+        paragraphs = [self.faker.paragraph(nb_sentences=3)[:200] for _ in range(100)]
+        start = Task.objects.count()
+
+        def make_task(index):
+            team_id = random.choice(self.team_ids) if self.team_ids and random.random() < 0.5 else None
+            return Task(
+                task_name=random.choice(sentences),
+                task_description=random.choice(paragraphs),
+                due=today + timedelta(days=randint(1, 365)),
+                assigned_id=random.choice(self.team_members[team_id] if team_id is not None else self.user_ids),
+                status=random.choice(statuses),
+                team_id=team_id,
+            )
+
+        self.insert_batches('tasks', Task, max(self.command.TASK_COUNT - start, 0), make_task)
+
+    def insert_batches(self, label, model, count, make_row, offset=0, ignore_conflicts=False):
+        """Insert count rows of a model in batches, reporting progress and throughput."""
+
+        start_time = time.perf_counter()
+        for batch_start in range(0, count, self.batch_size):
+            batch_end = min(batch_start + self.batch_size, count)
+            rows = [make_row(offset + index) for index in range(batch_start, batch_end)]
+            with transaction.atomic():
+                model.objects.bulk_create(rows, batch_size=self.batch_size, ignore_conflicts=ignore_conflicts)
+            rate = batch_end / max(time.perf_counter() - start_time, 1e-9)
+            self.command.stdout.write(f"Seeding {label} {batch_end}/{count} ({rate:,.0f} rows/sec)", ending='\r')
+        elapsed = time.perf_counter() - start_time
+        rate = count / elapsed if elapsed else 0
+        self.command.stdout.write(f"Seeded {count} {label} in {elapsed:.1f}s ({rate:,.0f} rows/sec).      ")
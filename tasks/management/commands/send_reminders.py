@@ -0,0 +1,36 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tasks.reminders import ReminderCheckpoint, send_reminders
+
+
+class Command(BaseCommand):
+    """Email every assignee a digest of their overdue and soon due tasks."""
+
+    help = "Sends each user a digest of their overdue and soon due tasks, carrying on from where an interrupted run of the day stopped"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.REMINDER_DAYS_AHEAD, help='Days ahead a task counts as due soon')
+        parser.add_argument('--date', type=date.fromisoformat, help='Day to send the reminders of (YYYY-MM-DD), today by default')
+        parser.add_argument('--checkpoint', default=settings.REMINDER_CHECKPOINT, help='File recording the progress of the run')
+        parser.add_argument('--restart', action='store_true', help="Ignore the day's checkpoint and send every digest again")
+
+    def handle(self, *args, **options):
+        today = options['date'] or timezone.localdate()
+        try:
+            checkpoint = ReminderCheckpoint(options['checkpoint'], today)
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Cannot read the checkpoint {options["checkpoint"]}: {error}')
+        if options['restart']:
+            checkpoint.clear()
+        if checkpoint.done:
+            self.stdout.write(self.style.WARNING(f'Reminders for {today} were already sent, use --restart to send them again.'))
+            return
+        if checkpoint.after is not None:
+            self.stdout.write(f'Resuming after user {checkpoint.after}.')
+
+        sent = send_reminders(checkpoint, today=today, days_ahead=options['days'])
+        self.stdout.write(self.style.SUCCESS(f'Sent {sent} reminder digests.'))
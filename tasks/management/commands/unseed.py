@@ -1,15 +1,34 @@
 from django.core.management.base import BaseCommand, CommandError
+from tasks.deletion import delete_in_batches, delete_tasks, delete_teams
 from tasks.models import User, Task, Team
 
 class Command(BaseCommand):
     """Build automation command to unseed the database."""
     
-    help = 'Seeds the database with sample data'
+    help = 'Removes the sample data from the database'
+
+    BATCH_SIZE = 5000
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=self.BATCH_SIZE, help='Rows deleted per batch')
 
     def handle(self, *args, **options):
         """Unseed the database."""
-        
-        Task.objects.all().delete()
-        Team.objects.all().delete()
-        User.objects.filter(is_staff=False).delete()
-        
\ No newline at end of file
+
+        batch_size = options['batch_size']
+        self.delete('tasks', Task.objects.all(), delete_tasks, batch_size)
+        self.delete('teams', Team.objects.all(), delete_teams, batch_size)
+        self.delete(
+            'users',
+            User.objects.filter(is_staff=False),
+            lambda user_ids: User.objects.filter(pk__in=user_ids).delete(),
+            batch_size,
+        )
+
+    def delete(self, label, queryset, delete, batch_size):
+        """Delete queryset in batches, reporting progress."""
+
+        total = queryset.count()
+        report = lambda deleted: self.stdout.write(f"Deleting {label} {deleted}/{total}", ending='\r')
+        deleted = delete_in_batches(queryset, delete, batch_size=batch_size, progress=report)
+        self.stdout.write(f"Deleted {deleted} {label}.          ")
@@ -0,0 +1,258 @@
+"""Per-view request metrics, exposed in the Prometheus text format.
+
+MetricsMiddleware records, for each request, the name of the URL pattern it
+resolved to, how long the response took, its status code and size, and
+the number and time of the SQL queries run for it.  Queries are counted by
+an execute wrapper added to every database connection, which adds to the
+tally of the request being handled in the current context, so the queries
+that async views run in worker threads are counted too.
+
+Recording takes no locks: each thread adds to its own statistics, which
+only that thread writes to, and a scrape adds up the statistics of every
+thread.  When a thread exits its statistics are merged into those of the
+exited threads, so servers that start a thread per connection do not
+leave a growing list of them behind.  Streamed responses are timed until the response starts, and
+their size is not recorded.
+"""
+import itertools
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+PREFIX = 'task_manager'
+
+# Upper bounds, in seconds, of the request duration histogram buckets.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# View label of requests that did not resolve to a URL pattern.
+UNRESOLVED = '<unresolved>'
+
+EXPOSITION_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# [queries, seconds] of the SQL run for the request being handled.
+_request_queries = ContextVar('request_queries', default=None)
+
+
+class ViewStats:
+    """Totals of the requests to one view handled by one thread."""
+
+    __slots__ = ('buckets', 'duration', 'requests', 'statuses', 'queries', 'query_seconds', 'sized', 'size')
+
+    def __init__(self):
+        self.buckets = [0] * (len(DURATION_BUCKETS) + 1)
+        self.duration = 0.0
+        self.requests = 0
+        self.statuses = {}
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.sized = 0
+        self.size = 0
+
+    def add(self, other):
+        for index, count in enumerate(other.buckets):
+            self.buckets[index] += count
+        self.duration += other.duration
+        self.requests += other.requests
+        for status, count in other.statuses.copy().items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+        self.queries += other.queries
+        self.query_seconds += other.query_seconds
+        self.sized += other.sized
+        self.size += other.size
+
+
+class ThreadStats:
+    """The {view: ViewStats} of one thread, kept in the thread's local storage."""
+
+    __slots__ = ('views', '__weakref__')
+
+    def __init__(self):
+        self.views = {}
+
+
+class Registry:
+    """Request metrics of every thread, by view."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._threads = {}
+        self._exited = {}
+        self._tokens = itertools.count()
+        self._lock = threading.Lock()
+
+    def _thread_stats(self):
+        thread_stats = getattr(self._local, 'stats', None)
+        if thread_stats is None:
+            # The only lock taken while recording, once per thread.
+            thread_stats = self._local.stats = ThreadStats()
+            token = next(self._tokens)
+            with self._lock:
+                self._threads[token] = thread_stats.views
+            # Thread local storage is released when its thread exits.
+            weakref.finalize(thread_stats, self._thread_exited, token, thread_stats.views)
+        return thread_stats.views
+
+    def _thread_exited(self, token, stats):
+        with self._lock:
+            del self._threads[token]
+            for view, view_stats in stats.items():
+                self._exited.setdefault(view, ViewStats()).add(view_stats)
+
+    def record(self, view, seconds, status, queries, query_seconds, size=None):
+        """Record a response to a request for view that took seconds, with its SQL totals and size in bytes."""
+
+        stats = self._thread_stats()
+        view_stats = stats.get(view)
+        if view_stats is None:
+            view_stats = stats[view] = ViewStats()
+        view_stats.buckets[bisect_left(DURATION_BUCKETS, seconds)] += 1
+        view_stats.duration += seconds
+        view_stats.requests += 1
+        view_stats.statuses[status] = view_stats.statuses.get(status, 0) + 1
+        view_stats.queries += queries
+        view_stats.query_seconds += query_seconds
+        if size is not None:
+            view_stats.sized += 1
+            view_stats.size += size
+
+    def totals(self):
+        """Return {view: ViewStats} adding up the metrics of every thread."""
+
+        totals = {}
+        with self._lock:
+            threads = list(self._threads.values())
+            for view, view_stats in self._exited.items():
+                totals.setdefault(view, ViewStats()).add(view_stats)
+        for stats in threads:
+            for view, view_stats in stats.copy().items():
+                totals.setdefault(view, ViewStats()).add(view_stats)
+        return totals
+
+    def clear(self):
+        with self._lock:
+            for stats in self._threads.values():
+                stats.clear()
+            self._exited.clear()
+
+    def exposition(self):
+        """Return the metrics in the Prometheus text format."""
+
+        totals = sorted(self.totals().items())
+        lines = []
+
+        def metric(name, metric_type, help_text, samples):
+            lines.append(f'# HELP {PREFIX}_{name} {help_text}')
+            lines.append(f'# TYPE {PREFIX}_{name} {metric_type}')
+            for suffix, labels, value in samples:
+                label_text = ','.join(f'{key}="{_escape(value)}"' for key, value in labels)
+                lines.append(f'{PREFIX}_{name}{suffix}{{{label_text}}} {_number(value)}')
+
+        metric('http_request_duration_seconds', 'histogram', 'Time taken to respond to requests, by view.', [
+            sample
+            for view, stats in totals
+            for sample in _histogram_samples(view, stats)
+        ])
+        metric('http_responses_total', 'counter', 'Responses sent, by view and status code.', [
+            ('', [('view', view), ('status', str(status))], count)
+            for view, stats in totals
+            for status, count in sorted(stats.statuses.items())
+        ])
+        metric('db_queries_total', 'counter', 'SQL queries run while handling requests, by view.', [
+            ('', [('view', view)], stats.queries) for view, stats in totals
+        ])
+        metric('db_query_duration_seconds_total', 'counter', 'Time spent running SQL queries for requests, by view.', [
+            ('', [('view', view)], stats.query_seconds) for view, stats in totals
+        ])
+        metric('http_response_size_bytes', 'summary', 'Size of the responses that were not streamed, by view.', [
+            sample
+            for view, stats in totals
+            for sample in [('_sum', [('view', view)], stats.size), ('_count', [('view', view)], stats.sized)]
+        ])
+        return '\n'.join(lines) + '\n'
+
+
+def _histogram_samples(view, stats):
+    cumulative = 0
+    for bound, count in zip((*DURATION_BUCKETS, '+Inf'), stats.buckets):
+        cumulative += count
+        yield '_bucket', [('view', view), ('le', str(bound))], cumulative
+    yield '_sum', [('view', view)], stats.duration
+    yield '_count', [('view', view)], stats.requests
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+registry = Registry()
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper adding each query to the tally of the request being handled."""
+
+    tally = _request_queries.get()
+    if tally is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        tally[0] += 1
+        tally[1] += time.perf_counter() - start
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """connection_created receiver adding record_query to each database connection, once."""
+
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class MetricsMiddleware:
+    """Record the latency, status, size and SQL totals of every response, by URL pattern name."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        tally = [0, 0.0]
+        token = _request_queries.set(tally)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self._record(request, response, time.perf_counter() - start, tally)
+        return response
+
+    async def __acall__(self, request):
+        tally = [0, 0.0]
+        token = _request_queries.set(tally)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self._record(request, response, time.perf_counter() - start, tally)
+        return response
+
+    def _record(self, request, response, seconds, tally):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match is not None else UNRESOLVED
+        size = None if response.streaming else len(response.content)
+        registry.record(view, seconds, response.status_code, tally[0], tally[1], size)
@@ -0,0 +1,84 @@
+# Generated by Django 4.2.6 on 2026-10-18 11:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+STATUSES = ['not_started', 'in_progress', 'done']
+
+
+def _increment(owner_column, key):
+    """Return SQL adding the task row NEW to the counter of its owner."""
+
+    counts = ', '.join(f'{status} = {status} + (NEW.status = \'{status}\')' for status in STATUSES)
+    zeros = ', '.join('0' for _ in STATUSES)
+    return f"""
+        INSERT OR IGNORE INTO tasks_taskstatuscount ({owner_column}, {', '.join(STATUSES)})
+            SELECT NEW.{key}, {zeros} WHERE NEW.{key} IS NOT NULL;
+        UPDATE tasks_taskstatuscount SET {counts} WHERE {owner_column} = NEW.{key};"""
+
+
+def _decrement(owner_column, key):
+    """Return SQL removing the task row OLD from the counter of its owner."""
+
+    counts = ', '.join(f'{status} = MAX({status} - (OLD.status = \'{status}\'), 0)' for status in STATUSES)
+    return f"""
+        UPDATE tasks_taskstatuscount SET {counts} WHERE {owner_column} = OLD.{key};"""
+
+
+CREATE_TRIGGERS = [
+    f"""CREATE TRIGGER tasks_task_counts_insert AFTER INSERT ON tasks_task
+    BEGIN{_increment('user_id', 'assigned_id')}{_increment('team_id', 'team_id')}
+    END;""",
+    f"""CREATE TRIGGER tasks_task_counts_update AFTER UPDATE OF assigned_id, team_id, status ON tasks_task
+    BEGIN{_decrement('user_id', 'assigned_id')}{_decrement('team_id', 'team_id')}{_increment('user_id', 'assigned_id')}{_increment('team_id', 'team_id')}
+    END;""",
+    f"""CREATE TRIGGER tasks_task_counts_delete AFTER DELETE ON tasks_task
+    BEGIN{_decrement('user_id', 'assigned_id')}{_decrement('team_id', 'team_id')}
+    END;""",
+]
+
+DROP_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS tasks_task_counts_insert;",
+    "DROP TRIGGER IF EXISTS tasks_task_counts_update;",
+    "DROP TRIGGER IF EXISTS tasks_task_counts_delete;",
+]
+
+
+def _populate(owner_column, key):
+    """Return SQL counting the existing tasks of every owner."""
+
+    counts = ', '.join(f"SUM(status = '{status}')" for status in STATUSES)
+    return f"""
+        INSERT INTO tasks_taskstatuscount ({owner_column}, {', '.join(STATUSES)})
+            SELECT {key}, {counts} FROM tasks_task WHERE {key} IS NOT NULL GROUP BY {key};"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_task_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskStatusCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('not_started', models.PositiveIntegerField(default=0)),
+                ('in_progress', models.PositiveIntegerField(default=0)),
+                ('done', models.PositiveIntegerField(default=0)),
+                ('team', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='task_counts', to='tasks.team')),
+                ('user', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='task_counts', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='taskstatuscount',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(('team__isnull', True), ('user__isnull', False)), models.Q(('team__isnull', False), ('user__isnull', True)), _connector='OR'), name='task_count_user_xor_team'),
+        ),
+        migrations.RunSQL(
+            sql=[_populate('user_id', 'assigned_id'), _populate('team_id', 'team_id'), *CREATE_TRIGGERS],
+            reverse_sql=DROP_TRIGGERS,
+        ),
+    ]
@@ -0,0 +1,64 @@
+from importlib import import_module
+
+from django.db import migrations, models
+import django.utils.timezone
+
+# SQLite adds these columns by rebuilding the tables, which drops the task
+# counter triggers, so they are created again afterwards.
+task_counts = import_module('tasks.migrations.0004_taskstatuscount')
+
+
+# Adding or removing a member changes what a team's pages show, so it
+# counts as modifying the team, however the membership row is written.
+TOUCH_TEAM = "UPDATE tasks_team SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now') WHERE id = {row}.team_id;"
+
+CREATE_TRIGGERS = [
+    f"""CREATE TRIGGER tasks_team_members_insert AFTER INSERT ON tasks_team_team_members
+    BEGIN
+        {TOUCH_TEAM.format(row='NEW')}
+    END;""",
+    f"""CREATE TRIGGER tasks_team_members_delete AFTER DELETE ON tasks_team_team_members
+    BEGIN
+        {TOUCH_TEAM.format(row='OLD')}
+    END;""",
+]
+
+DROP_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS tasks_team_members_insert;",
+    "DROP TRIGGER IF EXISTS tasks_team_members_delete;",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0004_taskstatuscount"),
+    ]
+
+    operations = [
+        migrations.RunSQL(migrations.RunSQL.noop, reverse_sql=task_counts.CREATE_TRIGGERS),
+        migrations.AddField(
+            model_name="task",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="team",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["assigned", "team", "updated_at"], name="task_assigned_team_updated_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["team", "updated_at"], name="task_team_updated_idx"),
+        ),
+        migrations.RunSQL(task_counts.CREATE_TRIGGERS, reverse_sql=task_counts.DROP_TRIGGERS),
+        migrations.RunSQL(CREATE_TRIGGERS, reverse_sql=DROP_TRIGGERS),
+    ]
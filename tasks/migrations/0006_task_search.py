@@ -0,0 +1,68 @@
+from django.db import migrations
+
+
+# Words naming a task's owners, its assignee and its team, indexed alongside
+# its text so searches are limited to the tasks a user can see by the
+# full-text index itself, rather than by looking up every matching task.
+OWNERS = "trim(coalesce('user' || {row}.assigned_id, '') || coalesce(' team' || {row}.team_id, ''))"
+
+# Full-text index of task names and descriptions, kept in sync by triggers so
+# every write path, including bulk inserts, updates and deletes, is indexed in
+# the same transaction as the write.  It keeps its own copy of the text,
+# which highlights and snippets are made from, as an external content table
+# would need a view over tasks_task, and SQLite cannot rebuild a table that a
+# view refers to.
+CREATE_TABLE = """
+    CREATE VIRTUAL TABLE tasks_task_search USING fts5(
+        task_name, task_description, owners,
+        tokenize='porter unicode61 remove_diacritics 2'
+    );"""
+
+POPULATE = f"""
+    INSERT INTO tasks_task_search(rowid, task_name, task_description, owners)
+        SELECT id, task_name, task_description, {OWNERS.format(row='tasks_task')} FROM tasks_task;"""
+
+INDEX_NEW = f"""
+        INSERT INTO tasks_task_search(rowid, task_name, task_description, owners)
+            VALUES (NEW.id, NEW.task_name, NEW.task_description, {OWNERS.format(row='NEW')});"""
+
+UNINDEX_OLD = """
+        DELETE FROM tasks_task_search WHERE rowid = OLD.id;"""
+
+# SQLite drops these whenever it rebuilds tasks_task to alter a column, so
+# later migrations doing that must create them again, as 0005 does for the
+# task counter triggers.
+CREATE_TRIGGERS = [
+    f"""CREATE TRIGGER tasks_task_search_insert AFTER INSERT ON tasks_task
+    BEGIN{INDEX_NEW}
+    END;""",
+    f"""CREATE TRIGGER tasks_task_search_update
+    AFTER UPDATE OF task_name, task_description, assigned_id, team_id ON tasks_task
+    WHEN OLD.task_name IS NOT NEW.task_name OR OLD.task_description IS NOT NEW.task_description
+        OR OLD.assigned_id IS NOT NEW.assigned_id OR OLD.team_id IS NOT NEW.team_id
+    BEGIN{UNINDEX_OLD}{INDEX_NEW}
+    END;""",
+    f"""CREATE TRIGGER tasks_task_search_delete AFTER DELETE ON tasks_task
+    BEGIN{UNINDEX_OLD}
+    END;""",
+]
+
+DROP_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS tasks_task_search_insert;",
+    "DROP TRIGGER IF EXISTS tasks_task_search_update;",
+    "DROP TRIGGER IF EXISTS tasks_task_search_delete;",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0005_updated_at"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[CREATE_TABLE, POPULATE, *CREATE_TRIGGERS],
+            reverse_sql=[*DROP_TRIGGERS, "DROP TABLE IF EXISTS tasks_task_search;"],
+        ),
+    ]
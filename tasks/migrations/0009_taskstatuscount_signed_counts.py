@@ -0,0 +1,79 @@
+from django.db import migrations, models
+
+
+STATUSES = ['not_started', 'in_progress', 'done']
+
+
+def _increment(owner_column, key):
+    """Return SQL adding the task row NEW to the counter of its owner."""
+
+    counts = ', '.join(f'{status} = {status} + (NEW.status = \'{status}\')' for status in STATUSES)
+    zeros = ', '.join('0' for _ in STATUSES)
+    return f"""
+        INSERT OR IGNORE INTO tasks_taskstatuscount ({owner_column}, {', '.join(STATUSES)})
+            SELECT NEW.{key}, {zeros} WHERE NEW.{key} IS NOT NULL;
+        UPDATE tasks_taskstatuscount SET {counts} WHERE {owner_column} = NEW.{key};"""
+
+
+def _decrement(owner_column, key, clamp):
+    """Return SQL removing the task row OLD from the counter of its owner, stopping at zero if clamp is set."""
+
+    if clamp:
+        counts = ', '.join(f'{status} = MAX({status} - (OLD.status = \'{status}\'), 0)' for status in STATUSES)
+    else:
+        counts = ', '.join(f'{status} = {status} - (OLD.status = \'{status}\')' for status in STATUSES)
+    return f"""
+        UPDATE tasks_taskstatuscount SET {counts} WHERE {owner_column} = OLD.{key};"""
+
+
+def _create_triggers(clamp):
+    """Return SQL creating the triggers that keep the counters up to date."""
+
+    return [
+        f"""CREATE TRIGGER tasks_task_counts_insert AFTER INSERT ON tasks_task
+        BEGIN{_increment('user_id', 'assigned_id')}{_increment('team_id', 'team_id')}
+        END;""",
+        f"""CREATE TRIGGER tasks_task_counts_update AFTER UPDATE OF assigned_id, team_id, status ON tasks_task
+        BEGIN{_decrement('user_id', 'assigned_id', clamp)}{_decrement('team_id', 'team_id', clamp)}{_increment('user_id', 'assigned_id')}{_increment('team_id', 'team_id')}
+        END;""",
+        f"""CREATE TRIGGER tasks_task_counts_delete AFTER DELETE ON tasks_task
+        BEGIN{_decrement('user_id', 'assigned_id', clamp)}{_decrement('team_id', 'team_id', clamp)}
+        END;""",
+    ]
+
+
+DROP_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS tasks_task_counts_insert;",
+    "DROP TRIGGER IF EXISTS tasks_task_counts_update;",
+    "DROP TRIGGER IF EXISTS tasks_task_counts_delete;",
+]
+
+
+class Migration(migrations.Migration):
+    """Let task status counters go below zero, so a drifted counter shows up rather than being clamped."""
+
+    dependencies = [
+        ("tasks", "0008_task_open_due_index"),
+    ]
+
+    # SQLite alters a column by copying the table, which fails while triggers refer to it,
+    # so the triggers are dropped first and created again afterwards.
+    operations = [
+        migrations.RunSQL(sql=DROP_TRIGGERS, reverse_sql=_create_triggers(clamp=True)),
+        migrations.AlterField(
+            model_name="taskstatuscount",
+            name="not_started",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="taskstatuscount",
+            name="in_progress",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="taskstatuscount",
+            name="done",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunSQL(sql=_create_triggers(clamp=False), reverse_sql=DROP_TRIGGERS),
+    ]
@@ -0,0 +1,43 @@
+from importlib import import_module
+
+from django.db import migrations
+
+team_members = import_module('tasks.migrations.0005_updated_at')
+
+
+# Django writes updated_at with microseconds, but SQLite's clock only has
+# milliseconds, so the trigger's time can sort before a save made in the
+# same millisecond.  The team is moved to whichever is later of now and a
+# microsecond after its current updated_at, so it never goes backwards and
+# always changes.  Times are counted in microseconds since the epoch and
+# written in Django's own format.
+NOW = "(strftime('%s', 'now') * 1000000 + CAST(substr(strftime('%f', 'now'), 4) AS INTEGER) * 1000)"
+UPDATED_AT = "(strftime('%s', substr(updated_at, 1, 19)) * 1000000 + CAST(substr(updated_at || '000000', 21, 6) AS INTEGER))"
+TOUCHED = f"max({NOW}, {UPDATED_AT} + 1)"
+TOUCH_TEAM = f"""UPDATE tasks_team SET updated_at =
+            strftime('%Y-%m-%d %H:%M:%S', {TOUCHED} / 1000000, 'unixepoch') || printf('.%06d', {TOUCHED} % 1000000)
+        WHERE id = {{row}}.team_id;"""
+
+CREATE_TRIGGERS = [
+    f"""CREATE TRIGGER tasks_team_members_insert AFTER INSERT ON tasks_team_team_members
+    BEGIN
+        {TOUCH_TEAM.format(row='NEW')}
+    END;""",
+    f"""CREATE TRIGGER tasks_team_members_delete AFTER DELETE ON tasks_team_team_members
+    BEGIN
+        {TOUCH_TEAM.format(row='OLD')}
+    END;""",
+]
+
+
+class Migration(migrations.Migration):
+    """Keep the updated_at of a team moving forward when its members change."""
+
+    dependencies = [
+        ("tasks", "0009_taskstatuscount_signed_counts"),
+    ]
+
+    operations = [
+        migrations.RunSQL(team_members.DROP_TRIGGERS, reverse_sql=team_members.CREATE_TRIGGERS),
+        migrations.RunSQL(CREATE_TRIGGERS, reverse_sql=team_members.DROP_TRIGGERS),
+    ]
@@ -1,11 +1,54 @@
+from collections import OrderedDict
+from threading import Lock
+
 from django.core.validators import RegexValidator, MinValueValidator
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, Q
 from django.utils import timezone
 from libgravatar import Gravatar
 
 
+class GravatarCache:
+    """Least recently used cache of gravatar URLs, keyed by email and size."""
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._urls = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, email, size):
+        """Return the gravatar URL for an email, computing it on a cache miss."""
+
+        key = (email, size)
+        with self._lock:
+            url = self._urls.get(key)
+            if url is not None:
+                self._urls.move_to_end(key)
+                return url
+        url = Gravatar(email).get_image(size=size, default='mp')
+        with self._lock:
+            self._urls[key] = url
+            if len(self._urls) > self.maxsize:
+                self._urls.popitem(last=False)
+        return url
+
+    def invalidate(self, email):
+        """Forget the URLs computed for an email, at every size."""
+
+        with self._lock:
+            for key in [key for key in self._urls if key[0] == email]:
+                del self._urls[key]
+
+    def clear(self):
+        with self._lock:
+            self._urls.clear()
+
+
+gravatar_cache = GravatarCache()
+
+
 class User(AbstractUser):
     """Model used for user authentication, and team member related information."""
 
@@ -26,6 +69,23 @@ class User(AbstractUser):
 
         ordering = ['last_name', 'first_name']
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the email the user was loaded with."""
+
+        user = super().from_db(db, field_names, values)
+        user._loaded_email = user.__dict__.get('email')
+        return user
+
+    def save(self, *args, **kwargs):
+        """Save the user, dropping cached gravatars of a replaced email."""
+
+        super().save(*args, **kwargs)
+        loaded_email = getattr(self, '_loaded_email', None)
+        if loaded_email is not None and loaded_email != self.email:
+            gravatar_cache.invalidate(loaded_email)
+        self._loaded_email = self.email
+
     def full_name(self):
         """Return a string containing the user's full name."""
 
@@ -34,9 +94,7 @@ class User(AbstractUser):
     def gravatar(self, size=120):
         """Return a URL to the user's gravatar."""
 
-        gravatar_object = Gravatar(self.email)
-        gravatar_url = gravatar_object.get_image(size=size, default='mp')
-        return gravatar_url
+        return gravatar_cache.get(self.email, size)
 
     def mini_gravatar(self):
         """Return a URL to a miniature version of the user's gravatar."""
@@ -47,6 +105,8 @@ class Team(models.Model):
     team_name = models.CharField(max_length=50)
     team_description = models.CharField(max_length=200)
     team_members = models.ManyToManyField(User)
+    # Also touched by triggers on the membership table (see migration 0010_team_updated_at_microseconds).
+    updated_at = models.DateTimeField(auto_now=True)
 
 
 class Task(models.Model):
@@ -63,3 +123,129 @@ class Task(models.Model):
     assigned = models.ForeignKey(User, on_delete=models.CASCADE, blank=True, null=True, related_name='assigned')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='not_started')
     team=models.ForeignKey(Team, on_delete=models.CASCADE, blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        """Model options."""
+
+        indexes = [
+            models.Index(fields=['assigned', 'team', 'due'], name='task_assigned_team_due_idx'),
+            models.Index(fields=['team', 'due'], name='task_team_due_idx'),
+            models.Index(fields=['team', 'status', 'due'], name='task_team_status_due_idx'),
+            models.Index(fields=['assigned', 'status', 'due'], name='task_assigned_status_due_idx'),
+            models.Index(fields=['assigned', 'team', 'updated_at'], name='task_assigned_team_updated_idx'),
+            models.Index(fields=['team', 'updated_at'], name='task_team_updated_idx'),
+            models.Index(fields=['assigned', 'team', 'status'], name='task_assigned_team_status_idx'),
+            models.Index(fields=['assigned', 'team', 'task_name'], name='task_assigned_team_name_idx'),
+            models.Index(fields=['team', 'status'], name='task_team_status_idx'),
+            models.Index(fields=['team', 'task_name'], name='task_team_name_idx'),
+            # Open tasks by assignee and due date, read by the reminder digests.
+            models.Index(
+                fields=['assigned', 'due'], condition=~Q(status='done'), name='task_open_assigned_due_idx',
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the assignee and team the task was loaded with, whose pages change if it moves."""
+
+        task = super().from_db(db, field_names, values)
+        task._loaded_owners = (task.__dict__.get('assigned_id'), task.__dict__.get('team_id'))
+        return task
+
+
+class TaskStatusCountManager(models.Manager):
+    """Manager for task status counters."""
+
+    def for_user(self, user):
+        """Return the task status counts of a user."""
+
+        return self.filter(user=user).first() or self.model(user=user)
+
+    def for_team(self, team):
+        """Return the task status counts of a team."""
+
+        return self.filter(team=team).first() or self.model(team=team)
+
+    async def afor_user(self, user):
+        """Async version of for_user()."""
+
+        return await self.filter(user=user).afirst() or self.model(user=user)
+
+    async def afor_team(self, team):
+        """Async version of for_team()."""
+
+        return await self.filter(team=team).afirst() or self.model(team=team)
+
+    def expected(self):
+        """Return the counters computed from scratch from the task table, keyed by (user id, team id)."""
+
+        aggregates = {
+            status: Count('id', filter=Q(status=status)) for status, _ in Task.STATUS_CHOICES
+        }
+        counters = {}
+        for owner in ('assigned', 'team'):
+            rows = Task.objects.filter(**{f'{owner}__isnull': False}).values(owner).annotate(**aggregates)
+            for row in rows.order_by():
+                key = (row[owner], None) if owner == 'assigned' else (None, row[owner])
+                counters[key] = {status: row[status] for status, _ in Task.STATUS_CHOICES}
+        return counters
+
+    def drift(self):
+        """Return the counters that differ from the task table, as {key: (stored, expected)}."""
+
+        zero = {status: 0 for status, _ in Task.STATUS_CHOICES}
+        expected = self.expected()
+        stored = {
+            (row.pop('user'), row.pop('team')): row
+            for row in self.values('user', 'team', *zero)
+        }
+        drift = {}
+        for key in expected.keys() | stored.keys():
+            if stored.get(key, zero) != expected.get(key, zero):
+                drift[key] = (stored.get(key, zero), expected.get(key, zero))
+        return drift
+
+    def rebuild(self):
+        """Replace every counter with one computed from the task table."""
+
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create([
+                self.model(user_id=user_id, team_id=team_id, **counts)
+                for (user_id, team_id), counts in self.expected().items()
+            ])
+
+
+class TaskStatusCount(models.Model):
+    """Number of tasks in each status, for a single assignee or a single team.
+
+    Rows are kept up to date by triggers on the task table (see migrations
+    0004_taskstatuscount and 0009_taskstatuscount_signed_counts), so every
+    write path, including bulk updates and deletes, is counted in the same
+    transaction as the write itself.  Counts are not clamped at zero, so a
+    counter that has drifted below the true count stays visibly wrong.
+    """
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, blank=True, null=True, related_name='task_counts')
+    team = models.OneToOneField(Team, on_delete=models.CASCADE, blank=True, null=True, related_name='task_counts')
+    not_started = models.IntegerField(default=0)
+    in_progress = models.IntegerField(default=0)
+    done = models.IntegerField(default=0)
+
+    objects = TaskStatusCountManager()
+
+    class Meta:
+        """Model options."""
+
+        constraints = [
+            models.CheckConstraint(
+                check=Q(user__isnull=False, team__isnull=True) | Q(user__isnull=True, team__isnull=False),
+                name='task_count_user_xor_team',
+            ),
+        ]
+
+    def total(self):
+        """Return the number of tasks counted."""
+
+        return sum(getattr(self, status) for status, _ in Task.STATUS_CHOICES)
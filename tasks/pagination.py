@@ -0,0 +1,249 @@
+"""Keyset (cursor) pagination for task lists."""
+import base64
+import binascii
+import json
+from urllib.parse import urlencode
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+def encode_cursor(data):
+    """Return an opaque, URL safe cursor for the given data."""
+
+    raw = json.dumps(data, separators=(',', ':'), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return the data stored in a cursor, or None if it is missing or malformed."""
+
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(raw)
+    except (binascii.Error, ValueError):
+        return None
+    if not isinstance(data, dict) or 'key' not in data:
+        return None
+    if not isinstance(data.get('id'), int) or not isinstance(data.get('position'), int):
+        return None
+    return data
+
+
+def _storable(value):
+    """Return whether a value, if it is an integer, fits in a 64 bit database integer."""
+
+    return not isinstance(value, int) or -2 ** 63 <= value < 2 ** 63
+
+
+def run_queries(queries):
+    """Drive a generator that yields querysets, sending back each one's rows, and return its result."""
+
+    rows = None
+    try:
+        while True:
+            rows = list(queries.send(rows))
+    except StopIteration as stop:
+        return stop.value
+
+
+class KeysetPaginator:
+    """Paginate a queryset by (key, id) without using OFFSET.
+
+    Each page is fetched with a range condition on an indexed key, so the cost
+    of a page does not depend on how deep into the list it is.  Rows with a
+    null key are always listed after the others.
+
+    state holds the filters and sort order the queryset was built from, as
+    query string values.  It is stored in every cursor, and a cursor made
+    for a different state is ignored, since its position means nothing in
+    a differently filtered or ordered list.  So is a cursor whose key is not
+    a valid value of the sort field.
+    """
+
+    def __init__(self, queryset, key='due', per_page=25, state=None):
+        self.queryset = queryset
+        self.descending = key.startswith('-')
+        self.field = key.lstrip('-')
+        self.model_field = queryset.model._meta.get_field(self.field)
+        self.nullable = self.model_field.null
+        self.per_page = per_page
+        self.state = state or {}
+
+    def get_page(self, query_params):
+        """Return the page selected by the 'after' or 'before' cursor in the query parameters."""
+
+        before = self._decode(query_params.get('before'))
+        if before is not None:
+            return KeysetPage(self, before, forward=False)
+        return KeysetPage(self, self._decode(query_params.get('after')), forward=True)
+
+    def _decode(self, cursor):
+        data = decode_cursor(cursor)
+        if data is None or data.get('state', {}) != self.state:
+            return None
+        if data['key'] is None and not self.nullable:
+            return None
+        if data['key'] is not None:
+            try:
+                data['key'] = self.model_field.to_python(data['key'])
+            except (ValidationError, TypeError, ValueError):
+                return None
+        if not (_storable(data['id']) and _storable(data['key'])):
+            return None
+        return data
+
+    def fetch(self, cursor, forward, limit):
+        """Return up to limit rows following (or preceding) the cursor, in display order."""
+
+        return run_queries(self.fetch_queries(cursor, forward, limit))
+
+    def fetch_queries(self, cursor, forward, limit):
+        """Generator behind fetch(), yielding each queryset to evaluate and returning the rows."""
+
+        if forward:
+            rows = yield from self._fetch_forward(cursor, limit)
+        else:
+            rows = yield from self._fetch_backward(cursor, limit)
+            rows.reverse()
+        return rows
+
+    def _fetch_forward(self, cursor, limit):
+        if cursor is None:
+            rows = yield from self._slice(self._not_null(), True, limit)
+        elif cursor['key'] is None:
+            return (yield from self._slice(self._null().filter(self._beyond_id(cursor, True)), True, limit))
+        else:
+            rows = yield from self._slice(self._not_null().filter(self._beyond(cursor, True)), True, limit)
+        if self.nullable and len(rows) < limit:
+            rows += yield from self._slice(self._null(), True, limit - len(rows))
+        return rows
+
+    def _fetch_backward(self, cursor, limit):
+        if cursor['key'] is not None:
+            return (yield from self._slice(self._not_null().filter(self._beyond(cursor, False)), False, limit))
+        rows = yield from self._slice(self._null().filter(self._beyond_id(cursor, False)), False, limit)
+        if len(rows) < limit:
+            rows += yield from self._slice(self._not_null(), False, limit - len(rows))
+        return rows
+
+    def _not_null(self):
+        if self.nullable:
+            return self.queryset.filter(**{f'{self.field}__isnull': False})
+        return self.queryset
+
+    def _null(self):
+        return self.queryset.filter(**{f'{self.field}__isnull': True})
+
+    def _slice(self, queryset, forward, limit):
+        ascending = forward != self.descending
+        prefix = '' if ascending else '-'
+        return (yield queryset.order_by(f'{prefix}{self.field}', f'{prefix}id')[:limit])
+
+    def _beyond(self, cursor, forward):
+        lookup = 'gt' if forward != self.descending else 'lt'
+        return (
+            Q(**{f'{self.field}__{lookup}': cursor['key']})
+            | Q(**{self.field: cursor['key'], f'id__{lookup}': cursor['id']})
+        )
+
+    def _beyond_id(self, cursor, forward):
+        lookup = 'gt' if forward != self.descending else 'lt'
+        return Q(**{f'id__{lookup}': cursor['id']})
+
+    def cursor_for(self, row, position):
+        """Return the cursor pointing at a row, either a model instance or a dict from values()."""
+
+        if isinstance(row, dict):
+            data = {'key': row[self.field], 'id': row['id'], 'position': position}
+        else:
+            data = {'key': getattr(row, self.field), 'id': row.id, 'position': position}
+        if self.state:
+            data['state'] = self.state
+        return encode_cursor(data)
+
+
+class KeysetPage:
+    """A single page of a keyset paginated queryset.
+
+    Rows are only fetched when the page is first iterated or inspected, so
+    a page rendered from a warm cached fragment makes no query.
+    """
+
+    def __init__(self, paginator, cursor, forward):
+        self.paginator = paginator
+        self.cursor = cursor
+        self.forward = forward
+
+    @cached_property
+    def _fetched(self):
+        """Return the rows of this page, and whether more rows lie in the direction fetched."""
+
+        return run_queries(self._fetch_queries())
+
+    def _fetch_queries(self):
+        per_page = self.paginator.per_page
+        rows = yield from self.paginator.fetch_queries(self.cursor, self.forward, per_page + 1)
+        if self.forward:
+            return rows[:per_page], len(rows) > per_page
+        if len(rows) > per_page:
+            return rows[1:], True
+        # Paging back reached the start of the list, so show a full first page instead.
+        self.cursor, self.forward = None, True
+        rows = yield from self.paginator.fetch_queries(None, True, per_page + 1)
+        return rows[:per_page], len(rows) > per_page
+
+    @property
+    def object_list(self):
+        return self._fetched[0]
+
+    @property
+    def offset(self):
+        """Return the number of rows listed before this page."""
+
+        rows, _ = self._fetched
+        if self.cursor is None:
+            return 0
+        if self.forward:
+            return self.cursor['position'] + 1
+        return max(self.cursor['position'] - len(rows), 0)
+
+    def has_next(self):
+        rows, has_more = self._fetched
+        return has_more if self.forward else bool(rows)
+
+    def has_previous(self):
+        _, has_more = self._fetched
+        return self.cursor is not None if self.forward else has_more
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def next_cursor(self):
+        rows = self.object_list
+        if not rows or not self.has_next():
+            return None
+        return self.paginator.cursor_for(rows[-1], self.offset + len(rows) - 1)
+
+    def previous_cursor(self):
+        rows = self.object_list
+        if not rows or not self.has_previous():
+            return None
+        return self.paginator.cursor_for(rows[0], self.offset)
+
+    def state_query(self):
+        """Return the paginator's state as a query string, for links to other pages to carry."""
+
+        return urlencode(self.paginator.state)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
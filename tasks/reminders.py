@@ -0,0 +1,136 @@
+"""Daily digest emails of each assignee's overdue and soon due tasks.
+
+Open tasks due by the end of the reminder window are read a chunk at a time
+in (assignee, due date) order from a partial index of open tasks, so each
+assignee's tasks arrive together and only one chunk is held in memory.
+Digests are sent over a single email connection, and after each one the
+assignee is recorded in a checkpoint file, so a run that is interrupted
+carries on from the next assignee when it is started again the same day.
+"""
+import json
+import os
+from datetime import timedelta
+from itertools import groupby
+from operator import attrgetter
+
+from django.conf import settings
+from django.core import mail
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from tasks.models import Task
+
+
+class ReminderCheckpoint:
+    """Progress of a day's reminder run, kept in a JSON file.
+
+    after is the id of the last assignee sent their digest, and done is set
+    once every digest has been sent.  A checkpoint left by an earlier day's
+    run is ignored.
+    """
+
+    def __init__(self, path, day):
+        self.path = os.fspath(path)
+        self.day = day.isoformat()
+        self.after = None
+        self.done = False
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return
+        if data.get('day') == self.day:
+            self.after = data.get('after')
+            self.done = data.get('done', False)
+
+    def record(self, user_id):
+        """Record that the assignee with user_id has been sent their digest."""
+
+        self.after = user_id
+        self._write()
+
+    def finish(self):
+        self.done = True
+        self._write()
+
+    def clear(self):
+        self.after = None
+        self.done = False
+        self._write()
+
+    def _write(self):
+        # Replace the file in one step, so an interrupted write cannot leave it half written.
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump({'day': self.day, 'after': self.after, 'done': self.done}, file)
+        os.replace(temporary, self.path)
+
+
+def reminder_tasks(today, days_ahead, after=None):
+    """Iterate over the open, assigned tasks due by days_ahead days after today, in (assignee, due, id) order.
+
+    Tasks are read settings.REMINDER_CHUNK_SIZE at a time, each chunk
+    continuing from the last task of the one before.  If after is given,
+    only the tasks of assignees with a greater id are included.
+    """
+
+    tasks = Task.objects.filter(
+        ~Q(status='done'), assigned__isnull=False, due__lte=today + timedelta(days=days_ahead),
+    ).select_related('assigned', 'team').only(
+        'task_name', 'due', 'status', 'assigned__username', 'assigned__email', 'assigned__first_name',
+        'team__team_name',
+    ).order_by('assigned_id', 'due', 'id')
+    position = Q() if after is None else Q(assigned__gt=after)
+    while True:
+        chunk = list(tasks.filter(position)[:settings.REMINDER_CHUNK_SIZE])
+        yield from chunk
+        if len(chunk) < settings.REMINDER_CHUNK_SIZE:
+            return
+        last = chunk[-1]
+        position = Q(assigned__gte=last.assigned_id) & (
+            Q(assigned__gt=last.assigned_id)
+            | Q(assigned=last.assigned_id, due__gt=last.due)
+            | Q(assigned=last.assigned_id, due=last.due, id__gt=last.id)
+        )
+
+
+def digest_message(user, tasks, today, connection=None):
+    """Return the reminder email to user listing their tasks, split into overdue and due soon."""
+
+    overdue = [task for task in tasks if task.due < today]
+    due_soon = [task for task in tasks if task.due >= today]
+    parts = []
+    if overdue:
+        parts.append(f'{len(overdue)} overdue')
+    if due_soon:
+        parts.append(f'{len(due_soon)} due soon')
+    body = render_to_string('emails/reminder_digest.txt', {
+        'user': user, 'overdue': overdue, 'due_soon': due_soon, 'today': today,
+    })
+    return mail.EmailMessage(
+        subject=f"Task reminder: {' and '.join(parts)}", body=body, to=[user.email], connection=connection,
+    )
+
+
+def send_reminders(checkpoint, today=None, days_ahead=None):
+    """Send each assignee not yet sent their digest today a reminder of their open tasks, returning the number sent.
+
+    Tasks due before today are listed as overdue, and those due within
+    days_ahead days (settings.REMINDER_DAYS_AHEAD by default) as due soon.
+    """
+
+    today = today or timezone.localdate()
+    days_ahead = settings.REMINDER_DAYS_AHEAD if days_ahead is None else days_ahead
+    sent = 0
+    with mail.get_connection() as connection:
+        tasks = reminder_tasks(today, days_ahead, after=checkpoint.after)
+        for user_id, user_tasks in groupby(tasks, key=attrgetter('assigned_id')):
+            user_tasks = list(user_tasks)
+            user = user_tasks[0].assigned
+            if user.email:
+                digest_message(user, user_tasks, today, connection).send()
+                sent += 1
+            checkpoint.record(user_id)
+    checkpoint.finish()
+    return sent
@@ -0,0 +1,118 @@
+"""Full-text search of task names and descriptions.
+
+Tasks are indexed in an SQLite FTS5 table kept in sync with the task table
+by triggers (see migration 0006_task_search).  Along with its text, each
+task is indexed under words naming its assignee and team, so a search only
+matches the tasks a user can see without looking up every task containing
+the words searched for.  Matches are ranked with BM25, weighting words in
+the name above words in the description, and highlighted in both.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from tasks.models import Task, Team
+
+WORD = re.compile(r'\w+')
+
+# Matched words are wrapped in these control characters by SQLite, and in
+# <mark> tags once the rest of the text has been escaped.
+MATCH_START = '\x02'
+MATCH_END = '\x03'
+
+SEARCH_SQL = """
+    SELECT rowid,
+        highlight(tasks_task_search, 0, char(2), char(3)),
+        snippet(tasks_task_search, 1, char(2), char(3), '…', 16)
+    FROM tasks_task_search
+    WHERE tasks_task_search MATCH %s
+    ORDER BY bm25(tasks_task_search, 10.0, 1.0, 0.0), rowid
+    LIMIT %s"""
+
+# The owner words of a task, as the triggers index them.
+OWNERS = "trim(coalesce('user' || tasks_task.assigned_id, '') || coalesce(' team' || tasks_task.team_id, ''))"
+
+DRIFT_SQL = f"""
+    SELECT (
+        SELECT count(*) FROM tasks_task
+        LEFT JOIN tasks_task_search ON tasks_task_search.rowid = tasks_task.id
+        WHERE tasks_task_search.rowid IS NULL
+            OR tasks_task_search.task_name IS NOT tasks_task.task_name
+            OR tasks_task_search.task_description IS NOT tasks_task.task_description
+            OR tasks_task_search.owners IS NOT {OWNERS}
+    ) + (
+        SELECT count(*) FROM tasks_task_search WHERE rowid NOT IN (SELECT id FROM tasks_task)
+    )"""
+
+REBUILD_SQL = [
+    "DELETE FROM tasks_task_search",
+    f"""INSERT INTO tasks_task_search(rowid, task_name, task_description, owners)
+        SELECT id, task_name, task_description, {OWNERS} FROM tasks_task""",
+    "INSERT INTO tasks_task_search(tasks_task_search) VALUES ('optimize')",
+]
+
+
+def match_expression(query, user):
+    """Return the FTS5 query for the tasks user can see containing every word of query.
+
+    Each word is quoted, so operators and punctuation typed by users are
+    matched literally, and the last word matches as a prefix, so results
+    appear while it is still being typed.  Returns None if query has no words.
+    """
+
+    terms = [f'"{word}"' for word in WORD.findall(query)]
+    if not terms:
+        return None
+    terms[-1] += '*'
+    team_ids = Team.team_members.through.objects.filter(user=user).values_list('team_id', flat=True)
+    owners = [f'"user{user.id}"', *(f'"team{team_id}"' for team_id in team_ids)]
+    return f"{{task_name task_description}} : ({' '.join(terms)}) AND owners : ({' OR '.join(owners)})"
+
+
+def search_tasks(user, query, limit=None):
+    """Return the tasks user can see that match query, best match first.
+
+    Each task has name_highlight and description_snippet attributes holding
+    safe HTML, with the matched words in <mark> tags.
+    """
+
+    match = match_expression(query, user)
+    if match is None:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(SEARCH_SQL, [match, limit or settings.SEARCH_RESULTS])
+        rows = cursor.fetchall()
+    tasks = Task.objects.select_related('assigned', 'team').in_bulk([task_id for task_id, _, _ in rows])
+    results = []
+    for task_id, name, description in rows:
+        task = tasks.get(task_id)
+        if task is not None:
+            task.name_highlight = mark_matches(name)
+            task.description_snippet = mark_matches(description)
+            results.append(task)
+    return results
+
+
+def mark_matches(text):
+    """Return text as safe HTML, with the matched words SQLite delimited wrapped in <mark> tags."""
+
+    return mark_safe(escape(text).replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>'))
+
+
+def index_drift():
+    """Return the number of tasks missing from, out of date in or deleted from the search index."""
+
+    with connection.cursor() as cursor:
+        cursor.execute(DRIFT_SQL)
+        return cursor.fetchone()[0]
+
+
+def rebuild_index():
+    """Replace the search index with one built from the task table."""
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        for statement in REBUILD_SQL:
+            cursor.execute(statement)
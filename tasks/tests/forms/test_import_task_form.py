@@ -0,0 +1,53 @@
+"""Unit tests of the import task form."""
+from datetime import date, timedelta
+from django.test import TestCase
+from tasks.forms import ImportTaskForm
+from tasks.models import User
+
+class ImportTaskFormTestCase(TestCase):
+    """Unit tests of the import task form."""
+
+    fixtures = ['tasks/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.members = {self.user.username: self.user}
+        self.form_input = {
+            'task_name': 'Imported task',
+            'task_description': 'This is an imported task.',
+            'due': (date.today() + timedelta(days=7)).isoformat(),
+            'assigned': '@johndoe',
+            'status': 'in_progress',
+        }
+
+    def test_form_accepts_valid_input(self):
+        form = ImportTaskForm(data=self.form_input, members=self.members)
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.save(commit=False).assigned, self.user)
+
+    def test_form_accepts_blank_assignee(self):
+        self.form_input['assigned'] = ''
+        form = ImportTaskForm(data=self.form_input, members=self.members)
+        self.assertTrue(form.is_valid())
+        self.assertIsNone(form.cleaned_data['assigned'])
+
+    def test_form_rejects_assignee_who_is_not_a_member(self):
+        self.form_input['assigned'] = '@janedoe'
+        form = ImportTaskForm(data=self.form_input, members=self.members)
+        self.assertFalse(form.is_valid())
+        self.assertIn('assigned', form.errors)
+
+    def test_form_rejects_unknown_status(self):
+        self.form_input['status'] = 'finished'
+        form = ImportTaskForm(data=self.form_input, members=self.members)
+        self.assertFalse(form.is_valid())
+
+    def test_form_rejects_past_due_date(self):
+        self.form_input['due'] = (date.today() - timedelta(days=1)).isoformat()
+        form = ImportTaskForm(data=self.form_input, members=self.members)
+        self.assertFalse(form.is_valid())
+
+    def test_form_does_not_query_for_assignee(self):
+        form = ImportTaskForm(data=self.form_input, members=self.members)
+        with self.assertNumQueries(0):
+            form.is_valid()
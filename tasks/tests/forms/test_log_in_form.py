@@ -1,5 +1,6 @@
 """Unit tests of the log in form."""
 from django import forms
+from django.core.cache import cache
 from django.test import TestCase
 from tasks.forms import LogInForm
 from tasks.models import User
@@ -11,6 +12,7 @@ class LogInFormTestCase(TestCase):
 
     def setUp(self):
         self.form_input = {'username': '@janedoe', 'password': 'Password123'}
+        cache.clear()
 
     def test_form_contains_required_fields(self):
         form = LogInForm()
@@ -1,4 +1,5 @@
 from django.contrib.auth.hashers import check_password
+from django.core.cache import cache
 from django.test import TestCase
 from tasks.models import User
 from tasks.forms import PasswordForm
@@ -9,6 +10,7 @@ class PasswordFormTestCase(TestCase):
 
     def setUp(self):
         self.user = User.objects.get(username='@johndoe')
+        cache.clear()
         self.form_input = {
             'password': 'Password123',
             'new_password': 'NewPassword123',
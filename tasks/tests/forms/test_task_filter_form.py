@@ -0,0 +1,63 @@
+"""Unit tests of the task filter form."""
+from datetime import date, timedelta
+from django.test import TestCase
+from tasks.forms import TaskFilterForm
+from tasks.models import User, Task
+
+class TaskFilterFormTestCase(TestCase):
+    """Unit tests of the task filter form."""
+
+    fixtures = ['tasks/tests/fixtures/default_user.json', 'tasks/tests/fixtures/other_users.json']
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.other_user = User.objects.get(username='@janedoe')
+        self.soon = date.today() + timedelta(days=1)
+        self.later = date.today() + timedelta(days=10)
+
+    def test_form_has_necessary_fields(self):
+        form = TaskFilterForm()
+        self.assertEqual(list(form.fields), ['status', 'due_after', 'due_before', 'assignee', 'sort'])
+
+    def test_form_without_assignee_filter(self):
+        form = TaskFilterForm({'assignee': '@janedoe'}, assignee=False)
+        self.assertNotIn('assignee', form.fields)
+        self.assertEqual(form.state, {})
+
+    def test_state_holds_non_default_values(self):
+        form = TaskFilterForm({
+            'status': 'done', 'due_after': self.soon.isoformat(), 'due_before': '', 'assignee': '@janedoe',
+            'sort': '-name',
+        })
+        self.assertEqual(form.state, {
+            'status': 'done', 'due_after': self.soon.isoformat(), 'assignee': '@janedoe', 'sort': '-name',
+        })
+        self.assertEqual(TaskFilterForm({'sort': 'due'}).state, {})
+
+    def test_invalid_values_are_ignored(self):
+        form = TaskFilterForm({'status': 'finished', 'due_after': 'tomorrow', 'sort': 'random', 'due_before': self.later})
+        self.assertEqual(form.state, {'due_before': self.later.isoformat()})
+        self.assertEqual(form.sort_key(), 'due')
+
+    def test_sort_key(self):
+        self.assertEqual(TaskFilterForm({}).sort_key(), 'due')
+        self.assertEqual(TaskFilterForm({'sort': '-status'}).sort_key(), '-status')
+        self.assertEqual(TaskFilterForm({'sort': 'name'}).sort_key(), 'task_name')
+
+    def test_filter(self):
+        done_soon = self._create_task('Done soon', self.soon, 'done', self.user)
+        done_later = self._create_task('Done later', self.later, 'done', self.other_user)
+        self._create_task('Started soon', self.soon, 'in_progress', self.user)
+        tasks = Task.objects.all()
+        self.assertEqual(set(TaskFilterForm({'status': 'done'}).filter(tasks)), {done_soon, done_later})
+        form = TaskFilterForm({'status': 'done', 'due_before': self.soon + timedelta(days=1)})
+        self.assertEqual(list(form.filter(tasks)), [done_soon])
+        form = TaskFilterForm({'status': 'done', 'due_after': self.soon + timedelta(days=1)})
+        self.assertEqual(list(form.filter(tasks)), [done_later])
+        self.assertEqual(list(TaskFilterForm({'assignee': '@janedoe'}).filter(tasks)), [done_later])
+        self.assertEqual(TaskFilterForm({}).filter(tasks).count(), 3)
+
+    def _create_task(self, name, due, status, assigned):
+        return Task.objects.create(
+            task_name=name, task_description='Filtered task', due=due, status=status, assigned=assigned,
+        )
@@ -1,6 +1,15 @@
+import re
+import time
+from collections import namedtuple
+
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from with_asserts.mixin import AssertHTMLMixin
 
+from tasks.models import User, Task, Team
+
 def reverse_with_next(url_name, next_url):
     """Extended version of reverse to generate URLs with redirects"""
     url = reverse(url_name)
@@ -8,6 +17,11 @@ def reverse_with_next(url_name, next_url):
     return url
 
 
+def without_csrf_tokens(content):
+    """Return page content with its CSRF tokens, which are masked afresh on every render, blanked out"""
+    return re.sub(rb'name="csrfmiddlewaretoken" value="[^"]*"', b'name="csrfmiddlewaretoken" value=""', content)
+
+
 class LogInTester:
     """Class support login in tests."""
  
@@ -34,4 +48,128 @@ class MenuTesterMixin(AssertHTMLMixin):
         """Check that no menu is present."""
         
         for url in self.menu_urls:
-            self.assertNotHTML(response, f'a[href="{url}"]')
\ No newline at end of file
+            self.assertNotHTML(response, f'a[href="{url}"]')
+
+
+Budget = namedtuple('Budget', ['queries', 'method', 'data', 'json'], defaults=['get', None, False])
+
+
+class QueryBudgetTesterMixin:
+    """Class to extend tests with query count budgets for views.
+
+    Each view is requested against seeded data sets of increasing size.  The
+    view fails its budget if it issues more queries than allowed, or if its
+    query count grows with the size of the data set.  A budget's view is
+    requested with its method and, for writes, the data its data function
+    returns for the data set, sent as JSON if json is set, so writes are
+    measured doing the write.  Wall time is only held
+    to the loose max_seconds, which catches a view that hangs without
+    failing on a slow machine; the bench command measures latency.
+    """
+
+    dataset_sizes = (2, 20)
+    max_seconds = 5
+
+    def seed_dataset(self, user, size):
+        """Give user personal tasks, teams and team members up to the given size."""
+
+        team = Team.objects.filter(team_members=user).order_by('id').first()
+        if team is None:
+            team = Team.objects.create(team_name='Budget team', team_description='Team for view budgets')
+            team.team_members.add(user)
+        members = list(team.team_members.all())
+        seeded_members = User.objects.filter(username__startswith='@budgetmember').count()
+        for index in range(seeded_members, seeded_members + size - len(members)):
+            member = User.objects.create_user(
+                f'@budgetmember{index}',
+                email=f'budgetmember{index}@example.org',
+                first_name='Budget',
+                last_name=f'Member{index}',
+            )
+            team.team_members.add(member)
+            members.append(member)
+
+        personal_count = Task.objects.filter(assigned=user, team__isnull=True).count()
+        Task.objects.bulk_create([
+            Task(task_name=f'Personal task {index}', task_description='Budget task', assigned=user)
+            for index in range(personal_count, size)
+        ])
+        team_task_count = Task.objects.filter(team=team).count()
+        Task.objects.bulk_create([
+            Task(
+                task_name=f'Team task {index}',
+                task_description='Budget task',
+                assigned=members[index % len(members)],
+                team=team,
+            )
+            for index in range(team_task_count, size)
+        ])
+        for index in range(Team.objects.filter(team_members=user).count(), size):
+            Team.objects.create(team_name=f'Budget team {index}', team_description='Budget team').team_members.add(user)
+
+        task_ids = list(Task.objects.filter(assigned=user, team__isnull=True).order_by('id').values_list('id', flat=True))
+        return {
+            'task_id': task_ids[0],
+            'task_ids': task_ids,
+            'team_task_ids': list(Task.objects.filter(team=team).values_list('id', flat=True)),
+            'team_id': team.id,
+            'user_id': members[-1].id,
+        }
+
+    def measure_view(self, url_name, url_kwargs, budget, dataset, user=None):
+        """Request a view as budget says, as user if given, and return its query count and wall time in seconds.
+
+        Cached pages are dropped first, so the view is always measured rendering from scratch.
+        """
+
+        caches['pages'].clear()
+        if user is not None:
+            self.client.force_login(user)
+        else:
+            self.client.logout()
+        url = reverse(url_name, kwargs=url_kwargs)
+        kwargs = {}
+        if budget.data is not None:
+            kwargs['data'] = budget.data(dataset)
+        if budget.json:
+            kwargs['content_type'] = 'application/json'
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = getattr(self.client, budget.method)(url, **kwargs)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - start
+        # A write answered with an error never reached the code its budget guards.
+        highest_status = 500 if budget.method == 'get' else 400
+        self.assertLess(
+            response.status_code, highest_status,
+            f'{budget.method.upper()} {url_name} failed with status {response.status_code}'
+        )
+        return len(queries), elapsed
+
+    def assert_view_within_budget(self, url_name, budget, user, logged_in=True, url_params=()):
+        """Check that a view stays within its budget at every data set size.
+
+        The data set is seeded for user, and url_params names the data set
+        ids ('task_id', 'team_id', 'user_id') passed to the URL.
+        """
+
+        name = f'{budget.method.upper()} {url_name}'
+        query_counts = []
+        for size in self.dataset_sizes:
+            dataset = self.seed_dataset(user, size)
+            url_kwargs = {param: dataset[param] for param in url_params}
+            query_count, elapsed = self.measure_view(url_name, url_kwargs, budget, dataset, user if logged_in else None)
+            self.assertLessEqual(
+                query_count, budget.queries,
+                f'{name} issued {query_count} queries with {size} rows, budget is {budget.queries}'
+            )
+            self.assertLessEqual(
+                elapsed, self.max_seconds,
+                f'{name} took {elapsed:.3f}s with {size} rows, limit is {self.max_seconds}s'
+            )
+            query_counts.append(query_count)
+        self.assertEqual(
+            query_counts[-1], query_counts[0],
+            f'{name} query count grew with the data set: {query_counts}'
+        )
@@ -68,6 +68,11 @@ class TaskModelTestCase(TestCase):
         self.task.status=''
         self._assert_task_is_invalid()
 
+    def test_saving_task_updates_updated_at(self):
+        updated_at = self.task.updated_at
+        self.task.save()
+        self.assertGreater(self.task.updated_at, updated_at)
+
     def _assert_task_is_valid(self):
         try:
             self.task.full_clean()
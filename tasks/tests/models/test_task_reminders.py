@@ -0,0 +1,140 @@
+"""Unit tests for the due date reminder digests."""
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+from unittest.mock import patch
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from tasks.models import User, Task, Team
+from tasks.reminders import ReminderCheckpoint, reminder_tasks, send_reminders
+
+@override_settings(REMINDER_DAYS_AHEAD=3)
+class TaskRemindersTestCase(TestCase):
+    """Unit tests for the due date reminder digests."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/teams.json'
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.other_user = User.objects.get(username='@janedoe')
+        self.team = Team.objects.get(id=1)
+        self.today = date(2026, 10, 18)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.checkpoint_path = os.path.join(directory.name, 'reminders.checkpoint')
+
+    def test_digests_list_overdue_and_upcoming_open_tasks_per_assignee(self):
+        self._create_task('Overdue report', -2, self.user, team=self.team)
+        self._create_task('Upcoming review', 3, self.user)
+        self._create_task('Finished task', -1, self.user, status='done')
+        self._create_task('Distant task', 4, self.user)
+        self._create_task('Undated task', None, self.user)
+        self._create_task('Other upcoming task', 0, self.other_user, status='in_progress')
+        self.assertEqual(self._send(), 2)
+        self.assertEqual(len(mail.outbox), 2)
+        digests = {message.to[0]: message for message in mail.outbox}
+        digest = digests[self.user.email]
+        self.assertEqual(digest.subject, 'Task reminder: 1 overdue and 1 due soon')
+        self.assertIn('- Overdue report (Test Team A), due 16 October 2026, Not Started', digest.body)
+        self.assertIn('- Upcoming review, due 21 October 2026, Not Started', digest.body)
+        self.assertLess(digest.body.index('overdue:'), digest.body.index('due soon:'))
+        for missing in ['Finished task', 'Distant task', 'Undated task', 'Other upcoming task']:
+            self.assertNotIn(missing, digest.body)
+        self.assertEqual(digests[self.other_user.email].subject, 'Task reminder: 1 due soon')
+
+    def test_digest_text_is_not_html_escaped(self):
+        self._create_task('Fix <b> & </b>', 1, self.user)
+        self._send()
+        self.assertIn('Fix <b> & </b>', mail.outbox[0].body)
+
+    @override_settings(REMINDER_CHUNK_SIZE=2)
+    def test_tasks_are_read_in_chunks_in_assignee_order(self):
+        for days in range(3):
+            self._create_task(f'Task {days}', days, self.other_user)
+            self._create_task(f'Task {days}', days, self.user)
+        with CaptureQueriesContext(connection) as queries:
+            tasks = list(reminder_tasks(self.today, 3))
+        self.assertEqual(len(queries), 4)
+        self.assertEqual(
+            [(task.assigned_id, task.due) for task in tasks],
+            sorted((task.assigned_id, task.due) for task in Task.objects.all()),
+        )
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                plan = ' '.join(row[-1] for row in cursor.fetchall())
+                self.assertIn('task_open_assigned_due_idx', plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+        self.assertEqual(self._send(), 2)
+        self.assertEqual(len(mail.outbox[0].body.splitlines()), len(mail.outbox[1].body.splitlines()))
+
+    def test_one_connection_is_used_for_every_digest(self):
+        self._create_task('Task', 1, self.user)
+        self._create_task('Task', 1, self.other_user)
+        with patch('tasks.reminders.mail.get_connection', wraps=mail.get_connection) as get_connection:
+            self._send()
+        get_connection.assert_called_once()
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_interrupted_run_resumes_after_the_last_digest_sent(self):
+        first, second = sorted([self.user, self.other_user], key=lambda user: user.id)
+        self._create_task('First task', 1, first)
+        self._create_task('Second task', 1, second)
+        send_messages = EmailBackend.send_messages
+        def fail_on_second_digest(backend, messages):
+            if mail.outbox:
+                raise ConnectionError('Mail server went away')
+            return send_messages(backend, messages)
+        with patch.object(EmailBackend, 'send_messages', fail_on_second_digest):
+            with self.assertRaises(ConnectionError):
+                self._send()
+        with open(self.checkpoint_path, encoding='utf-8') as file:
+            self.assertEqual(json.load(file), {'day': '2026-10-18', 'after': first.id, 'done': False})
+        self.assertEqual(self._send(), 1)
+        self.assertEqual([message.to for message in mail.outbox], [[first.email], [second.email]])
+        self.assertEqual(self._send(), 0)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_checkpoint_of_an_earlier_day_is_ignored(self):
+        ReminderCheckpoint(self.checkpoint_path, self.today - timedelta(days=1)).finish()
+        checkpoint = ReminderCheckpoint(self.checkpoint_path, self.today)
+        self.assertFalse(checkpoint.done)
+        self.assertIsNone(checkpoint.after)
+
+    def test_command_sends_resumes_and_restarts(self):
+        self._create_task('Task', 1, self.user)
+        arguments = ['send_reminders', '--date', '2026-10-18', '--checkpoint', self.checkpoint_path]
+        output = StringIO()
+        call_command(*arguments, stdout=output)
+        self.assertIn('Sent 1 reminder digests.', output.getvalue())
+        output = StringIO()
+        call_command(*arguments, stdout=output)
+        self.assertIn('already sent', output.getvalue())
+        call_command(*arguments, '--restart', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 2)
+
+    def _send(self):
+        checkpoint = ReminderCheckpoint(self.checkpoint_path, self.today)
+        if checkpoint.done:
+            return 0
+        return send_reminders(checkpoint, today=self.today)
+
+    def _create_task(self, name, days, assigned, team=None, status='not_started'):
+        return Task.objects.create(
+            task_name=name,
+            task_description='A task',
+            due=None if days is None else self.today + timedelta(days=days),
+            assigned=assigned,
+            team=team,
+            status=status,
+        )
@@ -0,0 +1,132 @@
+"""Unit tests for the full-text task search index."""
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from tasks.deletion import delete_tasks, delete_teams
+from tasks.models import User, Task, Team
+from tasks.search import index_drift, match_expression, rebuild_index, search_tasks
+
+class TaskSearchTestCase(TestCase):
+    """Unit tests for the full-text task search index."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/teams.json'
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.other_user = User.objects.get(username='@janedoe')
+        self.team = Team.objects.get(id=1)
+        self.other_team = Team.objects.create(team_name='Other team', team_description='Another team')
+
+    def test_match_expression_quotes_words_and_limits_them_to_visible_tasks(self):
+        self.assertEqual(
+            match_expression('quarterly rep', self.user),
+            f'{{task_name task_description}} : ("quarterly" "rep"*) AND owners : ("user{self.user.id}" OR "team{self.team.id}")',
+        )
+        self.assertIn('("NOT" "report" "OR" "x"*)', match_expression('NOT "report" OR (x*', self.user))
+        self.assertIsNone(match_expression(' "*" ', self.user))
+
+    def test_creating_tasks_indexes_them(self):
+        task = self._create_task('Write quarterly report')
+        self.assertEqual(self._search('quarterly'), [task])
+        self.assertEqual(self._search('reports'), [task])
+        self.assertEqual(self._search('quart'), [task])
+
+    def test_every_word_must_match(self):
+        task = self._create_task('Write quarterly report')
+        self._create_task('Write weekly report')
+        self.assertEqual(self._search('report quarterly'), [task])
+
+    def test_editing_tasks_reindexes_them(self):
+        task = self._create_task('Write quarterly report')
+        task.task_name = 'Book meeting room'
+        task.save()
+        self.assertEqual(self._search('quarterly'), [])
+        self.assertEqual(self._search('meeting'), [task])
+
+    def test_bulk_writes_are_indexed(self):
+        Task.objects.bulk_create([
+            Task(task_name=f'Imported task {index}', task_description='From a spreadsheet', assigned=self.user)
+            for index in range(3)
+        ])
+        self.assertEqual(len(self._search('spreadsheet')), 3)
+        Task.objects.filter(task_description='From a spreadsheet').update(task_description='From a form')
+        self.assertEqual(self._search('spreadsheet'), [])
+        self.assertEqual(len(self._search('form')), 3)
+        delete_tasks(Task.objects.values_list('id', flat=True)[:2])
+        self.assertEqual(len(self._search('form')), 1)
+        self.assertEqual(index_drift(), 0)
+
+    def test_deleting_a_team_unindexes_its_tasks(self):
+        self._create_task('Plan the offsite', team=self.other_team, assigned=self.other_user)
+        delete_teams([self.other_team.id])
+        self.assertEqual(index_drift(), 0)
+
+    def test_name_matches_rank_above_description_matches(self):
+        in_description = self._create_task('Tidy up', description='Budget review notes')
+        in_name = self._create_task('Budget review', description='Go through the numbers')
+        self.assertEqual(self._search('budget'), [in_name, in_description])
+
+    def test_only_visible_tasks_are_found(self):
+        own = self._create_task('Invoice the client')
+        team_task = self._create_task('Invoice the supplier', team=self.team, assigned=self.other_user)
+        self._create_task('Invoice the landlord', team=self.other_team, assigned=self.other_user)
+        self._create_task('Invoice the bank', assigned=self.other_user)
+        self.assertEqual(set(self._search('invoice')), {own, team_task})
+
+    def test_moving_tasks_changes_who_finds_them(self):
+        task = self._create_task('Order stationery', assigned=self.other_user)
+        self.assertEqual(self._search('stationery'), [])
+        Task.objects.filter(id=task.id).update(team=self.team)
+        self.assertEqual(self._search('stationery'), [task])
+        self.team.team_members.remove(self.user)
+        self.assertEqual(self._search('stationery'), [])
+
+    def test_limit(self):
+        for index in range(3):
+            self._create_task(f'Limited task {index}')
+        self.assertEqual(len(search_tasks(self.user, 'limited', limit=2)), 2)
+
+    def test_matches_are_highlighted_and_text_escaped(self):
+        self._create_task('Fix <b> tags', description='The <script> in the footer needs fixing')
+        result = search_tasks(self.user, 'fix')[0]
+        self.assertEqual(result.name_highlight, '<mark>Fix</mark> &lt;b&gt; tags')
+        self.assertEqual(result.description_snippet, 'The &lt;script&gt; in the footer needs <mark>fixing</mark>')
+
+    def test_drift_is_detected_and_rebuilt(self):
+        self._create_task('Indexed task')
+        self._add_stray_index_entry()
+        self.assertEqual(index_drift(), 1)
+        rebuild_index()
+        self.assertEqual(index_drift(), 0)
+        self.assertEqual(len(self._search('indexed')), 1)
+
+    def test_rebuild_command_checks_and_fixes_drift(self):
+        self._create_task('Indexed task')
+        self._add_stray_index_entry()
+        with self.assertRaises(CommandError):
+            call_command('rebuild_task_search', '--check', stdout=StringIO())
+        call_command('rebuild_task_search', stdout=StringIO())
+        call_command('rebuild_task_search', '--check', stdout=StringIO())
+
+    def _add_stray_index_entry(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO tasks_task_search(rowid, task_name, task_description) VALUES (999999, 'Stray', 'Stray')"
+            )
+
+    def _search(self, query):
+        return search_tasks(self.user, query)
+
+    def _create_task(self, name, description='A task', team=None, assigned=None):
+        return Task.objects.create(
+            task_name=name,
+            task_description=description,
+            assigned=assigned or self.user,
+            team=team,
+        )
@@ -0,0 +1,119 @@
+"""Unit tests for the TaskStatusCount model."""
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from tasks.models import User, Task, Team, TaskStatusCount
+
+class TaskStatusCountModelTestCase(TestCase):
+    """Unit tests for the TaskStatusCount model."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/teams.json'
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.other_user = User.objects.get(username='@janedoe')
+        self.team = Team.objects.get(id=1)
+        self.other_team = Team.objects.create(team_name='Other team', team_description='Another team')
+
+    def test_counts_are_zero_without_tasks(self):
+        counts = TaskStatusCount.objects.for_user(self.user)
+        self.assertEqual(counts.total(), 0)
+
+    def test_creating_tasks_counts_them(self):
+        self._create_task(status='not_started')
+        self._create_task(status='done', team=self.team)
+        self._assert_counts(TaskStatusCount.objects.for_user(self.user), 1, 0, 1)
+        self._assert_counts(TaskStatusCount.objects.for_team(self.team), 0, 0, 1)
+
+    def test_editing_status_moves_count(self):
+        task = self._create_task(status='not_started', team=self.team)
+        task.status = 'in_progress'
+        task.save()
+        self._assert_counts(TaskStatusCount.objects.for_user(self.user), 0, 1, 0)
+        self._assert_counts(TaskStatusCount.objects.for_team(self.team), 0, 1, 0)
+
+    def test_reassigning_task_moves_count(self):
+        task = self._create_task(status='in_progress')
+        task.assigned = self.other_user
+        task.save()
+        self._assert_counts(TaskStatusCount.objects.for_user(self.user), 0, 0, 0)
+        self._assert_counts(TaskStatusCount.objects.for_user(self.other_user), 0, 1, 0)
+
+    def test_moving_task_between_teams_moves_count(self):
+        task = self._create_task(status='done', team=self.team)
+        task.team = self.other_team
+        task.save()
+        self._assert_counts(TaskStatusCount.objects.for_team(self.team), 0, 0, 0)
+        self._assert_counts(TaskStatusCount.objects.for_team(self.other_team), 0, 0, 1)
+
+    def test_deleting_task_removes_count(self):
+        task = self._create_task(status='done', team=self.team)
+        task.delete()
+        self._assert_counts(TaskStatusCount.objects.for_user(self.user), 0, 0, 0)
+        self._assert_counts(TaskStatusCount.objects.for_team(self.team), 0, 0, 0)
+
+    def test_bulk_update_and_delete_are_counted(self):
+        for _ in range(3):
+            self._create_task(status='not_started', team=self.team)
+        Task.objects.filter(team=self.team).update(status='done')
+        self._assert_counts(TaskStatusCount.objects.for_user(self.user), 0, 0, 3)
+        Task.objects.filter(team=self.team).delete()
+        self._assert_counts(TaskStatusCount.objects.for_user(self.user), 0, 0, 0)
+
+    def test_deleting_team_removes_its_tasks_from_user_counts(self):
+        self._create_task(status='not_started', team=self.team)
+        self._create_task(status='not_started')
+        self.team.delete()
+        self._assert_counts(TaskStatusCount.objects.for_user(self.user), 1, 0, 0)
+        self.assertFalse(TaskStatusCount.objects.filter(team_id=1).exists())
+
+    def test_deleting_user_removes_their_tasks_from_team_counts(self):
+        self._create_task(status='in_progress', team=self.team, assigned=self.other_user)
+        self._create_task(status='in_progress', team=self.team)
+        self.other_user.delete()
+        self._assert_counts(TaskStatusCount.objects.for_team(self.team), 0, 1, 0)
+
+    def test_drift_is_detected_and_rebuilt(self):
+        self._create_task(status='not_started', team=self.team)
+        TaskStatusCount.objects.filter(user=self.user).update(not_started=5)
+        self.assertEqual(len(TaskStatusCount.objects.drift()), 1)
+        TaskStatusCount.objects.rebuild()
+        self.assertEqual(TaskStatusCount.objects.drift(), {})
+        self._assert_counts(TaskStatusCount.objects.for_user(self.user), 1, 0, 0)
+
+    def test_counts_below_zero_are_reported_as_drift(self):
+        task = self._create_task(status='done')
+        TaskStatusCount.objects.filter(user=self.user).update(done=0)
+        task.delete()
+        self._assert_counts(TaskStatusCount.objects.for_user(self.user), 0, 0, -1)
+        self.assertEqual(TaskStatusCount.objects.drift(), {
+            (self.user.id, None): ({'not_started': 0, 'in_progress': 0, 'done': -1}, {'not_started': 0, 'in_progress': 0, 'done': 0}),
+        })
+        with self.assertRaises(CommandError):
+            call_command('rebuild_task_counts', '--check', stdout=StringIO())
+
+    def test_rebuild_command_checks_and_fixes_drift(self):
+        self._create_task(status='done')
+        TaskStatusCount.objects.filter(user=self.user).delete()
+        with self.assertRaises(CommandError):
+            call_command('rebuild_task_counts', '--check', stdout=StringIO())
+        call_command('rebuild_task_counts', stdout=StringIO())
+        call_command('rebuild_task_counts', '--check', stdout=StringIO())
+        self._assert_counts(TaskStatusCount.objects.for_user(self.user), 0, 0, 1)
+
+    def _create_task(self, status, team=None, assigned=None):
+        return Task.objects.create(
+            task_name='Counted task',
+            task_description='A counted task',
+            assigned=assigned or self.user,
+            status=status,
+            team=team,
+        )
+
+    def _assert_counts(self, counts, not_started, in_progress, done):
+        self.assertEqual((counts.not_started, counts.in_progress, counts.done), (not_started, in_progress, done))
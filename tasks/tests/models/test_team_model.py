@@ -1,6 +1,8 @@
 """Unit tests for the Team model."""
+from datetime import timedelta
 from django.core.exceptions import ValidationError
 from django.test import TestCase
+from django.utils import timezone
 from tasks.models import User, Team
 
 class TeamModelTestCase(TestCase):
@@ -43,7 +45,29 @@ class TeamModelTestCase(TestCase):
     def test_team_members_can_be_removed(self):
         self.team.team_members.remove(User.objects.get(username='@johndoe'))
         self._assert_team_is_valid()
-    
+
+    def test_saving_team_updates_updated_at(self):
+        updated_at = self.team.updated_at
+        self.team.save()
+        self.assertGreater(self.team.updated_at, updated_at)
+
+    def test_membership_changes_update_updated_at(self):
+        updated_at = self.team.updated_at
+        self.team.team_members.add(User.objects.get(username='@janedoe'))
+        self.team.refresh_from_db()
+        self.assertGreater(self.team.updated_at, updated_at)
+        updated_at = self.team.updated_at
+        self.team.team_members.remove(User.objects.get(username='@janedoe'))
+        self.team.refresh_from_db()
+        self.assertGreater(self.team.updated_at, updated_at)
+
+    def test_membership_changes_do_not_move_updated_at_backwards(self):
+        # Stands in for a save made with a later time than the trigger's millisecond clock reads.
+        updated_at = timezone.now() + timedelta(seconds=1, microseconds=999)
+        Team.objects.filter(pk=self.team.pk).update(updated_at=updated_at)
+        self.team.team_members.add(User.objects.get(username='@janedoe'))
+        self.team.refresh_from_db()
+        self.assertEqual(self.team.updated_at, updated_at + timedelta(microseconds=1))
 
 
 
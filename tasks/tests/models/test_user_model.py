@@ -1,7 +1,9 @@
 """Unit tests for the User model."""
 from django.core.exceptions import ValidationError
 from django.test import TestCase
-from tasks.models import User
+from unittest.mock import patch
+from libgravatar import Gravatar
+from tasks.models import User, gravatar_cache
 
 class UserModelTestCase(TestCase):
     """Unit tests for the User model."""
@@ -15,6 +17,8 @@ class UserModelTestCase(TestCase):
 
     def setUp(self):
         self.user = User.objects.get(username='@johndoe')
+        gravatar_cache.clear()
+        self.addCleanup(gravatar_cache.clear)
 
     def test_valid_user(self):
         self._assert_user_is_valid()
@@ -143,6 +147,31 @@ class UserModelTestCase(TestCase):
         expected_gravatar_url = self._gravatar_url(size=60)
         self.assertEqual(actual_gravatar_url, expected_gravatar_url)
 
+    def test_gravatar_is_cached_per_email_and_size(self):
+        with patch('tasks.models.Gravatar') as gravatar_class:
+            gravatar_class.return_value.get_image.side_effect = lambda size, default: f'url-{size}'
+            self.assertEqual(self.user.gravatar(), 'url-120')
+            self.assertEqual(self.user.gravatar(), 'url-120')
+            self.assertEqual(self.user.mini_gravatar(), 'url-60')
+            self.assertEqual(self.user.mini_gravatar(), 'url-60')
+        self.assertEqual(gravatar_class.call_count, 2)
+
+    def test_gravatar_cache_is_bounded(self):
+        with patch.object(gravatar_cache, 'maxsize', 2):
+            self.user.gravatar(size=10)
+            self.user.gravatar(size=20)
+            self.user.gravatar(size=30)
+            self.assertEqual(list(gravatar_cache._urls), [(self.user.email, 20), (self.user.email, 30)])
+
+    def test_changing_email_invalidates_cached_gravatar(self):
+        old_email = self.user.email
+        self.user.gravatar()
+        self.user.mini_gravatar()
+        self.user.email = 'john.doe.new@example.org'
+        self.user.save()
+        self.assertFalse(any(email == old_email for email, _ in gravatar_cache._urls))
+        self.assertEqual(self.user.gravatar(), Gravatar(self.user.email).get_image(size=120, default='mp'))
+
     def _gravatar_url(self, size):
         gravatar_url = f"{UserModelTestCase.GRAVATAR_URL}?size={size}&default=mp"
         return gravatar_url
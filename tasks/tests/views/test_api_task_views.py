@@ -0,0 +1,185 @@
+"""Tests of the task endpoints of the JSON API."""
+import json
+from datetime import date, timedelta
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from tasks.models import User, Task, Team
+from tasks.pagination import encode_cursor
+
+class ApiTaskViewsTestCase(TestCase):
+    """Tests of the task endpoints of the JSON API."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/teams.json',
+    ]
+
+    def setUp(self):
+        caches['pages'].clear()
+        self.url = reverse('api_task_list')
+        self.user = User.objects.get(username='@johndoe')
+        self.other_user = User.objects.get(username='@janedoe')
+        self.team = Team.objects.get(id=1)
+        self.team.team_members.add(self.other_user)
+        self.client.login(username=self.user.username, password='Password123')
+
+    def test_api_task_list_url(self):
+        self.assertEqual(self.url, '/api/tasks/')
+
+    def test_list_requires_log_in(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+
+    def test_list_shows_own_and_team_tasks_only(self):
+        own = self._create_task(assigned=self.user)
+        team_task = self._create_task(assigned=self.other_user, team=self.team)
+        self._create_task(assigned=self.other_user)
+        ids = [row['id'] for row in self.client.get(self.url).json()['results']]
+        self.assertCountEqual(ids, [own.id, team_task.id])
+
+    def test_list_returns_only_requested_fields(self):
+        self._create_task(assigned=self.user)
+        row = self.client.get(self.url, {'fields': 'task_name,assigned'}).json()['results'][0]
+        self.assertEqual(row, {'task_name': 'API task', 'assigned': '@johndoe'})
+
+    def test_list_rejects_unknown_fields(self):
+        response = self.client.get(self.url, {'fields': 'task_name,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('fields', response.json()['errors'])
+
+    def test_list_filters_by_status_due_range_and_assignee(self):
+        soon = self._create_task(assigned=self.user, due=date.today() + timedelta(days=1), status='in_progress')
+        self._create_task(assigned=self.user, due=date.today() + timedelta(days=30), status='in_progress')
+        self._create_task(assigned=self.user, due=date.today() + timedelta(days=1), status='done')
+        self._create_task(assigned=self.other_user, team=self.team, due=date.today() + timedelta(days=1), status='in_progress')
+        response = self.client.get(self.url, {
+            'status': 'in_progress',
+            'due_before': (date.today() + timedelta(days=7)).isoformat(),
+            'assignee': '@johndoe',
+        })
+        self.assertEqual([row['id'] for row in response.json()['results']], [soon.id])
+
+    def test_list_rejects_malformed_filters(self):
+        response = self.client.get(self.url, {'status': 'finished', 'due_after': 'tomorrow'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()['errors']), {'status', 'due_after'})
+
+    def test_list_is_cursor_paginated(self):
+        for index in range(5):
+            self._create_task(assigned=self.user, due=date.today() + timedelta(days=index))
+        self._create_task(assigned=self.user)
+        seen = []
+        url = f'{self.url}?limit=2'
+        while url:
+            body = self.client.get(url).json()
+            seen += [row['id'] for row in body['results']]
+            url = body['next']
+        dated = Task.objects.filter(due__isnull=False).order_by('due', 'id').values_list('id', flat=True)
+        self.assertEqual(seen, list(dated) + [Task.objects.get(due=None).id])
+        previous = self.client.get(self.client.get(f'{self.url}?limit=2').json()['next']).json()['previous']
+        self.assertEqual(len(self.client.get(previous).json()['results']), 2)
+
+    def test_list_ignores_tampered_cursor(self):
+        for index in range(3):
+            self._create_task(assigned=self.user, due=date.today() + timedelta(days=index))
+        for key, task_id in [('garbage', 1), ({'a': 1}, 1), (date.today().isoformat(), 2 ** 64)]:
+            cursor = encode_cursor({'key': key, 'id': task_id, 'position': 0})
+            response = self.client.get(self.url, {'after': cursor})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()['results']), 3)
+
+    def test_create_task(self):
+        response = self._post(self.url, {
+            'task_name': 'Created through the API',
+            'task_description': 'A new task',
+            'due': (date.today() + timedelta(days=3)).isoformat(),
+        })
+        self.assertEqual(response.status_code, 201)
+        task = Task.objects.get(id=response.json()['id'])
+        self.assertEqual(task.assigned, self.user)
+        self.assertEqual(task.status, 'not_started')
+
+    def test_create_team_task_assigned_to_member(self):
+        response = self._post(self.url, {
+            'task_name': 'Team task', 'task_description': 'For Jane', 'team': self.team.id, 'assigned': '@janedoe',
+            'due': (date.today() + timedelta(days=3)).isoformat(),
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['assigned'], '@janedoe')
+        self.assertEqual(response.json()['team'], self.team.id)
+
+    def test_create_task_rejects_invalid_data(self):
+        response = self._post(self.url, {'task_name': '', 'task_description': 'x', 'assigned': '@janedoe'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()['errors']), {'task_name', 'due', 'assigned'})
+        self.assertFalse(Task.objects.exists())
+
+    def test_create_task_rejects_malformed_team(self):
+        for team in ['abc', 1.5, True, 2 ** 64]:
+            response = self._post(self.url, {'task_name': 'x', 'task_description': 'x', 'team': team})
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()['errors'], {'team': ['Enter a whole number.']})
+        self.assertFalse(Task.objects.exists())
+
+    def test_nested_values_are_rejected(self):
+        response = self._post(self.url, {'task_name': ['x'], 'task_description': 'x', 'team': {'id': 1}, 'due': {}})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()['errors']), {'task_name', 'team', 'due'})
+
+    def test_create_task_in_other_team_is_not_found(self):
+        other_team = Team.objects.create(team_name='Other', team_description='Not mine')
+        response = self._post(self.url, {'task_name': 'x', 'task_description': 'x', 'team': other_team.id})
+        self.assertEqual(response.status_code, 404)
+
+    def test_update_task(self):
+        task = self._create_task(assigned=self.other_user, team=self.team, due=date.today() + timedelta(days=3))
+        response = self.client.patch(
+            reverse('api_task_detail', kwargs={'task_id': task.id}),
+            json.dumps({'status': 'done', 'assigned': '@johndoe'}), content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.assigned), ('done', self.user))
+
+    def test_delete_task(self):
+        task = self._create_task(assigned=self.user)
+        response = self.client.delete(reverse('api_task_detail', kwargs={'task_id': task.id}))
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Task.objects.filter(id=task.id).exists())
+
+    def test_tasks_of_other_users_are_not_found(self):
+        task = self._create_task(assigned=self.other_user)
+        url = reverse('api_task_detail', kwargs={'task_id': task.id})
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.delete(url).status_code, 404)
+        self.assertTrue(Task.objects.filter(id=task.id).exists())
+
+    def test_large_pages_take_a_constant_number_of_queries(self):
+        Task.objects.bulk_create([
+            Task(task_name=f'Task {index}', task_description='Bulk task', assigned=self.user,
+                 due=date.today() + timedelta(days=index % 365))
+            for index in range(3000)
+        ])
+        url, pages, rows = self.url + '?limit=1000', 0, 0
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                page = self.client.get(url).json()
+            self.assertLessEqual(len(queries), 4)
+            rows += len(page['results'])
+            url = page['next']
+            pages += 1
+        self.assertEqual((pages, rows), (3, 3000))
+
+    def _create_task(self, assigned, team=None, due=None, status='not_started'):
+        return Task.objects.create(
+            task_name='API task', task_description='Task for the API', assigned=assigned, team=team,
+            due=due, status=status,
+        )
+
+    def _post(self, url, data):
+        return self.client.post(url, json.dumps(data), content_type='application/json')
@@ -0,0 +1,102 @@
+"""Tests of the team and membership endpoints of the JSON API."""
+import json
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from tasks.models import User, Task, Team
+from tasks.pagination import encode_cursor
+
+class ApiTeamViewsTestCase(TestCase):
+    """Tests of the team and membership endpoints of the JSON API."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/teams.json',
+    ]
+
+    def setUp(self):
+        caches['pages'].clear()
+        self.user = User.objects.get(username='@johndoe')
+        self.other_user = User.objects.get(username='@janedoe')
+        self.team = Team.objects.get(id=1)
+        self.other_team = Team.objects.create(team_name='Other team', team_description='Not mine')
+        self.client.login(username=self.user.username, password='Password123')
+
+    def test_api_team_urls(self):
+        self.assertEqual(reverse('api_team_list'), '/api/teams/')
+        self.assertEqual(reverse('api_team_member_list', kwargs={'team_id': 1}), '/api/teams/1/members/')
+
+    def test_list_shows_own_teams_only(self):
+        response = self.client.get(reverse('api_team_list'), {'fields': 'id,team_name'})
+        self.assertEqual(response.json()['results'], [{'id': 1, 'team_name': 'Test Team A'}])
+
+    def test_list_ignores_tampered_cursor(self):
+        for key in ['garbage', 2 ** 64]:
+            cursor = encode_cursor({'key': key, 'id': 1, 'position': 0})
+            response = self.client.get(reverse('api_team_list'), {'after': cursor})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([row['id'] for row in response.json()['results']], [self.team.id])
+
+    def test_create_team_makes_user_a_member(self):
+        response = self._send('post', reverse('api_team_list'), {'team_name': 'New team', 'team_description': 'Made by API'})
+        self.assertEqual(response.status_code, 201)
+        team = Team.objects.get(id=response.json()['id'])
+        self.assertIn(self.user, team.team_members.all())
+
+    def test_create_team_rejects_invalid_data(self):
+        response = self._send('post', reverse('api_team_list'), {'team_name': 'x' * 51})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()['errors']), {'team_name', 'team_description'})
+
+    def test_update_team(self):
+        response = self._send('patch', self._team_url(self.team), {'team_name': 'Renamed'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['team_name'], 'Renamed')
+        self.assertEqual(Team.objects.get(id=1).team_description, self.team.team_description)
+
+    def test_delete_team_deletes_its_tasks(self):
+        Task.objects.create(task_name='Team task', task_description='x', assigned=self.user, team=self.team)
+        response = self.client.delete(self._team_url(self.team))
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Team.objects.filter(id=1).exists())
+        self.assertFalse(Task.objects.exists())
+
+    def test_other_teams_are_not_found(self):
+        self.assertEqual(self.client.get(self._team_url(self.other_team)).status_code, 404)
+        self.assertEqual(self.client.delete(self._team_url(self.other_team)).status_code, 404)
+        members_url = reverse('api_team_member_list', kwargs={'team_id': self.other_team.id})
+        self.assertEqual(self.client.get(members_url).status_code, 404)
+
+    def test_add_and_remove_member(self):
+        members_url = reverse('api_team_member_list', kwargs={'team_id': self.team.id})
+        response = self._send('post', members_url, {'username': '@janedoe'})
+        self.assertEqual(response.status_code, 201)
+        usernames = [row['username'] for row in self.client.get(members_url).json()['results']]
+        self.assertEqual(usernames, ['@johndoe', '@janedoe'])
+        member_url = reverse('api_team_member_detail', kwargs={'team_id': self.team.id, 'user_id': self.other_user.id})
+        self.assertEqual(self.client.delete(member_url).status_code, 204)
+        self.assertNotIn(self.other_user, self.team.team_members.all())
+        self.assertEqual(self.client.delete(member_url).status_code, 404)
+
+    def test_add_member_rejects_unknown_and_existing_users(self):
+        members_url = reverse('api_team_member_list', kwargs={'team_id': self.team.id})
+        self.assertEqual(self._send('post', members_url, {'username': '@nobody'}).status_code, 400)
+        self.assertEqual(self._send('post', members_url, {'username': '@johndoe'}).status_code, 400)
+        self.assertEqual(self._send('post', members_url, {}).status_code, 400)
+
+    def test_unsupported_method_is_not_allowed(self):
+        member_url = reverse('api_team_member_detail', kwargs={'team_id': self.team.id, 'user_id': self.user.id})
+        response = self.client.get(member_url)
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response['Allow'], 'DELETE')
+
+    def test_malformed_json_is_rejected(self):
+        response = self.client.post(reverse('api_team_list'), 'not json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def _team_url(self, team):
+        return reverse('api_team_detail', kwargs={'team_id': team.id})
+
+    def _send(self, method, url, data):
+        return getattr(self.client, method)(url, json.dumps(data), content_type='application/json')
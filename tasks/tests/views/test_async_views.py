@@ -0,0 +1,126 @@
+"""Tests of the async views served by the ASGI application."""
+import asyncio
+from datetime import date, timedelta
+from functools import wraps
+from unittest.mock import patch
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import resolve, reverse
+from task_manager.asgi import AsyncViewsASGIRequest
+from tasks import async_views
+from tasks.models import User, Task, Team
+from tasks.pagination import KeysetPage
+from tasks.tests.helpers import without_csrf_tokens
+
+@override_settings(ROOT_URLCONF='task_manager.asgi_urls')
+class AsyncViewsTestCase(TestCase):
+    """Tests of the async views served by the ASGI application."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/teams.json',
+    ]
+
+    def setUp(self):
+        caches['pages'].clear()
+        self.user = User.objects.get(username='@johndoe')
+        self.team = Team.objects.get(id=1)
+        for index in range(3):
+            Task.objects.create(
+                task_name=f'Async task {index}', task_description='Personal task', assigned=self.user,
+                due=date.today() + timedelta(days=index + 1),
+            )
+        Task.objects.create(
+            task_name='Async team task', task_description='Team task', assigned=self.user, team=self.team,
+            due=date.today() + timedelta(days=1), status='in_progress',
+        )
+        self.team_info_url = reverse('team_info', kwargs={'team_id': self.team.id})
+        self.async_client.force_login(self.user)
+
+    def test_asgi_requests_use_async_urlconf(self):
+        self.assertEqual(AsyncViewsASGIRequest.urlconf, 'task_manager.asgi_urls')
+        self.assertIs(resolve('/dashboard/').func, async_views.dashboard)
+        self.assertIs(resolve('/dashboard/my_tasks/').func, async_views.my_tasks)
+
+    async def test_dashboard(self):
+        response = await self.async_client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['task_counts'].not_started, 3)
+
+    async def test_dashboard_redirects_when_not_logged_in(self):
+        self.async_client.cookies.clear()
+        response = await self.async_client.get(reverse('dashboard'))
+        self.assertRedirects(response, f"{reverse('log_in')}?next={reverse('dashboard')}", fetch_redirect_response=False)
+
+    async def test_my_tasks(self):
+        response = await self.async_client.get(reverse('my_tasks'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Async task 2')
+        self.assertNotContains(response, 'Async team task')
+
+    async def test_my_tasks_is_cached_and_not_modified(self):
+        response = await self.async_client.get(reverse('my_tasks'))
+        cached = await self.async_client.get(reverse('my_tasks'))
+        self.assertEqual(cached.content, response.content)
+        not_modified = await self.async_client.get(reverse('my_tasks'), headers={'If-None-Match': response['ETag']})
+        self.assertEqual(not_modified.status_code, 304)
+
+    async def test_my_teams(self):
+        response = await self.async_client.get(reverse('my_teams'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.team.team_name)
+
+    async def test_team_info(self):
+        response = await self.async_client.get(self.team_info_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Async team task')
+        self.assertContains(response, self.user.username)
+        not_modified = await self.async_client.get(self.team_info_url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(not_modified.status_code, 304)
+
+    async def test_page_cache_is_not_used_from_the_event_loop(self):
+        cache = caches['pages']
+        blocking_calls = []
+        def unless_in_event_loop(method):
+            @wraps(method)
+            def checked_method(*args, **kwargs):
+                try:
+                    asyncio.get_running_loop()
+                except RuntimeError:
+                    pass
+                else:
+                    blocking_calls.append(method.__name__)
+                return method(*args, **kwargs)
+            return checked_method
+        methods = {name: unless_in_event_loop(getattr(cache, name)) for name in ('get', 'get_many', 'add', 'set')}
+        with patch.multiple(cache, **methods):
+            for url in (reverse('my_tasks'), reverse('my_teams'), self.team_info_url):
+                for _ in range(2):
+                    response = await self.async_client.get(url)
+                    self.assertEqual(response.status_code, 200)
+        self.assertEqual(blocking_calls, [])
+
+    async def test_warm_task_table_fragment_saves_the_task_query(self):
+        await self.async_client.get(self.team_info_url)
+        with patch.object(KeysetPage, '_fetch_queries', autospec=True, side_effect=KeysetPage._fetch_queries) as fetch:
+            response = await self.async_client.get(self.team_info_url)
+        self.assertContains(response, 'Async team task')
+        fetch.assert_not_called()
+        caches['pages'].clear()
+        with patch.object(KeysetPage, '_fetch_queries', autospec=True, side_effect=KeysetPage._fetch_queries) as fetch:
+            await self.async_client.get(self.team_info_url)
+        fetch.assert_called_once()
+
+    async def test_team_info_of_missing_team_is_not_found(self):
+        response = await self.async_client.get(reverse('team_info', kwargs={'team_id': 999}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_async_pages_match_sync_pages(self):
+        self.client.force_login(self.user)
+        for url in (reverse('dashboard'), reverse('my_teams'), reverse('my_tasks'), self.team_info_url):
+            with self.subTest(url=url):
+                async_response = self.client.get(url)
+                with override_settings(ROOT_URLCONF='task_manager.urls'):
+                    caches['pages'].clear()
+                    sync_response = self.client.get(url)
+                self.assertEqual(without_csrf_tokens(async_response.content), without_csrf_tokens(sync_response.content))
@@ -0,0 +1,137 @@
+"""Tests of the bulk task action views."""
+from datetime import date, timedelta
+from django.contrib.messages import get_messages
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from tasks.models import User, Task, Team, TaskStatusCount
+
+class BulkTaskViewsTestCase(TestCase):
+    """Tests of the bulk task action views."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/teams.json',
+    ]
+
+    def setUp(self):
+        caches['pages'].clear()
+        self.user = User.objects.get(username='@johndoe')
+        self.other_user = User.objects.get(username='@janedoe')
+        self.team = Team.objects.get(id=1)
+        self.team.team_members.add(self.other_user)
+        self.my_tasks_url = reverse('bulk_my_tasks')
+        self.team_url = reverse('bulk_team_tasks', kwargs={'team_id': self.team.id})
+        self.client.login(username=self.user.username, password='Password123')
+
+    def test_bulk_urls(self):
+        self.assertEqual(self.my_tasks_url, '/dashboard/my_tasks/bulk/')
+        self.assertEqual(self.team_url, f'/dashboard/my_teams/team_info/{self.team.id}/bulk/')
+
+    def test_bulk_views_only_accept_post(self):
+        self.assertEqual(self.client.get(self.my_tasks_url).status_code, 405)
+
+    def test_set_status_of_my_tasks(self):
+        tasks = self._create_tasks(3, assigned=self.user)
+        self.client.get(reverse('my_tasks'))
+        response = self.client.post(self.my_tasks_url, {
+            'tasks': [task.id for task in tasks[:2]], 'action': 'status', 'status': 'done',
+        }, follow=True)
+        self.assertRedirects(response, reverse('my_tasks'), status_code=302, target_status_code=200)
+        self.assertEqual(Task.objects.filter(status='done').count(), 2)
+        self.assertEqual(TaskStatusCount.objects.for_user(self.user).done, 2)
+        self.assertIn('2 tasks updated!', [str(message) for message in get_messages(response.wsgi_request)])
+        self.assertContains(self.client.get(reverse('my_tasks')), '<td data-field="status_display">Done</td>', count=2)
+
+    def test_delete_my_tasks(self):
+        tasks = self._create_tasks(3, assigned=self.user)
+        self.client.post(self.my_tasks_url, {'tasks': [task.id for task in tasks], 'action': 'delete'})
+        self.assertFalse(Task.objects.exists())
+
+    def test_cannot_change_tasks_of_other_users(self):
+        own = self._create_tasks(1, assigned=self.user)
+        other = self._create_tasks(1, assigned=self.other_user)
+        response = self.client.post(self.my_tasks_url, {
+            'tasks': [own[0].id, other[0].id], 'action': 'delete',
+        }, follow=True)
+        self.assertEqual(Task.objects.count(), 2)
+        self.assertIn(
+            'Some of the selected tasks cannot be changed.',
+            [str(message) for message in get_messages(response.wsgi_request)],
+        )
+
+    def test_my_tasks_cannot_include_team_tasks(self):
+        team_task = self._create_tasks(1, assigned=self.user, team=self.team)[0]
+        self.client.post(self.my_tasks_url, {'tasks': [team_task.id], 'action': 'delete'})
+        self.assertTrue(Task.objects.filter(id=team_task.id).exists())
+
+    def test_action_needs_a_selection_and_a_value(self):
+        tasks = self._create_tasks(1, assigned=self.user)
+        response = self.client.post(self.my_tasks_url, {'action': 'status', 'status': 'done'}, follow=True)
+        self.assertIn('Select at least one task.', [str(message) for message in get_messages(response.wsgi_request)])
+        self.client.post(self.my_tasks_url, {'tasks': [tasks[0].id], 'action': 'status'})
+        self.assertEqual(Task.objects.get().status, 'not_started')
+
+    def test_reassign_team_tasks(self):
+        tasks = self._create_tasks(3, assigned=self.user, team=self.team)
+        response = self.client.post(self.team_url, {
+            'tasks': [task.id for task in tasks], 'action': 'assign', 'assigned': self.other_user.id,
+        })
+        self.assertRedirects(response, reverse('team_info', kwargs={'team_id': self.team.id}), target_status_code=200)
+        self.assertEqual(Task.objects.filter(assigned=self.other_user).count(), 3)
+        self.assertEqual(TaskStatusCount.objects.for_user(self.other_user).not_started, 3)
+
+    def test_cannot_reassign_to_non_member(self):
+        tasks = self._create_tasks(1, assigned=self.user, team=self.team)
+        outsider = User.objects.get(username='@petrapickles')
+        self.client.post(self.team_url, {'tasks': [tasks[0].id], 'action': 'assign', 'assigned': outsider.id})
+        self.assertEqual(Task.objects.get().assigned, self.user)
+
+    def test_bulk_team_tasks_is_not_found_for_other_teams(self):
+        other_team = Team.objects.create(team_name='Other', team_description='Not mine')
+        task = self._create_tasks(1, assigned=self.other_user, team=other_team)[0]
+        url = reverse('bulk_team_tasks', kwargs={'team_id': other_team.id})
+        response = self.client.post(url, {'tasks': [task.id], 'action': 'delete'})
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(Task.objects.filter(id=task.id).exists())
+
+    def test_bulk_update_changes_team_info_etag(self):
+        tasks = self._create_tasks(2, assigned=self.user, team=self.team)
+        team_info_url = reverse('team_info', kwargs={'team_id': self.team.id})
+        etag = self.client.get(team_info_url)['ETag']
+        self.client.post(self.team_url, {
+            'tasks': [task.id for task in tasks], 'action': 'status', 'status': 'done',
+        }, follow=True)
+        response = self.client.get(team_info_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_query_count_does_not_grow_with_selection(self):
+        query_counts = []
+        for size in (2, 200):
+            tasks = self._create_tasks(size, assigned=self.user, team=self.team)
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post(self.team_url, {
+                    'tasks': [task.id for task in tasks], 'action': 'status', 'status': 'in_progress',
+                })
+            query_counts.append(len(queries))
+            self.assertEqual(Task.objects.filter(id__in=[task.id for task in tasks], status='in_progress').count(), size)
+        self.assertEqual(query_counts[0], query_counts[1])
+
+    def test_task_tables_have_bulk_forms(self):
+        self._create_tasks(1, assigned=self.user)
+        response = self.client.get(reverse('my_tasks'))
+        self.assertContains(response, f'action="{self.my_tasks_url}"')
+        self.assertContains(response, 'name="tasks"')
+        response = self.client.get(reverse('team_info', kwargs={'team_id': self.team.id}))
+        self.assertContains(response, f'action="{self.team_url}"')
+        self.assertContains(response, f'<option value="{self.other_user.id}">')
+
+    def _create_tasks(self, count, assigned, team=None):
+        return Task.objects.bulk_create([
+            Task(task_name=f'Bulk task {index}', task_description='Bulk action task', assigned=assigned, team=team,
+                 due=date.today() + timedelta(days=1))
+            for index in range(count)
+        ])
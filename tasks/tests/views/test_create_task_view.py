@@ -1,4 +1,5 @@
 """Tests of the task view."""
+from django.core.cache import caches
 from django.test import TestCase
 from django.urls import reverse
 
@@ -12,6 +13,7 @@ class CreateTaskViewTestCase(TestCase):
     fixtures = ['tasks/tests/fixtures/default_user.json']
 
     def setUp(self):
+        caches['pages'].clear()
         self.url = reverse('create_task')
         self.user = User.objects.get(username='@johndoe')
         self.client.login(username=self.user.username, password='Password123')
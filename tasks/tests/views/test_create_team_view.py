@@ -1,4 +1,5 @@
 """Unit tests of the create team view."""
+from django.core.cache import caches
 from django.test import TestCase
 from django.urls import reverse
 from tasks.forms import CreateTeamForm
@@ -10,6 +11,7 @@ class CreateTeamViewTest(TestCase):
     fixtures = ['tasks/tests/fixtures/default_user.json']
 
     def setUp(self):
+        caches['pages'].clear()
         self.url = reverse('create_team')
         self.user = User.objects.get(username='@johndoe')
         self.client.login(username=self.user.username, password='Password123')
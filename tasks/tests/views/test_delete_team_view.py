@@ -1,7 +1,10 @@
 """Unit tests of the delete team view."""
+from django.core.cache import caches
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from tasks.models import Team, User
+from tasks.models import Task, Team, TaskStatusCount, User
 
 
 class DeleteTeamViewTestCase(TestCase):
@@ -13,6 +16,7 @@ class DeleteTeamViewTestCase(TestCase):
     ]
 
     def setUp(self):
+        caches['pages'].clear()
         self.user = User.objects.get(username='@johndoe')
         self.client.login(username=self.user.username, password='Password123')
         self.team = Team.objects.get(id=1)
@@ -39,4 +43,31 @@ class DeleteTeamViewTestCase(TestCase):
         messages = list(response.context['messages'])
         self.assertEqual(str(messages[0]), "Team Deleted!")
 
-    
\ No newline at end of file
+    def test_delete_team_removes_its_tasks_and_memberships_only(self):
+        other_team = Team.objects.create(team_name='Other team', team_description='Kept')
+        other_team.team_members.add(self.user)
+        self._create_tasks(self.team, 3)
+        self._create_tasks(other_team, 2)
+        self.client.post(self.url)
+        self.assertFalse(Team.objects.filter(id=self.team.id).exists())
+        self.assertFalse(Task.objects.filter(team_id=self.team.id).exists())
+        self.assertFalse(Team.team_members.through.objects.filter(team_id=self.team.id).exists())
+        self.assertEqual(Task.objects.filter(team=other_team).count(), 2)
+        self.assertEqual(list(self.user.team_set.all()), [other_team])
+        self.assertEqual(TaskStatusCount.objects.drift(), {})
+
+    def test_delete_team_query_count_does_not_grow_with_tasks(self):
+        small_team = Team.objects.create(team_name='Small team', team_description='Few tasks')
+        self._create_tasks(small_team, 1)
+        self._create_tasks(self.team, 20)
+        with CaptureQueriesContext(connection) as small_team_queries:
+            self.client.post(reverse('delete_team', kwargs={'team_id': small_team.id}))
+        with CaptureQueriesContext(connection) as large_team_queries:
+            self.client.post(self.url)
+        self.assertEqual(len(large_team_queries), len(small_team_queries))
+
+    def _create_tasks(self, team, count):
+        Task.objects.bulk_create([
+            Task(task_name=f'Task {index}', task_description='Team task', assigned=self.user, team=team)
+            for index in range(count)
+        ])
@@ -1,4 +1,5 @@
 """Tests of the edit task view."""
+from django.core.cache import caches
 from django.test import TestCase
 from django.urls import reverse
 from tasks.models import Task, User
@@ -15,6 +16,7 @@ class EditTaskViewTestCase(TestCase):
     ]
 
     def setUp(self):
+        caches['pages'].clear()
         self.user = User.objects.get(username='@johndoe')
         self.client.login(username=self.user.username, password='Password123')
         self.task_without_team = Task.objects.get(pk=1)
@@ -1,4 +1,5 @@
 """Unit tests of the edit team view."""
+from django.core.cache import caches
 from django.test import TestCase
 from django.urls import reverse
 from tasks.models import Team, User
@@ -13,6 +14,7 @@ class EditTeamViewTestCase(TestCase):
     ]
 
     def setUp(self):
+        caches['pages'].clear()
         self.user = User.objects.get(username='@johndoe')
         self.client.login(username=self.user.username, password='Password123')
         self.team = Team.objects.get(id=1)
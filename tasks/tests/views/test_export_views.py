@@ -0,0 +1,134 @@
+"""Tests of the streaming task export views."""
+import csv
+import gzip
+import io
+import json
+import threading
+import warnings
+from datetime import date, timedelta
+from unittest.mock import patch
+from asgiref.testing import ApplicationCommunicator
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from task_manager.asgi import application
+from tasks import export
+from tasks.models import User, Task, Team
+
+class ExportViewsTestCase(TestCase):
+    """Tests of the streaming task export views."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/teams.json',
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.team = Team.objects.get(id=1)
+        self.my_tasks_url = reverse('export_my_tasks')
+        self.team_url = reverse('export_team_tasks', kwargs={'team_id': self.team.id})
+        self.client.login(username=self.user.username, password='Password123')
+        for index in range(5):
+            Task.objects.create(
+                task_name=f'Task {index}', task_description='Exported task', assigned=self.user,
+                due=date.today() + timedelta(days=index),
+            )
+        Task.objects.create(task_name='Team task', task_description='Exported task', assigned=self.user, team=self.team)
+
+    def test_export_urls(self):
+        self.assertEqual(self.my_tasks_url, '/dashboard/my_tasks/export/')
+        self.assertEqual(self.team_url, f'/dashboard/my_teams/team_info/{self.team.id}/export/')
+
+    def test_export_my_tasks_as_csv(self):
+        response = self.client.get(self.my_tasks_url)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('my_tasks.csv', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['task_name'] for row in rows], [f'Task {index}' for index in range(5)])
+        self.assertEqual(rows[0]['assigned'], '@johndoe')
+
+    def test_export_team_tasks_as_ndjson(self):
+        response = self.client.get(self.team_url, {'format': 'ndjson'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['task_name'] for line in lines], ['Team task'])
+
+    def test_export_can_be_gzipped(self):
+        response = self.client.get(self.my_tasks_url, {'format': 'ndjson', 'gzip': '1'})
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('my_tasks.ndjson.gz', response['Content-Disposition'])
+        lines = gzip.decompress(b''.join(response.streaming_content)).decode().splitlines()
+        self.assertEqual(len(lines), 5)
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_export_streams_in_chunks_starting_before_the_query(self):
+        response = self.client.get(self.my_tasks_url)
+        chunks = iter(response.streaming_content)
+        with CaptureQueriesContext(connection) as queries:
+            header = next(chunks)
+        self.assertEqual(len(queries), 0)
+        self.assertTrue(header.startswith(b'id,task_name'))
+        self.assertGreaterEqual(len([chunk for chunk in chunks if chunk]), 3)
+
+    def test_export_of_other_team_is_not_found(self):
+        other_team = Team.objects.create(team_name='Other team', team_description='Not mine')
+        response = self.client.get(reverse('export_team_tasks', kwargs={'team_id': other_team.id}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.get(self.my_tasks_url, {'format': 'xlsx'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_requires_log_in(self):
+        self.client.logout()
+        response = self.client.get(self.my_tasks_url)
+        self.assertRedirects(response, '/log_in/?next=' + self.my_tasks_url)
+
+
+class AsgiExportTestCase(TransactionTestCase):
+    """Tests of the task export served by the ASGI application.
+
+    The ASGI handler runs each request's sync code in a thread of its own,
+    whose connection cannot see the rows of a test transaction.
+    """
+
+    fixtures = ['tasks/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.client.login(username=self.user.username, password='Password123')
+        for index in range(5):
+            Task.objects.create(
+                task_name=f'Task {index}', task_description='Exported task', assigned=self.user,
+                due=date.today() + timedelta(days=index),
+            )
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    async def test_export_sends_its_header_before_reading_rows(self):
+        # Rows are held back until the header arrives, which it never would if the response were read to the end first.
+        header_received = threading.Event()
+        self.addCleanup(header_received.set)
+        export_rows = export.export_rows
+        def held_back_rows(queryset):
+            header_received.wait(timeout=5)
+            yield from export_rows(queryset)
+        communicator = ApplicationCommunicator(application, {
+            'type': 'http', 'method': 'GET', 'path': reverse('export_my_tasks'), 'query_string': b'',
+            'headers': [(b'host', b'testserver'), (b'cookie', self.client.cookies.output(header='', sep=';').encode())],
+        })
+        with patch.object(export, 'export_rows', held_back_rows), warnings.catch_warnings():
+            # Django warns when it has to read a sync iterator to the end to serve it over ASGI.
+            warnings.simplefilter('error')
+            await communicator.send_input({'type': 'http.request', 'body': b''})
+            self.assertEqual((await communicator.receive_output())['status'], 200)
+            messages = [await communicator.receive_output(timeout=2)]
+            self.assertTrue(messages[0]['body'].startswith(b'id,task_name'))
+            header_received.set()
+            while messages[-1].get('more_body'):
+                messages.append(await communicator.receive_output())
+        await communicator.wait()
+        content = b''.join(message.get('body', b'') for message in messages)
+        self.assertEqual(len(list(csv.reader(io.StringIO(content.decode())))), 6)
@@ -0,0 +1,128 @@
+"""Tests of the bulk task import view and command."""
+import io
+import tempfile
+from datetime import date, timedelta
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from tasks.importing import import_tasks
+from tasks.models import User, Task, Team, TaskStatusCount
+
+class ImportViewsTestCase(TestCase):
+    """Tests of the bulk task import view and command."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/teams.json',
+    ]
+
+    def setUp(self):
+        caches['pages'].clear()
+        self.user = User.objects.get(username='@johndoe')
+        self.other_user = User.objects.get(username='@janedoe')
+        self.team = Team.objects.get(id=1)
+        self.team.team_members.add(self.other_user)
+        self.url = reverse('import_team_tasks', kwargs={'team_id': self.team.id})
+        self.due = (date.today() + timedelta(days=7)).isoformat()
+        self.client.login(username=self.user.username, password='Password123')
+
+    def test_import_url(self):
+        self.assertEqual(self.url, f'/dashboard/my_teams/team_info/{self.team.id}/import/')
+
+    def test_get_import_page(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'import_tasks.html')
+        self.assertIsNone(response.context['report'])
+
+    def test_import_is_not_found_for_other_teams(self):
+        other_team = Team.objects.create(team_name='Other', team_description='Not mine')
+        response = self.client.get(reverse('import_team_tasks', kwargs={'team_id': other_team.id}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_import_creates_valid_rows_and_reports_the_others(self):
+        response = self._upload(
+            'task_name,task_description,due,status,assigned\n'
+            f'First,Imported,{self.due},in_progress,@janedoe\n'
+            f'Second,Imported,{self.due},,\n'
+            f'Third,Imported,{self.due},finished,@johndoe\n'
+            f'Fourth,Imported,{self.due},done,@petrapickles\n'
+            ',Imported,,done,\n'
+        )
+        self.assertEqual(response.status_code, 200)
+        report = response.context['report']
+        self.assertEqual(report.created, 2)
+        self.assertEqual([row['line'] for row in report.errors], [4, 5, 6])
+        self.assertEqual(set(report.errors[0]['errors']), {'status'})
+        self.assertEqual(set(report.errors[1]['errors']), {'assigned'})
+        self.assertEqual(set(report.errors[2]['errors']), {'task_name', 'due'})
+        tasks = Task.objects.filter(team=self.team).order_by('id')
+        self.assertEqual([(task.task_name, task.assigned, task.status) for task in tasks], [
+            ('First', self.other_user, 'in_progress'),
+            ('Second', self.user, 'not_started'),
+        ])
+        self.assertContains(response, '2 tasks imported, 3 rows rejected.')
+        self.assertEqual(TaskStatusCount.objects.for_team(self.team).in_progress, 1)
+
+    def test_import_accepts_a_team_export(self):
+        Task.objects.create(task_name='Exported', task_description='Round trip', due=self.due, assigned=self.user, team=self.team)
+        export = b''.join(self.client.get(reverse('export_team_tasks', kwargs={'team_id': self.team.id})).streaming_content)
+        response = self._upload(export.decode())
+        self.assertEqual(response.context['report'].created, 1)
+        self.assertEqual(Task.objects.filter(team=self.team, task_name='Exported').count(), 2)
+
+    def test_import_rejects_file_without_required_columns(self):
+        response = self._upload('name,description\nFirst,Imported\n')
+        self.assertIsNone(response.context['report'])
+        self.assertIn('task_name', response.context['form'].errors['file'][0])
+        self.assertFalse(Task.objects.exists())
+
+    def test_import_rejects_file_that_is_not_utf8(self):
+        response = self._upload('task_name,task_description,due\n'.encode('utf-16'))
+        self.assertIn('file', response.context['form'].errors)
+
+    def test_imported_tasks_show_on_team_page(self):
+        team_info_url = reverse('team_info', kwargs={'team_id': self.team.id})
+        self.client.get(team_info_url)
+        self._upload(f'task_name,task_description,due\nVisible,Imported,{self.due}\n')
+        self.assertContains(self.client.get(team_info_url), 'Visible')
+
+    @override_settings(IMPORT_BATCH_SIZE=50)
+    def test_import_looks_up_assignees_once_per_batch(self):
+        lines = ['task_name,task_description,due,assigned'] + [
+            f'Task {index},Imported,{self.due},{"@janedoe" if index % 2 else "@johndoe"}' for index in range(200)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            report = import_tasks(self.team, iter(line + '\n' for line in lines), default_assignee=self.user)
+        self.assertEqual(report.created, 200)
+        self.assertEqual(report.errors, [])
+        inserts = [query for query in queries if query['sql'].startswith('INSERT INTO "tasks_task"')]
+        lookups = [query for query in queries if 'FROM "tasks_user"' in query['sql']]
+        self.assertEqual(len(inserts), 4)
+        self.assertEqual(len(lookups), 4)
+
+    def test_import_command(self):
+        stdout = io.StringIO()
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as csv_file:
+            csv_file.write(f'task_name,task_description,due\nCommand,Imported,{self.due}\nBad,,\n')
+            csv_file.flush()
+            call_command('import_tasks', self.team.id, csv_file.name, user='@janedoe', stdout=stdout)
+        self.assertEqual(Task.objects.get(task_name='Command').assigned, self.other_user)
+        self.assertIn('line 3: task_description:', stdout.getvalue())
+        self.assertIn('Imported 1 tasks, rejected 1 rows.', stdout.getvalue())
+
+    def test_import_command_requires_a_member(self):
+        with self.assertRaises(CommandError):
+            call_command('import_tasks', self.team.id, '-', user='@petrapickles', stdout=io.StringIO())
+
+    def _upload(self, content):
+        if isinstance(content, str):
+            content = content.encode()
+        upload = SimpleUploadedFile('tasks.csv', content, content_type='text/csv')
+        return self.client.post(self.url, {'file': upload})
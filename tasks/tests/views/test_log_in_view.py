@@ -1,9 +1,12 @@
 """Tests of the log in view."""
+from unittest.mock import patch
 from django.contrib import messages
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from tasks.forms import LogInForm
 from tasks.models import User
+from tasks.throttling import LoginThrottle
 from tasks.tests.helpers import LogInTester, MenuTesterMixin, reverse_with_next
 
 class LogInViewTestCase(TestCase, LogInTester, MenuTesterMixin):
@@ -14,6 +17,7 @@ class LogInViewTestCase(TestCase, LogInTester, MenuTesterMixin):
     def setUp(self):
         self.url = reverse('log_in')
         self.user = User.objects.get(username='@johndoe')
+        cache.clear()
 
     def test_log_in_url(self):
         self.assertEqual(self.url,'/log_in/')
@@ -141,3 +145,61 @@ class LogInViewTestCase(TestCase, LogInTester, MenuTesterMixin):
         messages_list = list(response.context['messages'])
         self.assertEqual(len(messages_list), 1)
         self.assertEqual(messages_list[0].level, messages.ERROR)
+
+    def test_log_in_is_throttled_after_repeated_failures(self):
+        form_input = {'username': '@johndoe', 'password': 'WrongPassword123'}
+        for _ in range(5):
+            self.client.post(self.url, form_input)
+        form_input['password'] = 'Password123'
+        with patch('tasks.forms.authenticate') as authenticate:
+            response = self.client.post(self.url, form_input)
+        authenticate.assert_not_called()
+        self.assertEqual(response.status_code, 429)
+        self.assertFalse(self._is_logged_in())
+        messages_list = list(response.context['messages'])
+        self.assertEqual(messages_list[0].level, messages.ERROR)
+
+    def test_log_in_is_throttled_per_client_ip(self):
+        with override_settings(LOGIN_THROTTLE_RATES={'username': (100, 300), 'ip': (3, 300)}):
+            for index in range(3):
+                self.client.post(self.url, {'username': f'@unknown{index}', 'password': 'WrongPassword123'})
+            response = self.client.post(self.url, {'username': '@johndoe', 'password': 'Password123'})
+            self.assertEqual(response.status_code, 429)
+            response = self.client.post(
+                self.url, {'username': '@johndoe', 'password': 'Password123'}, REMOTE_ADDR='10.0.0.2'
+            )
+        self.assertEqual(response.status_code, 302)
+
+    def test_concurrent_attempts_cannot_exceed_the_limit(self):
+        throttles = [LoginThrottle('@johndoe') for _ in range(8)]
+        self.assertEqual([throttle.allows_attempt() for throttle in throttles], [True] * 5 + [False] * 3)
+        throttles[0].record_success()
+        self.assertTrue(LoginThrottle('@johndoe').allows_attempt())
+
+    def test_log_in_is_allowed_again_once_the_period_has_passed(self):
+        form_input = {'username': '@johndoe', 'password': 'WrongPassword123'}
+        now = 1_000_000 * 300
+        with patch('tasks.throttling.time.time', return_value=now):
+            for _ in range(5):
+                self.client.post(self.url, form_input)
+            form_input['password'] = 'Password123'
+            self.assertEqual(self.client.post(self.url, form_input).status_code, 429)
+        with patch('tasks.throttling.time.time', return_value=now + 300):
+            self.assertEqual(self.client.post(self.url, form_input).status_code, 429)
+        with patch('tasks.throttling.time.time', return_value=now + 600):
+            self.assertEqual(self.client.post(self.url, form_input).status_code, 302)
+
+    def test_attempts_are_limited_across_window_boundaries(self):
+        now = 1_000_000 * 300
+        with patch('tasks.throttling.time.time', return_value=now + 299):
+            self.assertEqual([LoginThrottle('@johndoe').allows_attempt() for _ in range(5)], [True] * 5)
+        # Half way through the next window, half of the previous window's attempts still count.
+        with patch('tasks.throttling.time.time', return_value=now + 450):
+            self.assertEqual([LoginThrottle('@johndoe').allows_attempt() for _ in range(4)], [True, True, False, False])
+
+    def test_successful_log_ins_are_not_throttled(self):
+        form_input = {'username': '@johndoe', 'password': 'Password123'}
+        for _ in range(10):
+            response = self.client.post(self.url, form_input)
+            self.assertEqual(response.status_code, 302)
+            self.client.logout()
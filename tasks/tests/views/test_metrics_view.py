@@ -0,0 +1,132 @@
+"""Tests of the request metrics and the metrics view."""
+import re
+import threading
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from task_manager import settings as settings_module
+from tasks.metrics import Registry, registry
+from tasks.models import User
+
+@override_settings(METRICS_ALLOWED_IPS=['127.0.0.1'])
+class MetricsViewTestCase(TestCase):
+    """Tests of the request metrics and the metrics view."""
+
+    fixtures = ['tasks/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        registry.clear()
+        self.user = User.objects.get(username='@johndoe')
+        self.url = reverse('metrics')
+        self.async_client.force_login(self.user)
+
+    def test_metrics_url(self):
+        self.assertEqual(self.url, '/metrics')
+
+    def test_metrics_are_recorded_per_view(self):
+        self.client.force_login(self.user)
+        page = self.client.get(reverse('my_tasks'))
+        self.client.get(reverse('my_tasks'))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        metrics = self._samples(response)
+        self.assertEqual(metrics['task_manager_http_request_duration_seconds_count{view="my_tasks"}'], 2)
+        self.assertEqual(metrics['task_manager_http_request_duration_seconds_bucket{view="my_tasks",le="+Inf"}'], 2)
+        self.assertEqual(metrics['task_manager_http_responses_total{view="my_tasks",status="200"}'], 2)
+        self.assertGreater(metrics['task_manager_db_queries_total{view="my_tasks"}'], 0)
+        self.assertGreater(metrics['task_manager_db_query_duration_seconds_total{view="my_tasks"}'], 0)
+        self.assertEqual(metrics['task_manager_http_response_size_bytes_count{view="my_tasks"}'], 2)
+        self.assertEqual(metrics['task_manager_http_response_size_bytes_sum{view="my_tasks"}'], 2 * len(page.content))
+
+    def test_unresolved_requests_share_a_label(self):
+        self.client.get('/no/such/page/')
+        metrics = self._samples(self.client.get(self.url))
+        self.assertEqual(metrics['task_manager_http_responses_total{view="<unresolved>",status="404"}'], 1)
+
+    @override_settings(ROOT_URLCONF='task_manager.asgi_urls')
+    async def test_queries_of_async_views_are_counted(self):
+        await self.async_client.get(reverse('my_tasks'))
+        metrics = self._samples(await self.async_client.get(self.url))
+        self.assertEqual(metrics['task_manager_http_responses_total{view="my_tasks",status="200"}'], 1)
+        self.assertGreater(metrics['task_manager_db_queries_total{view="my_tasks"}'], 0)
+
+    @override_settings(METRICS_ALLOWED_IPS=[])
+    def test_metrics_are_only_shown_to_staff_from_other_addresses(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    @override_settings(METRICS_ALLOWED_IPS=[], METRICS_TOKEN='scrape-token')
+    def test_metrics_are_shown_to_scrapers_with_the_token(self):
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION='Bearer scrape-token').status_code, 200)
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION='Bearer wrong-token').status_code, 403)
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION='Basic scrape-token').status_code, 403)
+
+    def test_loopback_requests_are_not_allowed_by_default(self):
+        with self.settings(METRICS_ALLOWED_IPS=settings_module.METRICS_ALLOWED_IPS, METRICS_TOKEN=settings_module.METRICS_TOKEN):
+            self.assertEqual(self.client.get(self.url, REMOTE_ADDR='127.0.0.1').status_code, 403)
+            self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION='Bearer ').status_code, 403)
+
+    def _samples(self, response):
+        samples = {}
+        for line in response.content.decode().splitlines():
+            if not line.startswith('#'):
+                name, value = line.rsplit(' ', 1)
+                samples[name] = float(value)
+        return samples
+
+
+class MetricsRegistryTestCase(SimpleTestCase):
+    """Unit tests of the request metrics registry."""
+
+    def test_histogram_buckets_are_cumulative(self):
+        metrics = Registry()
+        metrics.record('my_tasks', 0.003, 200, 4, 0.001, 100)
+        metrics.record('my_tasks', 0.02, 200, 4, 0.001, 100)
+        metrics.record('my_tasks', 20.0, 500, 1, 0.001, 100)
+        exposition = metrics.exposition()
+        self.assertIn('task_manager_http_request_duration_seconds_bucket{view="my_tasks",le="0.005"} 1\n', exposition)
+        self.assertIn('task_manager_http_request_duration_seconds_bucket{view="my_tasks",le="0.025"} 2\n', exposition)
+        self.assertIn('task_manager_http_request_duration_seconds_bucket{view="my_tasks",le="10.0"} 2\n', exposition)
+        self.assertIn('task_manager_http_request_duration_seconds_bucket{view="my_tasks",le="+Inf"} 3\n', exposition)
+        self.assertIn('task_manager_http_responses_total{view="my_tasks",status="500"} 1\n', exposition)
+        self.assertIn('task_manager_db_queries_total{view="my_tasks"} 9\n', exposition)
+        self.assertIn('# TYPE task_manager_http_request_duration_seconds histogram\n', exposition)
+
+    def test_streamed_responses_have_no_size(self):
+        metrics = Registry()
+        metrics.record('export_my_tasks', 0.1, 200, 3, 0.01)
+        self.assertIn('task_manager_http_response_size_bytes_count{view="export_my_tasks"} 0\n', metrics.exposition())
+
+    def test_threads_are_added_up(self):
+        metrics = Registry()
+        threads = [threading.Thread(target=metrics.record, args=('search', 0.01, 200, 2, 0.001, 10)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(metrics.totals()['search'].requests, 4)
+        self.assertEqual(metrics.totals()['search'].queries, 8)
+
+    def test_statistics_of_exited_threads_are_merged(self):
+        metrics = Registry()
+        metrics.record('search', 0.01, 200, 1, 0.001, 10)
+        for _ in range(3):
+            threads = [threading.Thread(target=metrics.record, args=('search', 0.01, 200, 2, 0.001, 10)) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(metrics._threads), 1)
+        self.assertEqual(metrics.totals()['search'].requests, 13)
+        self.assertEqual(metrics.totals()['search'].queries, 25)
+        metrics.clear()
+        self.assertEqual(metrics.totals(), {})
+
+    def test_label_values_are_escaped(self):
+        metrics = Registry()
+        metrics.record('a"b\\c\nd', 0.01, 200, 0, 0.0)
+        self.assertTrue(re.search(r'view="a\\"b\\\\c\\nd"', metrics.exposition()))
@@ -1,14 +1,35 @@
 """Tests of the my tasks view."""
-from django.test import TestCase
+from datetime import date, timedelta
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from tasks.models import User, Task
+from tasks.pagination import encode_cursor
+
+
+def assert_sorted_by_index(test, url, params):
+    """Assert that the page of tasks at url is read in order from an index, rather than sorted."""
+
+    caches['pages'].clear()
+    with CaptureQueriesContext(connection) as queries:
+        test.client.get(url, params)
+    task_queries = [query['sql'] for query in queries.captured_queries if '"tasks_task"."task_name"' in query['sql']]
+    test.assertTrue(task_queries)
+    with connection.cursor() as cursor:
+        for sql in task_queries:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+            test.assertNotIn('TEMP B-TREE', plan, f'{params}: {plan}')
 
 class MyTasksViewTestCase(TestCase):
     """Tests of the my tasks view."""
 
-    fixtures = ['tasks/tests/fixtures/default_user.json']
+    fixtures = ['tasks/tests/fixtures/default_user.json', 'tasks/tests/fixtures/other_users.json']
 
     def setUp(self):
+        caches['pages'].clear()
         self.url = reverse('my_tasks')
         self.user = User.objects.get(username='@johndoe')
 
@@ -25,4 +46,197 @@ class MyTasksViewTestCase(TestCase):
         response = self.client.get(self.url)
         self.assertRedirects(response, '/log_in/?next=' + self.url)
 
-    
\ No newline at end of file
+    @override_settings(TASKS_PER_PAGE=5)
+    def test_my_tasks_are_paginated_by_due_date(self):
+        self._create_tasks(12)
+        self.client.login(username=self.user.username, password="Password123")
+        response = self.client.get(self.url)
+        page = response.context['page']
+        self.assertEqual([task.task_name for task in page], ['Task 0', 'Task 1', 'Task 2', 'Task 3', 'Task 4'])
+        self.assertFalse(page.has_previous())
+        self.assertTrue(page.has_next())
+        self.assertContains(response, f'?after={page.next_cursor()}')
+
+    @override_settings(TASKS_PER_PAGE=5)
+    def test_my_tasks_next_and_previous_pages(self):
+        self._create_tasks(12)
+        self.client.login(username=self.user.username, password="Password123")
+        first_page = self.client.get(self.url).context['page']
+        response = self.client.get(self.url, {'after': first_page.next_cursor()})
+        second_page = response.context['page']
+        self.assertEqual([task.task_name for task in second_page], ['Task 5', 'Task 6', 'Task 7', 'Task 8', 'Task 9'])
+        self.assertEqual(second_page.offset, 5)
+        self.assertContains(response, '<th scope="row">6</th>', html=True)
+        third_page = self.client.get(self.url, {'after': second_page.next_cursor()}).context['page']
+        self.assertEqual([task.task_name for task in third_page], ['Task 10', 'Undated task'])
+        self.assertFalse(third_page.has_next())
+        previous_page = self.client.get(self.url, {'before': third_page.previous_cursor()}).context['page']
+        self.assertEqual([task.id for task in previous_page], [task.id for task in second_page])
+        self.assertEqual(previous_page.offset, 5)
+
+    @override_settings(TASKS_PER_PAGE=5)
+    def test_my_tasks_page_query_count_does_not_depend_on_depth(self):
+        self._create_tasks(30)
+        self.client.login(username=self.user.username, password="Password123")
+        with CaptureQueriesContext(connection) as first_page_queries:
+            page = self.client.get(self.url).context['page']
+        for _ in range(2):
+            page = self.client.get(self.url, {'after': page.next_cursor()}).context['page']
+        with CaptureQueriesContext(connection) as deep_page_queries:
+            self.client.get(self.url, {'after': page.next_cursor()})
+        self.assertEqual(len(deep_page_queries), len(first_page_queries))
+        self.assertNotIn('OFFSET', deep_page_queries.captured_queries[-1]['sql'])
+
+    def test_my_tasks_query_count_does_not_grow_with_tasks(self):
+        self.client.login(username=self.user.username, password="Password123")
+        self._create_tasks(2)
+        with CaptureQueriesContext(connection) as few_tasks_queries:
+            self.client.get(self.url)
+        self._create_tasks(10)
+        caches['pages'].clear()
+        with CaptureQueriesContext(connection) as many_tasks_queries:
+            response = self.client.get(self.url)
+        self.assertEqual(len(many_tasks_queries), len(few_tasks_queries))
+        self.assertContains(response, self.user.username)
+
+    def test_my_tasks_page_is_cached_per_user(self):
+        self._create_tasks(3)
+        self.client.login(username=self.user.username, password="Password123")
+        with CaptureQueriesContext(connection) as cold_queries:
+            cold_response = self.client.get(self.url)
+        with CaptureQueriesContext(connection) as warm_queries:
+            warm_response = self.client.get(self.url)
+        self.assertLess(len(warm_queries), len(cold_queries))
+        self.assertEqual(warm_response.content, cold_response.content)
+        other_user = User.objects.get(username='@janedoe')
+        self.client.login(username=other_user.username, password="Password123")
+        response = self.client.get(self.url)
+        self.assertNotContains(response, 'Paginated task')
+
+    def test_my_tasks_cache_is_invalidated_by_creating_a_task(self):
+        self.client.login(username=self.user.username, password="Password123")
+        self.client.get(self.url)
+        self.client.post(reverse('create_task'), {
+            'task_name': 'Freshly created task',
+            'task_description': 'Created after caching',
+            'due': date.today() + timedelta(days=1),
+            'status': 'not_started',
+        })
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Freshly created task')
+
+    def test_my_tasks_cache_is_invalidated_by_saving_tasks_outside_the_views(self):
+        self._create_tasks(2)
+        self.client.login(username=self.user.username, password="Password123")
+        self.client.get(self.url)
+        task = Task.objects.get(task_name='Task 0')
+        task.task_name = 'Renamed in the admin'
+        task.save()
+        self.assertContains(self.client.get(self.url), 'Renamed in the admin')
+        task.assigned = User.objects.get(username='@janedoe')
+        task.save()
+        self.assertNotContains(self.client.get(self.url), 'Renamed in the admin')
+        Task.objects.get(task_name='Undated task').delete()
+        self.assertNotContains(self.client.get(self.url), 'Undated task')
+
+    def test_my_tasks_cache_is_invalidated_by_editing_the_user(self):
+        self.client.login(username=self.user.username, password="Password123")
+        self.client.get(self.url)
+        user = User.objects.get(pk=self.user.pk)
+        user.username = '@renamed'
+        user.save()
+        self.assertContains(self.client.get(self.url), '@renamed')
+
+    def test_unchanged_my_tasks_page_is_not_modified(self):
+        self._create_tasks(3)
+        self.client.login(username=self.user.username, password="Password123")
+        response = self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(any('"tasks_task"."task_name"' in query['sql'] for query in queries.captured_queries))
+
+    def test_changed_my_tasks_page_is_modified(self):
+        self._create_tasks(3)
+        self.client.login(username=self.user.username, password="Password123")
+        etag = self.client.get(self.url)['ETag']
+        task = Task.objects.filter(assigned=self.user).first()
+        task.status = 'done'
+        task.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_my_tasks_ignores_malformed_cursor(self):
+        self.client.login(username=self.user.username, password="Password123")
+        response = self.client.get(self.url, {'after': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['page'].offset, 0)
+
+    def test_my_tasks_ignores_cursor_with_invalid_key(self):
+        self._create_tasks(3)
+        self.client.login(username=self.user.username, password="Password123")
+        for key, task_id in [('garbage', 1), (12, 1), ({'a': 1}, 1), ('2026-10-18', 2 ** 64)]:
+            cursor = encode_cursor({'key': key, 'id': task_id, 'position': 0})
+            response = self.client.get(self.url, {'after': cursor})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context['page'].offset, 0)
+            self.assertEqual(len(response.context['page']), 3)
+
+    def test_my_tasks_are_filtered_by_status_and_due_date(self):
+        self._create_tasks(6)
+        Task.objects.filter(task_name__in=['Task 1', 'Task 3', 'Task 4']).update(status='done')
+        self.client.login(username=self.user.username, password="Password123")
+        response = self.client.get(self.url, {
+            'status': 'done', 'due_after': date.today() + timedelta(days=2), 'due_before': date.today() + timedelta(days=4),
+        })
+        self.assertEqual([task.task_name for task in response.context['page']], ['Task 3', 'Task 4'])
+        self.assertContains(response, '<option value="done" selected>Done</option>', html=True)
+
+    def test_my_tasks_are_sorted_by_name_and_status(self):
+        self._create_tasks(4)
+        Task.objects.filter(task_name='Task 2').update(status='done')
+        Task.objects.filter(task_name='Task 0').update(status='in_progress')
+        self.client.login(username=self.user.username, password="Password123")
+        response = self.client.get(self.url, {'sort': '-name'})
+        self.assertEqual([task.task_name for task in response.context['page']], ['Undated task', 'Task 2', 'Task 1', 'Task 0'])
+        response = self.client.get(self.url, {'sort': 'status'})
+        self.assertEqual([task.task_name for task in response.context['page']], ['Task 2', 'Task 0', 'Task 1', 'Undated task'])
+
+    @override_settings(TASKS_PER_PAGE=2)
+    def test_my_tasks_page_links_keep_the_filters(self):
+        self._create_tasks(6)
+        self.client.login(username=self.user.username, password="Password123")
+        filters = {'sort': '-name', 'due_after': (date.today() + timedelta(days=1)).isoformat()}
+        response = self.client.get(self.url, filters)
+        page = response.context['page']
+        self.assertEqual([task.task_name for task in page], ['Task 4', 'Task 3'])
+        self.assertContains(response, f'?due_after={filters["due_after"]}&amp;sort=-name&amp;after={page.next_cursor()}')
+        next_page = self.client.get(self.url, {**filters, 'after': page.next_cursor()}).context['page']
+        self.assertEqual([task.task_name for task in next_page], ['Task 2', 'Task 1'])
+        self.assertEqual(next_page.offset, 2)
+
+    @override_settings(TASKS_PER_PAGE=2)
+    def test_my_tasks_ignores_cursor_from_other_filters(self):
+        self._create_tasks(6)
+        self.client.login(username=self.user.username, password="Password123")
+        cursor = self.client.get(self.url, {'sort': '-name'}).context['page'].next_cursor()
+        page = self.client.get(self.url, {'after': cursor}).context['page']
+        self.assertEqual(page.offset, 0)
+        self.assertEqual([task.task_name for task in page], ['Task 0', 'Task 1'])
+
+    def test_my_tasks_sort_orders_are_read_from_an_index(self):
+        self._create_tasks(3)
+        self.client.login(username=self.user.username, password="Password123")
+        for sort in ['due', '-due', 'status', '-status', 'name', '-name']:
+            assert_sorted_by_index(self, self.url, {'sort': sort})
+            assert_sorted_by_index(self, self.url, {'sort': sort, 'status': 'done'})
+
+    def _create_tasks(self, count):
+        for index in range(count - 1):
+            Task.objects.create(
+                task_name=f'Task {index}',
+                task_description='Paginated task',
+                due=date.today() + timedelta(days=index),
+                assigned=self.user,
+            )
+        Task.objects.create(task_name='Undated task', task_description='Paginated task', assigned=self.user)
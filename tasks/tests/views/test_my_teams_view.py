@@ -1,5 +1,8 @@
 """Tests of the my teams view."""
+from django.core.cache import caches
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from tasks.models import User, Team
 
@@ -9,6 +12,7 @@ class MyTeamsViewTestCase(TestCase):
     fixtures = ['tasks/tests/fixtures/default_user.json']
 
     def setUp(self):
+        caches['pages'].clear()
         self.url = reverse('my_teams')
         self.user = User.objects.get(username='@johndoe')
 
@@ -23,4 +27,51 @@ class MyTeamsViewTestCase(TestCase):
 
     def test_redirect_if_not_logged_in(self):
         response = self.client.get(self.url)
-        self.assertRedirects(response, '/log_in/?next=' + self.url)
\ No newline at end of file
+        self.assertRedirects(response, '/log_in/?next=' + self.url)
+
+    def test_my_teams_query_count_does_not_grow_with_teams(self):
+        self.client.login(username=self.user.username, password="Password123")
+        self._create_teams(1)
+        with CaptureQueriesContext(connection) as few_teams_queries:
+            self.client.get(self.url)
+        self._create_teams(5)
+        with CaptureQueriesContext(connection) as many_teams_queries:
+            response = self.client.get(self.url)
+        self.assertEqual(len(many_teams_queries), len(few_teams_queries))
+        self.assertEqual(len(response.context['teams']), 6)
+
+    def test_my_teams_cache_is_invalidated_by_editing_a_team(self):
+        self.client.login(username=self.user.username, password="Password123")
+        self._create_teams(1)
+        team = Team.objects.get(team_name='Team 0')
+        self.client.get(self.url)
+        self.client.post(reverse('edit_team', kwargs={'team_id': team.id}), {
+            'team_name': 'Renamed team',
+            'team_description': 'A team',
+            'add_members': '',
+        })
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Renamed team')
+
+    def test_my_teams_cache_is_invalidated_by_changes_outside_the_views(self):
+        self.client.login(username=self.user.username, password="Password123")
+        self._create_teams(2)
+        self.client.get(self.url)
+        team = Team.objects.get(team_name='Team 0')
+        team.team_name = 'Renamed in the admin'
+        team.save()
+        self.assertContains(self.client.get(self.url), 'Renamed in the admin')
+        self.user.team_set.remove(team)
+        self.assertNotContains(self.client.get(self.url), 'Renamed in the admin')
+        Team.objects.get(team_name='Team 1').team_members.clear()
+        self.assertNotContains(self.client.get(self.url), 'Team 1')
+        team = Team.objects.create(team_name='Added in the admin', team_description='A team')
+        team.team_members.add(self.user)
+        self.assertContains(self.client.get(self.url), 'Added in the admin')
+        team.delete()
+        self.assertNotContains(self.client.get(self.url), 'Added in the admin')
+
+    def _create_teams(self, count):
+        for index in range(count):
+            team = Team.objects.create(team_name=f'Team {index}', team_description='A team')
+            team.team_members.add(self.user)
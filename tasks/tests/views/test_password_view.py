@@ -1,6 +1,8 @@
 """Tests for the password view."""
+from unittest.mock import patch
 from django.contrib import messages
 from django.contrib.auth.hashers import check_password
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 from tasks.forms import PasswordForm
@@ -17,6 +19,7 @@ class PasswordViewTest(TestCase):
     def setUp(self):
         self.user = User.objects.get(username='@johndoe')
         self.url = reverse('password')
+        cache.clear()
         self.form_input = {
             'password': 'Password123',
             'new_password': 'NewPassword123',
@@ -79,3 +82,16 @@ class PasswordViewTest(TestCase):
         self.assertRedirects(response, redirect_url, status_code=302, target_status_code=200)
         is_password_correct = check_password('Password123', self.user.password)
         self.assertTrue(is_password_correct)
+
+    def test_password_change_is_throttled_after_repeated_failures(self):
+        self.client.login(username=self.user.username, password='Password123')
+        self.form_input['password'] = 'WrongPassword123'
+        for _ in range(5):
+            self.client.post(self.url, self.form_input)
+        self.form_input['password'] = 'Password123'
+        with patch('tasks.forms.authenticate') as authenticate:
+            response = self.client.post(self.url, self.form_input)
+        authenticate.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(check_password('Password123', self.user.password))
@@ -0,0 +1,45 @@
+"""Tests of the task search view."""
+from django.test import TestCase
+from django.urls import reverse
+from tasks.models import User, Task, Team
+
+class SearchViewTestCase(TestCase):
+    """Tests of the task search view."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/teams.json',
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.other_user = User.objects.get(username='@janedoe')
+        self.team = Team.objects.get(id=1)
+        self.url = reverse('search')
+        self.client.login(username=self.user.username, password='Password123')
+
+    def test_search_url(self):
+        self.assertEqual(self.url, '/dashboard/search/')
+
+    def test_get_search_without_query(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'search.html')
+        self.assertEqual(response.context['results'], [])
+
+    def test_search_shows_highlighted_matches(self):
+        task = Task.objects.create(
+            task_name='Renew insurance', task_description='Call the broker', assigned=self.user, team=self.team,
+        )
+        Task.objects.create(task_name='Renew passport', task_description='Post office', assigned=self.other_user)
+        response = self.client.get(self.url, {'q': 'renew'})
+        self.assertEqual(response.context['results'], [task])
+        self.assertContains(response, '<mark>Renew</mark> insurance', html=True)
+        self.assertContains(response, reverse('team_info', kwargs={'team_id': self.team.id}))
+        self.assertNotContains(response, 'passport')
+
+    def test_search_redirects_when_not_logged_in(self):
+        self.client.logout()
+        response = self.client.get(self.url, {'q': 'renew'})
+        self.assertRedirects(response, f"{reverse('log_in')}?next={self.url}%3Fq%3Drenew", status_code=302, target_status_code=200)
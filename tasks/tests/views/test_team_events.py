@@ -0,0 +1,237 @@
+"""Tests of the live team events published by views and streamed to team pages."""
+import asyncio
+import json
+from datetime import date, timedelta
+from unittest.mock import patch
+from asgiref.testing import ApplicationCommunicator
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils.formats import date_format
+from task_manager.asgi import application
+from tasks import async_views
+from tasks.events import RESYNC, TeamEventBroker, broker, format_event
+from tasks.models import User, Task, Team
+
+class TeamEventBrokerTestCase(TestCase):
+    """Tests of the in-process team event broker."""
+
+    async def test_subscribers_receive_their_teams_events(self):
+        team_broker = TeamEventBroker()
+        subscription = team_broker.subscribe(1)
+        other_subscription = team_broker.subscribe(2)
+        team_broker.publish(1, {'type': 'task_deleted', 'task': {'id': 5}})
+        self.assertEqual(await subscription.get(timeout=1), {'type': 'task_deleted', 'task': {'id': 5}})
+        self.assertIsNone(await other_subscription.get(timeout=0.01))
+
+    async def test_unsubscribed_subscribers_receive_nothing(self):
+        team_broker = TeamEventBroker()
+        subscription = team_broker.subscribe(1)
+        team_broker.unsubscribe(subscription)
+        self.assertEqual(team_broker.subscriber_count(1), 0)
+        team_broker.publish(1, {'type': 'task_deleted', 'task': {'id': 5}})
+        self.assertIsNone(await subscription.get(timeout=0.01))
+
+    @override_settings(TEAM_EVENT_QUEUE_SIZE=2)
+    async def test_full_queue_is_replaced_with_resync(self):
+        team_broker = TeamEventBroker()
+        subscription = team_broker.subscribe(1)
+        for task_id in range(3):
+            subscription.deliver({'type': 'task_deleted', 'task': {'id': task_id}})
+        self.assertEqual(await subscription.get(timeout=1), RESYNC)
+        self.assertIsNone(await subscription.get(timeout=0.01))
+
+    def test_format_event(self):
+        self.assertEqual(
+            format_event({'type': 'task_deleted', 'task': {'id': 5}}),
+            'event: task_deleted\ndata: {"type":"task_deleted","task":{"id":5}}\n\n',
+        )
+
+
+class TeamEventPublishingTestCase(TestCase):
+    """Tests that changes to a team publish events once they commit."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/teams.json',
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.team = Team.objects.get(id=1)
+        self.task = Task.objects.create(
+            task_name='Team task', task_description='Team task', assigned=self.user, team=self.team,
+            due=date.today() + timedelta(days=1),
+        )
+        self.client.login(username=self.user.username, password='Password123')
+
+    def test_create_team_task_publishes_task_created(self):
+        due = date.today() + timedelta(days=2)
+        events = self._published_events(lambda: self.client.post(reverse('create_team_task', kwargs={'team_id': self.team.id}), {
+            'task_name': 'New task', 'task_description': 'New task', 'due': due.isoformat(),
+            'assigned': self.user.id, 'status': 'in_progress',
+        }))
+        task = Task.objects.get(task_name='New task')
+        self.assertEqual(events, [(self.team.id, {'type': 'task_created', 'task': {
+            'id': task.id, 'task_name': 'New task', 'task_description': 'New task', 'due': due.isoformat(),
+            'due_display': date_format(due), 'assigned': '@johndoe', 'status': 'in_progress',
+            'status_display': 'In Progress',
+        }})])
+
+    def test_edit_task_publishes_task_updated(self):
+        events = self._published_events(lambda: self.client.post(reverse('edit_task', kwargs={'task_id': self.task.id}), {
+            'task_name': 'Renamed task', 'task_description': 'Team task', 'due': self.task.due.isoformat(),
+            'assigned': self.user.id, 'status': 'done',
+        }))
+        self.assertEqual(len(events), 1)
+        team_id, event = events[0]
+        self.assertEqual(team_id, self.team.id)
+        self.assertEqual(event['type'], 'task_updated')
+        self.assertEqual(event['task']['task_name'], 'Renamed task')
+        self.assertEqual(event['task']['status'], 'done')
+
+    def test_delete_task_publishes_task_deleted(self):
+        task_id = self.task.id
+        events = self._published_events(lambda: self.client.post(reverse('delete_task', kwargs={'task_id': task_id})))
+        self.assertEqual(events, [(self.team.id, {'type': 'task_deleted', 'task': {'id': task_id}})])
+
+    def test_adding_a_member_publishes_member_added(self):
+        new_member = User.objects.get(username='@janedoe')
+        events = self._published_events(lambda: self.client.post(reverse('edit_team', kwargs={'team_id': self.team.id}), {
+            'team_name': self.team.team_name, 'team_description': self.team.team_description, 'add_members': '@janedoe',
+        }))
+        self.assertEqual(events, [(self.team.id, {'type': 'member_added', 'member': {'id': new_member.id, 'username': '@janedoe'}})])
+
+    def test_bulk_action_publishes_resync(self):
+        events = self._published_events(lambda: self.client.post(reverse('bulk_team_tasks', kwargs={'team_id': self.team.id}), {
+            'tasks': [self.task.id], 'action': 'status', 'status': 'done',
+        }))
+        self.assertEqual(events, [(self.team.id, RESYNC)])
+
+    def test_personal_task_changes_publish_nothing(self):
+        task = Task.objects.create(
+            task_name='Personal task', task_description='Personal task', assigned=self.user,
+            due=date.today() + timedelta(days=1),
+        )
+        events = self._published_events(lambda: self.client.post(reverse('delete_task', kwargs={'task_id': task.id})))
+        self.assertEqual(events, [])
+
+    def test_nothing_is_published_before_commit(self):
+        with patch.object(broker, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=False):
+                self.client.post(reverse('delete_task', kwargs={'task_id': self.task.id}))
+        publish.assert_not_called()
+
+    def test_sync_event_stream_tells_clients_not_to_reconnect(self):
+        response = self.client.get(reverse('team_events', kwargs={'team_id': self.team.id}))
+        self.assertEqual(response.status_code, 204)
+
+    def _published_events(self, make_request):
+        with patch.object(broker, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                make_request()
+        return [call.args for call in publish.call_args_list]
+
+
+@override_settings(ROOT_URLCONF='task_manager.asgi_urls')
+class AsyncTeamEventsTestCase(TestCase):
+    """Tests of the server-sent event stream served by the ASGI application."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/teams.json',
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.team = Team.objects.get(id=1)
+        self.url = reverse('team_events', kwargs={'team_id': self.team.id})
+        self.async_client.force_login(self.user)
+
+    def test_team_events_url(self):
+        self.assertEqual(self.url, f'/dashboard/my_teams/team_info/{self.team.id}/events/')
+
+    async def test_team_events_streams_events(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+        self.assertEqual(broker.subscriber_count(self.team.id), 1)
+        broker.publish(self.team.id, {'type': 'task_deleted', 'task': {'id': 5}})
+        message = (await anext(stream)).decode()
+        self.assertEqual(message.splitlines()[0], 'event: task_deleted')
+        self.assertEqual(json.loads(message.splitlines()[1][len('data: '):]), {'type': 'task_deleted', 'task': {'id': 5}})
+        await stream.aclose()
+
+    async def test_team_event_stream_unsubscribes_when_closed(self):
+        stream = async_views.team_event_stream(self.team.id, self.user)
+        await anext(stream)
+        self.assertEqual(broker.subscriber_count(self.team.id), 1)
+        await stream.aclose()
+        self.assertEqual(broker.subscriber_count(self.team.id), 0)
+
+    @override_settings(TEAM_EVENT_HEARTBEAT=0.01)
+    async def test_team_event_stream_sends_keep_alives_to_members(self):
+        stream = async_views.team_event_stream(self.team.id, self.user)
+        await anext(stream)
+        self.assertEqual(await anext(stream), ': keep-alive\n\n')
+        await stream.aclose()
+
+    @override_settings(TEAM_EVENT_HEARTBEAT=0.01)
+    async def test_team_event_stream_ends_when_user_leaves_the_team(self):
+        stream = async_views.team_event_stream(self.team.id, self.user)
+        await anext(stream)
+        await self.team.team_members.aremove(self.user)
+        with self.assertRaises(StopAsyncIteration):
+            await anext(stream)
+        self.assertEqual(broker.subscriber_count(self.team.id), 0)
+
+    async def test_team_events_is_not_found_for_other_teams(self):
+        other_team = await Team.objects.acreate(team_name='Other team', team_description='Not my team')
+        response = await self.async_client.get(reverse('team_events', kwargs={'team_id': other_team.id}))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_team_events_redirects_when_not_logged_in(self):
+        self.async_client.cookies.clear()
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+
+class AsgiTeamEventsTestCase(TransactionTestCase):
+    """Tests of the team event stream served through the ASGI application.
+
+    The ASGI handler runs each request's sync code in a thread of its own,
+    whose connection cannot see the rows of a test transaction.
+    """
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/teams.json',
+    ]
+
+    def setUp(self):
+        self.team = Team.objects.get(id=1)
+        self.client.login(username='@johndoe', password='Password123')
+
+    async def test_team_event_stream_unsubscribes_when_client_disconnects(self):
+        communicator = ApplicationCommunicator(application, {
+            'type': 'http', 'method': 'GET', 'query_string': b'',
+            'path': reverse('team_events', kwargs={'team_id': self.team.id}),
+            'headers': [(b'host', b'testserver'), (b'cookie', self.client.cookies.output(header='', sep=';').encode())],
+        })
+        await communicator.send_input({'type': 'http.request', 'body': b''})
+        self.assertEqual((await communicator.receive_output())['status'], 200)
+        self.assertEqual((await communicator.receive_output())['body'], b'retry: 3000\n\n')
+        self.assertEqual(broker.subscriber_count(self.team.id), 1)
+        await communicator.send_input({'type': 'http.disconnect'})
+        # Waiting on the communicator would cancel the application itself once it timed out.
+        for _ in range(100):
+            if broker.subscriber_count(self.team.id) == 0:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(broker.subscriber_count(self.team.id), 0)
+        await communicator.wait()
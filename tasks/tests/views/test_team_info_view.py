@@ -1,7 +1,13 @@
 """Unit tests of the team info view."""
+from datetime import date, timedelta
+from django.core.cache import caches
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from tasks.models import Task, Team, User
+from tasks.tests.helpers import without_csrf_tokens
+from tasks.tests.views.test_my_tasks_view import assert_sorted_by_index
 
 class TeamInfoViewTestCase(TestCase):
     """Unit tests of the team info view."""
@@ -13,6 +19,7 @@ class TeamInfoViewTestCase(TestCase):
     ]
 
     def setUp(self):
+        caches['pages'].clear()
         self.user = User.objects.get(username='@johndoe')
         self.client.login(username=self.user.username, password='Password123')
         self.team = Team.objects.get(id=1)
@@ -31,4 +38,72 @@ class TeamInfoViewTestCase(TestCase):
     def test_team_info_contains_tasks(self):
         response = self.client.get(self.url)
         tasks = response.context['tasks']
-        self.assertEqual(tasks.count(), Task.objects.filter(team=self.team).count())
\ No newline at end of file
+        self.assertEqual(len(tasks), Task.objects.filter(team=self.team).count())
+
+    def test_team_info_query_count_does_not_grow_with_tasks_or_members(self):
+        with CaptureQueriesContext(connection) as small_team_queries:
+            self.client.get(self.url)
+        for index in range(5):
+            member = User.objects.create_user(
+                f'@member{index}', email=f'member{index}@example.org', first_name='Team', last_name='Member'
+            )
+            self.team.team_members.add(member)
+            Task.objects.create(task_name=f'Task {index}', task_description='Team task', assigned=member, team=self.team)
+        caches['pages'].clear()
+        with CaptureQueriesContext(connection) as large_team_queries:
+            response = self.client.get(self.url)
+        self.assertEqual(len(large_team_queries), len(small_team_queries))
+        self.assertContains(response, '@member4', count=5)
+
+    def test_team_info_serves_member_list_and_task_table_from_cache(self):
+        with CaptureQueriesContext(connection) as cold_queries:
+            cold_response = self.client.get(self.url)
+        with CaptureQueriesContext(connection) as warm_queries:
+            warm_response = self.client.get(self.url)
+        self.assertLess(len(warm_queries), len(cold_queries))
+        self.assertEqual(without_csrf_tokens(warm_response.content), without_csrf_tokens(cold_response.content))
+
+    def test_unchanged_team_info_page_is_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_membership_change_modifies_team_info_page(self):
+        etag = self.client.get(self.url)['ETag']
+        member = User.objects.create_user(
+            '@newmember', email='newmember@example.org', first_name='New', last_name='Member'
+        )
+        self.team.team_members.add(member)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '@newmember')
+
+    def test_team_info_cache_is_invalidated_by_creating_a_team_task(self):
+        self.client.get(self.url)
+        self.client.post(reverse('create_team_task', kwargs={'team_id': self.team.id}), {
+            'task_name': 'Freshly created team task',
+            'task_description': 'Created after caching',
+            'due': date.today() + timedelta(days=1),
+            'status': 'not_started',
+        })
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Freshly created team task')
+
+    def test_team_info_filters_by_assignee_and_status(self):
+        member = User.objects.create_user('@member', email='member@example.org', first_name='Team', last_name='Member')
+        self.team.team_members.add(member)
+        task = Task.objects.create(
+            task_name='Member task', task_description='Team task', assigned=member, team=self.team, status='done',
+        )
+        Task.objects.create(task_name='Other member task', task_description='Team task', assigned=member, team=self.team)
+        response = self.client.get(self.url, {'assignee': '@member', 'status': 'done'})
+        self.assertEqual(list(response.context['tasks']), [task])
+        self.assertContains(response, '<option value="@member" selected>@member</option>')
+        self.assertContains(response, 'data-filtered')
+        self.assertNotContains(self.client.get(self.url), 'data-filtered')
+
+    def test_team_info_sort_orders_are_read_from_an_index(self):
+        for sort in ['due', '-due', 'status', '-status', 'name', '-name']:
+            assert_sorted_by_index(self, self.url, {'sort': sort})
+            assert_sorted_by_index(self, self.url, {'sort': sort, 'status': 'done'})
+            assert_sorted_by_index(self, self.url, {'sort': sort, 'assignee': self.user.username})
@@ -0,0 +1,26 @@
+"""Tests of the check for assets templates load without a content hash."""
+from django.test import SimpleTestCase
+from tasks.checks import check_template_assets, template_asset_errors
+
+class TemplateAssetsCheckTestCase(SimpleTestCase):
+    """Tests of the check for assets templates load without a content hash."""
+
+    def test_templates_only_load_hashed_assets(self):
+        self.assertEqual(check_template_assets(None), [])
+
+    def test_cdn_asset_is_reported(self):
+        source = '<script src="https://cdn.jsdelivr.net/npm/bootstrap@5.1.2/dist/js/bootstrap.min.js"></script>'
+        errors = template_asset_errors('base.html', source)
+        self.assertEqual([error.id for error in errors], ['tasks.E001'])
+
+    def test_hard_coded_static_path_is_reported(self):
+        errors = template_asset_errors('base.html', '<link href="/static/custom.css" rel="stylesheet">')
+        self.assertEqual([error.id for error in errors], ['tasks.E001'])
+
+    def test_missing_static_file_is_reported(self):
+        errors = template_asset_errors('base.html', '''<link href="{% static 'missing.css' %}" rel="stylesheet">''')
+        self.assertEqual([error.id for error in errors], ['tasks.E002'])
+
+    def test_links_to_pages_are_not_reported(self):
+        source = '''<a href="{% url 'my_tasks' %}">My Tasks</a><a href="?after=abc">Next</a><a href="#">Menu</a>'''
+        self.assertEqual(template_asset_errors('my_tasks.html', source), [])
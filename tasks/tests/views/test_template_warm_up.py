@@ -0,0 +1,21 @@
+"""Tests of compiling the templates when a worker starts."""
+from django.template import engines
+from django.test import TestCase
+from tasks.warmup import warm_up_templates
+
+class TemplateWarmUpTestCase(TestCase):
+    """Tests of compiling the templates when a worker starts."""
+
+    def setUp(self):
+        self.loader = engines['django'].engine.template_loaders[0]
+        self.loader.reset()
+
+    def test_templates_are_cached_loaded(self):
+        self.assertEqual(type(self.loader).__module__, 'django.template.loaders.cached')
+
+    def test_warm_up_compiles_every_template(self):
+        names = warm_up_templates()
+        self.assertIn('my_tasks.html', names)
+        self.assertIn('partials/pagination.html', names)
+        for name in names:
+            self.assertIn(name, self.loader.get_template_cache)
@@ -0,0 +1,132 @@
+"""Query count budgets for every view and write."""
+from datetime import date, timedelta
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import URLPattern
+from task_manager.urls import urlpatterns
+from tasks.models import User
+from tasks.tests.helpers import Budget, QueryBudgetTesterMixin
+
+
+def tomorrow():
+    return (date.today() + timedelta(days=1)).isoformat()
+
+
+def new_user():
+    username = f'@newuser{User.objects.count()}'
+    return User.objects.create_user(username, email=f'{username[1:]}@example.org', first_name='New', last_name='User')
+
+
+def import_file():
+    content = f'task_name,task_description,due\nImported task,Budget task,{tomorrow()}\n'.encode()
+    return SimpleUploadedFile('tasks.csv', content, 'text/csv')
+
+
+class ViewBudgetTestCase(TestCase, QueryBudgetTesterMixin):
+    """Query count budgets for every view and write.
+
+    Views that take writes have a list of budgets, one for each way they are requested.
+    """
+
+    fixtures = ['tasks/tests/fixtures/default_user.json']
+
+    # Views that are requested without logging in.
+    logged_out_views = {'home', 'log_in', 'sign_up'}
+
+    view_budgets = {
+        'home': Budget(queries=0),
+        'dashboard': Budget(queries=3),
+        'log_in': Budget(queries=0),
+        'log_out': Budget(queries=4),
+        'password': Budget(queries=2),
+        'profile': Budget(queries=2),
+        'sign_up': Budget(queries=0),
+        'create_task': Budget(queries=3),
+        'delete_task': [
+            Budget(queries=3),
+            Budget(queries=2, method='post'),
+        ],
+        'my_tasks': Budget(queries=5),
+        'my_teams': Budget(queries=5),
+        'create_team': Budget(queries=2),
+        'delete_team': [
+            Budget(queries=3),
+            Budget(queries=7, method='post'),
+        ],
+        'team_info': Budget(queries=9),
+        'edit_team': Budget(queries=4),
+        'create_team_task': Budget(queries=4),
+        'edit_task': Budget(queries=6),
+        'search': Budget(queries=5),
+        'export_my_tasks': Budget(queries=3),
+        'export_team_tasks': Budget(queries=4),
+        'import_team_tasks': [
+            Budget(queries=3),
+            Budget(queries=6, method='post', data=lambda dataset: {'file': import_file()}),
+        ],
+        'bulk_my_tasks': [
+            Budget(queries=4, method='post', data=lambda dataset: {
+                'tasks': dataset['task_ids'], 'action': 'status', 'status': 'done',
+            }),
+            Budget(queries=4, method='post', data=lambda dataset: {'tasks': dataset['task_ids'], 'action': 'delete'}),
+        ],
+        'bulk_team_tasks': [
+            Budget(queries=6, method='post', data=lambda dataset: {
+                'tasks': dataset['team_task_ids'], 'action': 'assign', 'assigned': dataset['user_id'],
+            }),
+            Budget(queries=5, method='post', data=lambda dataset: {'tasks': dataset['team_task_ids'], 'action': 'delete'}),
+        ],
+        'team_events': Budget(queries=2),
+        'metrics': Budget(queries=2),
+        'api_task_list': [
+            Budget(queries=4),
+            Budget(queries=8, method='post', json=True, data=lambda dataset: {
+                'task_name': 'API task', 'task_description': 'Budget task', 'due': tomorrow(),
+                'team': dataset['team_id'], 'assigned': '@johndoe',
+            }),
+        ],
+        'api_task_detail': [
+            Budget(queries=4),
+            Budget(queries=7, method='patch', json=True, data=lambda dataset: {'status': 'done', 'due': tomorrow()}),
+            Budget(queries=4, method='delete'),
+        ],
+        'api_team_list': [
+            Budget(queries=3),
+            Budget(queries=6, method='post', json=True, data=lambda dataset: {
+                'team_name': 'API team', 'team_description': 'Budget team',
+            }),
+        ],
+        'api_team_detail': [
+            Budget(queries=4),
+            Budget(queries=6, method='patch', json=True, data=lambda dataset: {'team_name': 'Renamed team'}),
+            Budget(queries=9, method='delete'),
+        ],
+        'api_team_member_list': [
+            Budget(queries=4),
+            Budget(queries=10, method='post', json=True, data=lambda dataset: {'username': new_user().username}),
+        ],
+        'api_team_member_detail': Budget(queries=5, method='delete'),
+    }
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+
+    def test_every_named_route_has_a_budget(self):
+        route_names = {pattern.name for pattern in self._named_routes()}
+        self.assertEqual(route_names, set(self.view_budgets))
+
+    def test_views_are_within_budget(self):
+        for pattern in self._named_routes():
+            with self.subTest(view=pattern.name):
+                budgets = self.view_budgets[pattern.name]
+                for budget in budgets if isinstance(budgets, list) else [budgets]:
+                    self.assert_view_within_budget(
+                        pattern.name,
+                        budget,
+                        self.user,
+                        logged_in=pattern.name not in self.logged_out_views,
+                        url_params=list(pattern.pattern.converters),
+                    )
+
+    def _named_routes(self):
+        return [pattern for pattern in urlpatterns if isinstance(pattern, URLPattern) and pattern.name]
@@ -0,0 +1,107 @@
+"""Sliding window throttling of log in attempts.
+
+Checking a password runs a full PBKDF2 hash, so a burst of bad log ins can
+pin every worker.  Attempts are counted per username and per client IP in
+windows of a fixed number of seconds, and an attempt is rejected before
+any hashing once either count over the last period is over its limit.
+That count is the current window's plus the previous window's, weighted by
+how much of the previous window the last period still covers, so unlike
+fixed windows a burst straddling two windows cannot get twice the limit
+through.  Successful attempts are taken off the counts again, so only
+failures use up the allowance.
+
+Counts live in the Django cache, so a local memory backend throttles per
+process and a shared backend throttles site-wide.  They are only changed
+with the cache's atomic add() and incr(), so concurrent attempts cannot
+lose each other's counts, and windows are numbered from the wall clock,
+which unlike a monotonic clock reads the same in every process.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class WindowCounter:
+    """Counts of attempts per key, in windows of period seconds, allowing limit attempts per sliding period."""
+
+    def __init__(self, name, limit, period):
+        self.name = name
+        self.limit = limit
+        self.period = period
+        self.cache = caches[settings.LOGIN_THROTTLE_CACHE]
+
+    def cache_key(self, key, window):
+        return f'throttle:{self.name}:{window}:{key}'
+
+    def count_attempt(self, key):
+        """Count an attempt for key, returning the cache key counted on and the count over the last period."""
+
+        window, elapsed = divmod(time.time(), self.period)
+        cache_key = self.cache_key(key, int(window))
+        count = self.increment(cache_key)
+        previous = self.cache.get(self.cache_key(key, int(window) - 1), 0)
+        return cache_key, count + previous * (1 - elapsed / self.period)
+
+    def increment(self, cache_key):
+        """Add an attempt to a count, returning the new count."""
+
+        # Counts are kept for two periods, since the next window weighs them too.
+        # add() only creates a missing counter, so it cannot reset one another attempt has just counted on.
+        self.cache.add(cache_key, 0, timeout=2 * self.period)
+        try:
+            return self.cache.incr(cache_key)
+        except ValueError:
+            # The counter expired between add() and incr().
+            self.cache.add(cache_key, 1, timeout=2 * self.period)
+            return 1
+
+    def decrement(self, cache_key):
+        """Take an attempt off a count, if it has not expired."""
+
+        try:
+            self.cache.decr(cache_key)
+        except ValueError:
+            pass
+
+
+class LoginThrottle:
+    """Throttle log in attempts per username and per client IP."""
+
+    def __init__(self, username, request=None):
+        self.keys = [(self._counter('username'), username.lower())]
+        if request is not None and request.META.get('REMOTE_ADDR'):
+            self.keys.append((self._counter('ip'), request.META['REMOTE_ADDR']))
+        self.counted = []
+
+    def _counter(self, name):
+        limit, period = settings.LOGIN_THROTTLE_RATES[name]
+        return WindowCounter(f'login:{name}', limit, period)
+
+    def allows_attempt(self):
+        """Count an attempt, returning True if it may be checked, before anything is hashed.
+
+        Every attempt is counted before its password is checked, so
+        concurrent attempts cannot all slip in under the limit.  A rejected
+        attempt is not counted.
+        """
+
+        self.counted, counts = [], []
+        for counter, key in self.keys:
+            cache_key, count = counter.count_attempt(key)
+            self.counted.append((counter, cache_key))
+            counts.append(count)
+        if all(count <= counter.limit for (counter, _), count in zip(self.counted, counts)):
+            return True
+        self._uncount()
+        return False
+
+    def record_success(self):
+        """Take a successful attempt off the counts, so only failures are throttled."""
+
+        self._uncount()
+
+    def _uncount(self):
+        for counter, cache_key in self.counted:
+            counter.decrement(cache_key)
+        self.counted = []
@@ -1,20 +1,36 @@
+import codecs
+import hmac
+
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.exceptions import ImproperlyConfigured
+from django.core.exceptions import ImproperlyConfigured, PermissionDenied
+from django.db.models import Count, Max
 from django.shortcuts import redirect, render
+from django.utils.decorators import method_decorator
+from django.utils import timezone
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import etag, require_POST
 
 from django.views import View
 from django.views.generic import FormView, UpdateView, DeleteView, DetailView
 
 from django.urls import reverse
-from tasks.forms import LogInForm, PasswordForm, UserForm, SignUpForm, CreateTaskForm, CreateTeamForm, EditTeamForm, EditTaskForm
+from tasks.forms import LogInForm, PasswordForm, UserForm, SignUpForm, CreateTaskForm, CreateTeamForm, EditTeamForm, EditTaskForm, ImportTasksForm, BulkTaskForm, TaskFilterForm
+from tasks.caching import bump_versions, cache_page_per_user, fragment_context, get_version, get_versions, page_etag
+from tasks.deletion import delete_tasks, delete_teams
+from tasks.events import RESYNC, member_added_event, publish_team_event, task_deleted_event, task_event
+from tasks.export import EXPORT_FORMATS, export_response
 from tasks.helpers import login_prohibited
+from tasks.importing import ImportFileError, import_tasks
+from tasks.metrics import EXPOSITION_CONTENT_TYPE, registry
+from tasks.pagination import KeysetPaginator
+from tasks.search import search_tasks
 
-from django.http import HttpResponse
-from tasks.models import User, Task, Team
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, HttpResponseRedirect
+from tasks.models import User, Task, Team, TaskStatusCount
 from typing import Any
 
 
@@ -23,7 +39,8 @@ def dashboard(request):
     """Display the current user's dashboard."""
 
     current_user = request.user
-    return render(request, 'dashboard.html', {'user': current_user})
+    task_counts = TaskStatusCount.objects.for_user(current_user)
+    return render(request, 'dashboard.html', {'user': current_user, 'task_counts': task_counts})
 
 
 @login_prohibited
@@ -75,20 +92,23 @@ class LogInView(LoginProhibitedMixin, View):
     def post(self, request):
         """Handle log in attempt."""
 
-        form = LogInForm(request.POST)
+        form = LogInForm(request.POST, request=request)
         self.next = request.POST.get('next') or settings.REDIRECT_URL_WHEN_LOGGED_IN
         user = form.get_user()
         if user is not None:
             login(request, user)
             return redirect(self.next)
+        if form.throttled:
+            messages.add_message(request, messages.ERROR, "Too many log in attempts, please try again later.")
+            return self.render(status=429)
         messages.add_message(request, messages.ERROR, "The credentials provided were invalid!")
         return self.render()
 
-    def render(self):
+    def render(self, status=200):
         """Render log in template with blank log in form."""
 
         form = LogInForm()
-        return render(self.request, 'log_in.html', {'form': form, 'next': self.next})
+        return render(self.request, 'log_in.html', {'form': form, 'next': self.next}, status=status)
 
 
 def log_out(request):
@@ -108,7 +128,7 @@ class PasswordView(LoginRequiredMixin, FormView):
         """Pass the current user to the password change form."""
 
         kwargs = super().get_form_kwargs(**kwargs)
-        kwargs.update({'user': self.request.user})
+        kwargs.update({'user': self.request.user, 'request': self.request})
         return kwargs
 
     def form_valid(self, form):
@@ -137,6 +157,13 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         user = self.request.user
         return user
 
+    def form_valid(self, form):
+        """Save the profile and invalidate cached pages showing the user."""
+        response = super().form_valid(form)
+        team_ids = self.object.team_set.values_list('id', flat=True)
+        bump_versions(user_ids=[self.object.id], team_ids=team_ids)
+        return response
+
     def get_success_url(self):
         """Return redirect URL after successful update."""
         messages.add_message(self.request, messages.SUCCESS, "Profile updated!")
@@ -159,22 +186,228 @@ class SignUpView(LoginProhibitedMixin, FormView):
         return reverse(settings.REDIRECT_URL_WHEN_LOGGED_IN)
 
 
+def task_table_queryset():
+    """Return tasks with only the columns, and assignee, rendered in the task table."""
+
+    return Task.objects.select_related('assigned').only(
+        'task_name', 'task_description', 'due', 'status', 'assigned', 'assigned__username'
+    )
+
+
+def task_table_paginator(request, tasks, assignee=True):
+    """Return the filter form of a task table and a paginator over the tasks it selects, in its sort order."""
+
+    filters = TaskFilterForm(request.GET, assignee=assignee)
+    paginator = KeysetPaginator(
+        filters.filter(tasks), key=filters.sort_key(), per_page=settings.TASKS_PER_PAGE, state=filters.state,
+    )
+    return filters, paginator
+
+
+def my_tasks_versions(request):
+    """Return the versions the my tasks page depends on."""
+
+    return str(get_version('user', request.user.pk))
+
+
+def my_teams_versions(request):
+    """Return the versions the my teams page depends on."""
+
+    team_ids = Team.objects.filter(team_members=request.user).values_list('id', flat=True)
+    team_versions = sorted(get_versions('team', team_ids).items())
+    return f"{get_version('user', request.user.pk)}:{team_versions}"
+
+
+def modification_stamp(queryset):
+    """Return the latest updated_at and the row count of a queryset, without loading any rows."""
+
+    stamp = queryset.aggregate(last_updated=Max('updated_at'), count=Count('id'))
+    return f"{stamp['last_updated']}:{stamp['count']}"
+
+
+def my_tasks_etag(request):
+    tasks = Task.objects.filter(assigned=request.user, team__isnull=True)
+    return page_etag(request, my_tasks_versions(request), modification_stamp(tasks))
+
+
+def my_teams_etag(request):
+    teams = Team.objects.filter(team_members=request.user)
+    return page_etag(request, get_version('user', request.user.pk), modification_stamp(teams))
+
+
+def team_info_etag(request, team_id):
+    team_updated = Team.objects.filter(id=team_id).values_list('updated_at', flat=True).first()
+    tasks = Task.objects.filter(team=team_id)
+    return page_etag(request, get_version('team', team_id), team_updated, modification_stamp(tasks))
+
+
 @login_required
+@etag(my_tasks_etag)
+@cache_page_per_user(my_tasks_versions)
 def my_tasks(request):
     """Page to view my tasks"""
     current_user = request.user
-    tasks = Task.objects.filter(assigned=current_user, team__isnull=True)
-    return render(request, 'my_tasks.html', {'user': current_user, 'tasks': tasks})
+    tasks = task_table_queryset().filter(assigned=current_user, team__isnull=True)
+    filters, paginator = task_table_paginator(request, tasks, assignee=False)
+    page = paginator.get_page(request.GET)
+    return render(request, 'my_tasks.html', {
+        'user': current_user, 'tasks': page, 'page': page, 'filters': filters,
+        **fragment_context('user', current_user.pk),
+    })
 
 
 @login_required
+@etag(my_teams_etag)
+@cache_page_per_user(my_teams_versions)
 def my_teams(request):
     """Page to view my teams"""
     current_user = request.user
-    teams = Team.objects.filter(team_members__in=[current_user])
+    teams = Team.objects.filter(team_members__in=[current_user]).only('team_name', 'team_description')
     return render(request, 'my_teams.html', {'teams': teams})
 
 
+@login_required
+def search(request):
+    """Search the names and descriptions of my tasks and my teams' tasks, best matches first"""
+    query = request.GET.get('q', '').strip()
+    results = search_tasks(request.user, query) if query else []
+    return render(request, 'search.html', {
+        'user': request.user, 'query': query, 'results': results, 'limit': settings.SEARCH_RESULTS,
+    })
+
+
+def export_format(request):
+    """Return the export format and whether to gzip it, from the query parameters."""
+
+    requested = request.GET.get('format', 'csv')
+    if requested not in EXPORT_FORMATS:
+        return None, False
+    return requested, request.GET.get('gzip') == '1'
+
+
+@login_required
+def export_my_tasks(request):
+    """Stream my tasks as a CSV or NDJSON download"""
+    requested, compress = export_format(request)
+    if requested is None:
+        return HttpResponseBadRequest('Unknown export format.')
+    tasks = Task.objects.filter(assigned=request.user, team__isnull=True)
+    return export_response(tasks, 'my_tasks', requested, compress)
+
+
+@login_required
+def export_team_tasks(request, team_id):
+    """Stream the tasks of one of my teams as a CSV or NDJSON download"""
+    if not Team.objects.filter(id=team_id, team_members=request.user).exists():
+        raise Http404('Team not found.')
+    requested, compress = export_format(request)
+    if requested is None:
+        return HttpResponseBadRequest('Unknown export format.')
+    return export_response(Task.objects.filter(team_id=team_id), f'team_{team_id}_tasks', requested, compress)
+
+
+@login_required
+@require_POST
+def bulk_my_tasks(request):
+    """Change the status of, or delete, many of my tasks at once"""
+    tasks = Task.objects.filter(assigned=request.user, team__isnull=True)
+    return bulk_task_action(request, tasks, User.objects.none(), reverse('my_tasks'))
+
+
+@login_required
+@require_POST
+def bulk_team_tasks(request, team_id):
+    """Change the status of, reassign or delete many tasks of one of my teams at once"""
+    if not Team.objects.filter(id=team_id, team_members=request.user).exists():
+        raise Http404('Team not found.')
+    tasks = Task.objects.filter(team_id=team_id)
+    members = User.objects.filter(team=team_id)
+    return bulk_task_action(request, tasks, members, reverse('team_info', kwargs={'team_id': team_id}), team_id)
+
+
+def bulk_task_action(request, tasks, members, success_url, team_id=None):
+    """Apply the posted bulk action to the selected tasks with one set-based statement, then redirect.
+
+    Only tasks in tasks may be selected, and only users in members assigned,
+    so the queries are the same however many tasks are selected.
+    """
+
+    form = BulkTaskForm(request.POST, tasks=tasks, members=members)
+    if not form.is_valid():
+        for errors in form.errors.values():
+            for error in errors:
+                messages.add_message(request, messages.ERROR, error)
+        return redirect(success_url)
+
+    selected = form.cleaned_data['tasks']
+    task_ids = [task.id for task in selected]
+    assigned_ids = {task.assigned_id for task in selected}
+    action = form.cleaned_data['action']
+    if action == 'delete':
+        delete_tasks(task_ids)
+        done = 'deleted'
+    elif action == 'status':
+        Task.objects.filter(id__in=task_ids).update(status=form.cleaned_data['status'], updated_at=timezone.now())
+        done = 'updated'
+    else:
+        assignee = form.cleaned_data['assigned']
+        Task.objects.filter(id__in=task_ids).update(assigned=assignee, updated_at=timezone.now())
+        assigned_ids.add(assignee.id)
+        done = 'reassigned'
+    bump_versions(user_ids=assigned_ids, team_ids=[team_id])
+    publish_team_event(team_id, RESYNC)
+    count = len(task_ids)
+    messages.add_message(request, messages.SUCCESS, f"{count} task{'s' if count != 1 else ''} {done}!")
+    return redirect(success_url)
+
+
+@login_required
+def team_events(request, team_id):
+    """Live team updates are only streamed by the ASGI application, so tell event sources not to reconnect"""
+    return HttpResponse(status=204)
+
+
+def has_metrics_token(request):
+    """Return True if the request carries the metrics bearer token, when one is set."""
+
+    if not settings.METRICS_TOKEN:
+        return False
+    scheme, _, token = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    return scheme.lower() == 'bearer' and hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode())
+
+
+@never_cache
+def metrics(request):
+    """Request metrics of every view in the Prometheus text format, for staff, the metrics token and the allowed addresses"""
+    allowed = (
+        request.user.is_staff or has_metrics_token(request)
+        or request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS
+    )
+    if not allowed:
+        raise PermissionDenied
+    return HttpResponse(registry.exposition(), content_type=EXPOSITION_CONTENT_TYPE)
+
+
+@login_required
+def import_team_tasks(request, team_id):
+    """Create tasks in one of my teams from an uploaded CSV file, and report the rows rejected"""
+    team = Team.objects.filter(id=team_id, team_members=request.user).first()
+    if team is None:
+        raise Http404('Team not found.')
+    report = None
+    if request.method == 'POST':
+        form = ImportTasksForm(request.POST, request.FILES)
+        if form.is_valid():
+            lines = codecs.iterdecode(form.cleaned_data['file'], 'utf-8-sig')
+            try:
+                report = import_tasks(team, lines, default_assignee=request.user)
+            except ImportFileError as error:
+                form.add_error('file', str(error))
+    else:
+        form = ImportTasksForm()
+    return render(request, 'import_tasks.html', {'form': form, 'team': team, 'report': report})
+
+
 class CreateTaskView(FormView):
     """Display a create task view and handle newly created tasks. """
     form_class = CreateTaskForm
@@ -188,6 +421,7 @@ class CreateTaskView(FormView):
         task.assigned = self.request.user
         task.save()
         self.object = task
+        bump_versions(user_ids=[task.assigned_id])
         return super().form_valid(form)
 
     def get_success_url(self):
@@ -221,6 +455,13 @@ class DeleteTaskView(DeleteView):
             messages.add_message(self.request, messages.ERROR, "Task Deleted!")
             return reverse('my_tasks')
 
+    def form_valid(self, form):
+        """Delete the task, invalidate cached pages showing it and tell its team's open pages."""
+        task_id = self.task.id
+        response = super().form_valid(form)
+        bump_versions(user_ids=[self.task.assigned_id], team_ids=[self.task.team_id])
+        publish_team_event(self.task.team_id, task_deleted_event(task_id))
+        return response
 
     def get_context_data(self, **kwargs: Any):
         context = super().get_context_data(**kwargs)
@@ -239,6 +480,7 @@ class CreateTeamView(FormView):
         team.save()
         team.team_members.add(self.request.user) 
         self.object = team
+        bump_versions(user_ids=[self.request.user.id], team_ids=[team.id])
         return super().form_valid(form)
 
     def get_success_url(self):
@@ -261,6 +503,13 @@ class DeleteTeamView(DeleteView):
         messages.add_message(self.request, messages.ERROR, "Team Deleted!")
         return reverse('my_teams')
 
+    def form_valid(self, form):
+        """Delete the team, its tasks and memberships with set-based queries."""
+        success_url = self.get_success_url()
+        delete_teams([self.object.id])
+        bump_versions(team_ids=[self.object.id])
+        return HttpResponseRedirect(success_url)
+
     def get_context_data(self, **kwargs: Any):
         context = super().get_context_data(**kwargs)
         context['team_id'] = self.kwargs.get('team_id')
@@ -295,7 +544,10 @@ class EditTeamView(FormView):
         return context  
     
     def form_valid(self,form):
-        form.save()
+        team = form.save()
+        bump_versions(team_ids=[team.id])
+        if form.added_member is not None:
+            publish_team_event(team.id, member_added_event(form.added_member))
         return super().form_valid(form)
 
 
@@ -304,11 +556,19 @@ class TeamInfoView(DetailView):
     model = Team
     template_name = "team_info.html"
 
+    @method_decorator(etag(team_info_etag))
     def get(self,request,team_id):
         current_user=request.user
-        team = Team.objects.get(id=team_id)
-        tasks= Task.objects.filter(team=team)
-        return render(request, 'team_info.html', {'user': current_user, 'tasks': tasks, 'team':team})
+        team = Team.objects.only('team_name', 'team_description', 'updated_at').get(id=team_id)
+        members = team.team_members.only('username')
+        task_counts = TaskStatusCount.objects.for_team(team)
+        tasks= task_table_queryset().filter(team=team)
+        filters, paginator = task_table_paginator(request, tasks)
+        page = paginator.get_page(request.GET)
+        return render(request, 'team_info.html', {
+            'user': current_user, 'tasks': page, 'page': page, 'filters': filters, 'team': team, 'members': members,
+            'task_counts': task_counts, **fragment_context('team', team.id),
+        })
 
 class CreateTeamTaskView(FormView):
     """Display a create task view and handle newly created tasks for a specific team. """
@@ -327,6 +587,8 @@ class CreateTeamTaskView(FormView):
             task.assigned = form.cleaned_data['assigned']
         task.save()
         self.object = task
+        bump_versions(user_ids=[task.assigned_id], team_ids=[team.id])
+        publish_team_event(team.id, task_event('task_created', task))
 
         return super().form_valid(form)
 
@@ -367,7 +629,9 @@ class EditTaskView(FormView):
 
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
-        kwargs.update({'instance': self.get_object(self.kwargs.get('task_id'))})
+        task = self.get_object(self.kwargs.get('task_id'))
+        self.original_owners = (task.assigned_id, task.team_id)
+        kwargs.update({'instance': task})
         return kwargs
     
     def get_object(self, task_id):
@@ -396,4 +660,7 @@ class EditTaskView(FormView):
         if not form.cleaned_data['assigned']:
             task.assigned = self.request.user
         task.save()
+        original_assigned_id, original_team_id = self.original_owners
+        bump_versions(user_ids=[original_assigned_id, task.assigned_id], team_ids=[original_team_id, task.team_id])
+        publish_team_event(task.team_id, task_event('task_updated', task))
         return super().form_valid(form)
\ No newline at end of file
@@ -0,0 +1,32 @@
+"""Compile templates ahead of the first request."""
+from pathlib import Path
+
+from django.apps import apps
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+
+
+def template_names():
+    """Return the name of every template in the tasks app."""
+
+    directory = Path(apps.get_app_config('tasks').path) / 'templates'
+    return sorted(
+        path.relative_to(directory).as_posix()
+        for path in directory.rglob('*.html')
+    )
+
+
+def warm_up_templates():
+    """Load every template of the tasks app, so the cached loaders hold them compiled.
+
+    Called when a WSGI or ASGI worker starts, so the first request after a
+    deploy does not pay for reading and parsing templates.  Returns the
+    names of the templates loaded.
+    """
+
+    names = template_names()
+    for engine in engines.all():
+        if isinstance(engine, DjangoTemplates):
+            for name in names:
+                engine.get_template(name)
+    return names